@@ -0,0 +1,166 @@
+import contextlib
+import time
+
+from django.conf import settings
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+from .caching import PREFIX, _cache
+
+
+DEFAULT_RATE_PER_MIN   = 60     # bulk write requests per client, sustained
+DEFAULT_BURST          = 20     # ... and back to back
+DEFAULT_MAX_BULK       = 8      # bulk writes in flight, all clients together
+DEFAULT_MAX_PER_CLIENT = 2      # ... and per client
+DEFAULT_RETRY_AFTER    = 5      # seconds suggested when every slot is taken
+SLOT_TTL               = 3600   # a slot leaked by a killed worker frees itself after this
+
+WORKER_POLL = 0.5
+
+
+def rate_limits():
+    return (
+        getattr(settings, 'VSAVER_BULK_RATE_PER_MIN', DEFAULT_RATE_PER_MIN),
+        getattr(settings, 'VSAVER_BULK_BURST', DEFAULT_BURST),
+    )
+
+
+def concurrency_limits():
+    return (
+        getattr(settings, 'VSAVER_BULK_MAX_CONCURRENT', DEFAULT_MAX_BULK),
+        getattr(settings, 'VSAVER_BULK_MAX_CONCURRENT_PER_CLIENT', DEFAULT_MAX_PER_CLIENT),
+    )
+
+
+def request_client_id(request):
+    """client_id of a write: the authenticated tenant, or a JSON body's (never a streamed NDJSON / CSV one)."""
+    client_id = getattr(request, 'tenant', None) or ''
+    if not client_id and (request.content_type or '').startswith('application/json'):
+        data = request.data
+        if isinstance(data, dict) and isinstance(data.get('client_id'), str):
+            client_id = data['client_id'].strip()
+    return client_id
+
+
+# ── Request rate: token bucket per client ─────────────────
+
+class BulkRateThrottle(BaseThrottle):
+    """
+    Token bucket per client_id (per address when there is none) over the
+    bulk write routes: VSAVER_BULK_BURST requests back to back, refilled
+    at VSAVER_BULK_RATE_PER_MIN. Kept in the cache, so it is shared by
+    the workers when the cache is; like DRF's own throttles, the
+    read-modify-write isn't atomic.
+    """
+
+    def allow_request(self, request, view):
+        self._wait = None
+        rate, burst = rate_limits()
+        if not rate:
+            return True
+        ident   = request_client_id(request) or f'addr:{self.get_ident(request)}'
+        key     = f'{PREFIX}:bucket:{ident}'
+        cache   = _cache()
+        now     = time.time()
+        per_s   = rate / 60
+        timeout = int(burst / per_s) + 60          # long enough to refill completely
+        tokens, stamp = cache.get(key) or (burst, now)
+        tokens  = min(burst, tokens + (now - stamp) * per_s)
+        if tokens >= 1:
+            cache.set(key, (tokens - 1, now), timeout)
+            return True
+        cache.set(key, (tokens, now), timeout)
+        self._wait = (1 - tokens) / per_s
+        return False
+
+    def wait(self):
+        return self._wait
+
+
+# ── Concurrency: bulk writes in flight ────────────────────
+# Counters in the cache, so the caps are global only when the cache backend
+# is shared (see api.checks); over locmem each process has its own.
+
+def _slot_key(client_id):
+    return f'{PREFIX}:slots:{client_id}' if client_id else f'{PREFIX}:slots'
+
+
+def _take(key, cap):
+    cache = _cache()
+    cache.add(key, 0, SLOT_TTL)
+    try:
+        taken = cache.incr(key)
+    except ValueError:          # evicted in between
+        cache.set(key, 1, SLOT_TTL)
+        taken = 1
+    if taken > cap:
+        _give(key)
+        return False
+    return True
+
+
+def _give(key):
+    cache = _cache()
+    try:
+        if cache.decr(key) < 0:
+            cache.set(key, 0, SLOT_TTL)
+    except ValueError:
+        pass
+
+
+def _acquire(client_id):
+    """Keys of the slots taken, or None (nothing held) when a cap is reached."""
+    total, per_client = concurrency_limits()
+    limits = [(_slot_key(None), total)] + ([(_slot_key(client_id), per_client)] if client_id else [])
+    taken  = []
+    for key, cap in limits:
+        if not cap:
+            continue
+        if not _take(key, cap):
+            for held in taken:
+                _give(held)
+            return None
+        taken.append(key)
+    return taken
+
+
+@contextlib.contextmanager
+def bulk_slot(client_id):
+    """
+    Hold one of the global and one of the client's bulk write slots for
+    the block; raises Throttled (429 with Retry-After) when either is full.
+    Reads never take one, so they aren't queued behind a month-end rush.
+    """
+    taken = _acquire(client_id)
+    if taken is None:
+        raise Throttled(
+            wait=getattr(settings, 'VSAVER_BULK_RETRY_AFTER', DEFAULT_RETRY_AFTER),
+            detail='Too many bulk writes in progress; retry shortly.',
+        )
+    try:
+        yield
+    finally:
+        for key in taken:
+            _give(key)
+
+
+@contextlib.contextmanager
+def worker_slot():
+    """
+    bulk_worker's share of the global cap: waits for a free slot instead
+    of failing. Shared with the web workers only over a shared cache.
+    """
+    taken = _acquire(None)
+    while taken is None:
+        time.sleep(WORKER_POLL)
+        taken = _acquire(None)
+    try:
+        yield
+    finally:
+        for key in taken:
+            _give(key)
+
+
+def in_flight():
+    """Bulk writes holding a slot: in every process over a shared cache, in this one over locmem."""
+    return _cache().get(_slot_key(None)) or 0
@@ -3,4 +3,12 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'api'
\ No newline at end of file
+    name = 'api'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from . import checks  # noqa: F401  (registers the system checks)
+        from .dbstats import count_connection
+        from .metrics import install_query_timer
+        connection_created.connect(count_connection, dispatch_uid='api.dbstats')
+        connection_created.connect(install_query_timer, dispatch_uid='api.metrics')
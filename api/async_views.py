@@ -0,0 +1,229 @@
+# Native async versions of the read endpoints, routed instead of the
+# APIViews under ASGI (see api/urls.py). Params go through the same
+# helpers and bodies through the same renderer as the sync views, so both
+# return identical bytes and share cache entries.
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+
+from .auth import aresolve_tenant, missing_tenant
+from .caching import acached_response
+from .lean import LeanSerializer
+from .models import (
+    AccMaster, Misel, AccInvMast,
+    AccInvMastClientSummary, AccInvMastCustomerSummary,
+)
+from .pagination import apaginate, astream_ndjson
+from .renderers import FastJSONRenderer
+from .routing import areplica_read
+from .search import search_debtors
+from .serializers import AccMasterSerializer, MiselSerializer, AccInvMastSerializer
+from .summaries import sales_by
+from .tombstones import adeleted_since, expired, watermark
+from .views import (
+    AccMasterListView, AccInvMastListView,
+    _analytics_args, _analytics_body, _list_args, _list_body, _list_query, _page_fields, _parse_since,
+    _search_args, _search_body, _since_changes,
+)
+
+
+def _json(data, status=200):
+    return HttpResponse(FastJSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def _as_http(response):
+    """Render a DRF error Response built by the shared helpers."""
+    return _json(response.data, response.status_code)
+
+
+def with_tenant(view):
+    """
+    Resolve request.tenant as ApiKeyAuthentication does for the APIViews.
+    Outermost, so acached_response() keys its entries by the tenant.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        problem = await aresolve_tenant(request)
+        if problem:
+            code, message = problem
+            response = _json({'detail': message}, code)
+            if code == 401:
+                response['WWW-Authenticate'] = 'Api-Key'
+            return response
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def _require_client_id(request):
+    if not request.tenant:
+        code, message = missing_tenant()
+        return None, _json({'error': message}, code)
+    return request.tenant, None
+
+
+async def _changes(qs, client_id, key, since):
+    mark = watermark()
+    tombstones = None if expired(since) else await adeleted_since(qs.model, client_id, key, since)
+    return _since_changes(qs, since, mark, tombstones)
+
+
+async def _list_response(request, qs, serializer_class, spec, client_id, key):
+    """Async twin of views._list_response."""
+    query, err = _list_query(request.GET, qs, serializer_class, spec)
+    if err:
+        return _as_http(err)
+    qs, lean, keyset = query
+    args, err = _list_args(request.GET, qs.model, keyset)
+    if err:
+        return _as_http(err)
+    since, stream, paged, limit, cursor = args
+    changes = None
+    if since is not None:
+        qs, changes = await _changes(qs, client_id, key, since)
+
+    if stream:
+        return astream_ndjson(qs.order_by(*keyset.order_by()), lean)
+    if not paged:
+        return _json(_list_body(await lean.adata(qs.order_by(*keyset.order_by())), changes))
+    rows, next_cursor = await apaginate(qs, keyset, cursor, limit, _page_fields(lean, keyset))
+    return _json(_list_body(lean.represent(rows), changes, True, cursor, next_cursor))
+
+
+# ── AccMaster (Debtors) ───────────────────────────────────
+
+@with_tenant
+@acached_response('debtor-list')
+@areplica_read
+async def debtor_list(request):
+    client_id, err = _require_client_id(request)
+    if err:
+        return err
+    qs = AccMaster.objects.filter(client_id=client_id)
+    return await _list_response(request, qs, AccMasterSerializer, AccMasterListView.listing, client_id, 'code')
+
+
+@with_tenant
+@acached_response('debtor-detail')
+@areplica_read
+async def debtor_detail(request, code):
+    client_id, err = _require_client_id(request)
+    if err:
+        return err
+    try:
+        obj = await AccMaster.objects.aget(code=code, client_id=client_id)
+    except AccMaster.DoesNotExist:
+        return _json({'detail': 'Not found.'}, 404)
+    return _json(AccMasterSerializer(obj).data)
+
+
+@with_tenant
+@acached_response('debtor-search')
+@areplica_read
+async def debtor_search(request):
+    client_id, err = _require_client_id(request)
+    if err:
+        return err
+    args, err = _search_args(request.GET)
+    if err:
+        return _as_http(err)
+    q, limit = args
+    # The in-process fallback is CPU work, and the SQL path is one query: both run off the loop
+    rows = await sync_to_async(search_debtors)(client_id, q, limit)
+    return _json(_search_body(client_id, q, rows))
+
+
+# ── Misel (Firm Info) ─────────────────────────────────────
+
+@with_tenant
+@acached_response('misel-list')
+@areplica_read
+async def misel_list(request):
+    client_id, err = _require_client_id(request)
+    if err:
+        return err
+    since, err = _parse_since(request.GET)
+    if err:
+        return _as_http(err)
+    qs, changes = Misel.objects.filter(client_id=client_id), None
+    if since is not None:
+        qs, changes = await _changes(qs, client_id, 'firm_name', since)
+    return _json(_list_body(await LeanSerializer(MiselSerializer).adata(qs), changes))
+
+
+# ── AccInvMast (Invoices) ─────────────────────────────────
+
+@with_tenant
+@acached_response('invoice-list')
+@areplica_read
+async def invoice_list(request):
+    client_id, err = _require_client_id(request)
+    if err:
+        return err
+    qs = AccInvMast.objects.filter(client_id=client_id)
+    return await _list_response(request, qs, AccInvMastSerializer, AccInvMastListView.listing, client_id, 'slno')
+
+
+@with_tenant
+@acached_response('invoice-detail')
+@areplica_read
+async def invoice_detail(request, slno):
+    client_id, err = _require_client_id(request)
+    if err:
+        return err
+    try:
+        obj = await AccInvMast.objects.aget(slno=slno, client_id=client_id)
+    except AccInvMast.DoesNotExist:
+        return _json({'detail': 'Not found.'}, 404)
+    return _json(AccInvMastSerializer(obj).data)
+
+
+@with_tenant
+@acached_response('invoice-summary')
+@areplica_read
+async def invoice_summary(request):
+    client_id, err = _require_client_id(request)
+    if err:
+        return err
+    customerid = request.GET.get('customerid')
+
+    if customerid:
+        row = await (
+            AccInvMastCustomerSummary.objects
+            .filter(client_id=client_id, customerid=customerid)
+            .values('total_sales', 'invoice_count')
+            .afirst()
+        ) or {}
+        return _json({
+            'customerid':    customerid,
+            'client_id':     client_id,
+            'total_sales':   row.get('total_sales') or 0,
+            'invoice_count': row.get('invoice_count') or 0,
+        })
+
+    row = await (
+        AccInvMastClientSummary.objects
+        .filter(client_id=client_id)
+        .values('total_sales', 'invoice_count')
+        .afirst()
+    ) or {}
+    return _json({
+        'total_invoices': row.get('invoice_count') or 0,
+        'total_amount':   row.get('total_sales'),
+        'client_id':      client_id,
+    })
+
+
+@with_tenant
+@acached_response('invoice-analytics')
+@areplica_read
+async def invoice_analytics(request):
+    client_id, err = _require_client_id(request)
+    if err:
+        return err
+    args, err = _analytics_args(request.GET)
+    if err:
+        return _as_http(err)
+    group_by, start, end, limit = args
+    rows = sales_by(client_id, group_by, start, end)
+    return _json(_analytics_body(client_id, args, [r async for r in (rows[:limit] if limit else rows)]))
@@ -0,0 +1,217 @@
+import collections
+import hashlib
+import secrets
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
+from rest_framework.permissions import BasePermission
+
+from . import metrics
+from .models import ApiKey
+
+
+KEY_PREFIX = 'vs_'
+
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_CACHE_TTL  = 60       # seconds a resolved (or unknown) key is trusted without the database
+
+
+def api_key_required():
+    return getattr(settings, 'VSAVER_REQUIRE_API_KEY', False)
+
+
+# ── Keys ──────────────────────────────────────────────────
+
+def digest(raw):
+    """Only this is stored; the key itself is shown once, when it is created."""
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def create_key(client_id, name=''):
+    """Issue a key for `client_id`; returns (ApiKey, the raw key)."""
+    raw = KEY_PREFIX + secrets.token_urlsafe(32)
+    key = ApiKey.objects.create(client_id=client_id, name=name, prefix=raw[:12], key_hash=digest(raw))
+    return key, raw
+
+
+def revoke_keys(prefix):
+    """
+    Revoke the active keys starting with `prefix`; returns how many.
+    This process forgets them at once, other workers within
+    VSAVER_API_KEY_CACHE_TTL seconds.
+    """
+    keys = ApiKey.objects.filter(prefix__startswith=prefix[:12], revoked_at__isnull=True)
+    keys = [key for key in keys if key.prefix.startswith(prefix)]
+    for key in keys:
+        key.revoked_at = timezone.now()
+        key.save(update_fields=['revoked_at'])
+        KEYS.drop(key.key_hash)
+    return len(keys)
+
+
+# ── In-process resolution cache ───────────────────────────
+
+class KeyCache:
+    """
+    LRU of key digest -> client_id (None for unknown or revoked keys,
+    so bad keys don't reach the database either), each trusted for
+    VSAVER_API_KEY_CACHE_TTL seconds. Per process: a revoked key keeps
+    working in other workers until its entry there expires.
+    """
+    MISSING = object()
+
+    def __init__(self):
+        self._lock  = threading.Lock()
+        self._items = collections.OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return self.MISSING
+            if item[1] < time.monotonic():
+                del self._items[key]
+                return self.MISSING
+            self._items.move_to_end(key)
+            return item[0]
+
+    def put(self, key, client_id):
+        ttl  = getattr(settings, 'VSAVER_API_KEY_CACHE_TTL', DEFAULT_CACHE_TTL)
+        size = getattr(settings, 'VSAVER_API_KEY_CACHE_SIZE', DEFAULT_CACHE_SIZE)
+        with self._lock:
+            self._items[key] = (client_id, time.monotonic() + ttl)
+            self._items.move_to_end(key)
+            while len(self._items) > size:
+                self._items.popitem(last=False)
+
+    def drop(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+KEYS = KeyCache()
+
+
+def _active(key_hash):
+    return ApiKey.objects.filter(key_hash=key_hash, revoked_at__isnull=True).values_list('client_id', flat=True)
+
+
+def lookup(raw):
+    """client_id of an active key, or None."""
+    key_hash  = digest(raw)
+    client_id = KEYS.get(key_hash)
+    if client_id is KeyCache.MISSING:
+        client_id = _active(key_hash).first()
+        KEYS.put(key_hash, client_id)
+    return client_id
+
+
+async def alookup(raw):
+    key_hash  = digest(raw)
+    client_id = KEYS.get(key_hash)
+    if client_id is KeyCache.MISSING:
+        client_id = await _active(key_hash).afirst()
+        KEYS.put(key_hash, client_id)
+    return client_id
+
+
+# ── request.tenant ────────────────────────────────────────
+
+def presented_key(request):
+    """The key from `Authorization: Api-Key <key>` or `X-API-Key`, or ''."""
+    scheme, _, value = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() == 'api-key':
+        return value.strip()
+    return request.headers.get('X-API-Key', '').strip()
+
+
+def _settle(request, raw, owner):
+    """
+    Set request.tenant: the key's client_id, or without a key (unless
+    VSAVER_REQUIRE_API_KEY) the ?client_id= / X-Client-ID the caller
+    names. Returns (status, message) for a bad key, else None.
+    """
+    named = (
+        request.GET.get('client_id', '').strip()
+        or request.headers.get('X-Client-ID', '').strip()
+    )
+    request.tenant = None
+    if raw:
+        if owner is None:
+            return 401, 'Invalid or revoked API key.'
+        if named and named != owner:
+            return 403, 'client_id does not match the API key.'
+        request.tenant = owner
+    elif not api_key_required():
+        request.tenant = named or None
+    if request.tenant:
+        metrics.set_client(request.tenant)
+    return None
+
+
+def resolve_tenant(request):
+    raw = presented_key(request)
+    return _settle(request, raw, lookup(raw) if raw else None)
+
+
+async def aresolve_tenant(request):
+    raw = presented_key(request)
+    return _settle(request, raw, await alookup(raw) if raw else None)
+
+
+def missing_tenant():
+    """(status, message) for a request that needs a tenant and names none."""
+    if api_key_required():
+        return 401, 'An API key is required. Send it as "Authorization: Api-Key <key>" or X-API-Key.'
+    return 400, 'client_id is required. Pass as ?client_id=... or X-Client-ID header.'
+
+
+class Tenant:
+    """request.user of a request authenticated by API key."""
+    is_authenticated = True
+    is_anonymous     = False
+
+    def __init__(self, client_id):
+        self.client_id = client_id
+
+    def __str__(self):
+        return self.client_id
+
+
+class ApiKeyAuthentication(BaseAuthentication):
+    """Resolves request.tenant for every DRF view; see resolve_tenant()."""
+
+    def authenticate(self, request):
+        problem = resolve_tenant(request)
+        if problem:
+            status, message = problem
+            raise (AuthenticationFailed if status == 401 else PermissionDenied)(message)
+        if presented_key(request):
+            return Tenant(request.tenant), None
+        return None
+
+    def authenticate_header(self, request):
+        return 'Api-Key'
+
+
+# ── Operator endpoints ────────────────────────────────────
+
+class OpsToken(BasePermission):
+    """
+    `Authorization: Bearer <VSAVER_OPS_TOKEN>` for the metrics and
+    database status endpoints. They show every tenant, so a tenant's API
+    key doesn't open them, and with no token configured they stay shut.
+    """
+
+    def has_permission(self, request, view):
+        token = getattr(settings, 'VSAVER_OPS_TOKEN', '')
+        scheme, _, value = request.headers.get('Authorization', '').partition(' ')
+        return bool(token) and scheme.lower() == 'bearer' and secrets.compare_digest(value.strip(), token)
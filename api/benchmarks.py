@@ -0,0 +1,608 @@
+import io
+import time
+import types
+
+from django.db import transaction
+
+from .models import AccMaster, AccInvMast
+from .synthetic import debtor_records, invoice_records
+from .upsert import bulk_upsert
+
+
+BENCH_CLIENT = '__bench__'
+
+SUITES = {}
+
+
+def suite(name):
+    """Register a benchmark suite for `manage.py benchmark <name>`."""
+    def register(fn):
+        SUITES[name] = fn
+        return fn
+    return register
+
+
+def timed(name, rows, fn, repeat=3):
+    """Best-of-`repeat` wall time for fn(), reported as rows/sec."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        'name'        : name,
+        'rows'        : rows,
+        'seconds'     : round(best, 6),
+        'rows_per_sec': round(rows / best) if best else None,
+    }
+
+
+class _Rollback(Exception):
+    pass
+
+
+def run_in_rollback(fn):
+    """Run fn() inside a transaction that is always rolled back, so seeded data never sticks."""
+    result = None
+    try:
+        with transaction.atomic():
+            result = fn()
+            raise _Rollback
+    except _Rollback:
+        pass
+    return result
+
+
+# ── Serialization: ModelSerializer vs LeanSerializer ──────
+
+@suite('serializers')
+def bench_serializers(rows=20000, repeat=3, **options):
+    from .lean import LeanSerializer
+    from .renderers import FastJSONRenderer
+    from .serializers import AccMasterSerializer, AccInvMastSerializer
+    from rest_framework.renderers import JSONRenderer
+
+    def run():
+        bulk_upsert(AccMaster, BENCH_CLIENT, debtor_records(rows), key='code')
+        bulk_upsert(AccInvMast, BENCH_CLIENT, invoice_records(rows, customers=max(1, rows // 20)), key='slno')
+        results = []
+        for model, serializer_class in ((AccMaster, AccMasterSerializer), (AccInvMast, AccInvMastSerializer)):
+            qs    = model.objects.filter(client_id=BENCH_CLIENT)
+            label = model.__name__
+            results += [
+                timed(f'{label}: ModelSerializer + JSONRenderer', rows,
+                      lambda: JSONRenderer().render(serializer_class(qs, many=True).data), repeat),
+                timed(f'{label}: LeanSerializer + FastJSONRenderer', rows,
+                      lambda: FastJSONRenderer().render(LeanSerializer(serializer_class).data(qs)), repeat),
+            ]
+        return results
+
+    return run_in_rollback(run)
+
+
+# ── Bulk validation: per-row serializer vs column-wise ────
+
+@suite('validation')
+def bench_validation(rows=20000, repeat=3, **options):
+    """
+    Validating one bulk push's records (run with --rows 100000 for a
+    full-size payload). No database access: only the validation stage is timed.
+    """
+    from rest_framework import serializers
+
+    from .serializers import BulkAccInvMastSerializer, BulkAccMasterSerializer
+    from .validation import validate_records
+
+    class DebtorRow(serializers.ModelSerializer):
+        class Meta:
+            model        = AccMaster
+            fields       = list(BulkAccMasterSerializer.columns)
+            extra_kwargs = {f: {'validators': []} for f in fields}   # no per-row uniqueness queries
+
+    class InvoiceRow(serializers.ModelSerializer):
+        class Meta:
+            model        = AccInvMast
+            fields       = list(BulkAccInvMastSerializer.columns)
+            extra_kwargs = {f: {'validators': []} for f in fields}
+
+    def per_row(row_serializer, records):
+        field = serializers.ListField(child=row_serializer())
+        return field.run_validation(records)
+
+    def untyped(records):
+        return serializers.ListField(child=serializers.DictField()).run_validation(records)
+
+    results = []
+    for label, records, bulk, row_serializer in (
+        ('AccMaster', debtor_records(rows), BulkAccMasterSerializer, DebtorRow),
+        ('AccInvMast', invoice_records(rows, customers=max(1, rows // 20)), BulkAccInvMastSerializer, InvoiceRow),
+    ):
+        results += [
+            timed(f'{label}: ListField(DictField()), unchecked', rows, lambda: untyped(records), repeat),
+            timed(f'{label}: child ModelSerializer per row', rows, lambda: per_row(row_serializer, records), repeat),
+            timed(
+                f'{label}: validate_records, column-wise', rows,
+                lambda: validate_records(bulk.model, bulk.columns, records, bulk.required_columns), repeat,
+            ),
+        ]
+    return results
+
+
+# ── Read path: WSGI (threads) vs ASGI (async views) ───────
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _load_result(name, latencies, elapsed):
+    return {
+        'name'        : name,
+        'rows'        : len(latencies),
+        'seconds'     : round(elapsed, 6),
+        'rows_per_sec': round(len(latencies) / elapsed) if elapsed else None,   # requests/sec here
+        'unit'        : 'req',
+        'p50_ms'      : round(_percentile(latencies, 50) * 1000, 2),
+        'p99_ms'      : round(_percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def _wsgi_load(urls, concurrency):
+    from concurrent.futures import ThreadPoolExecutor
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+
+    def one(url):
+        path, _, query = url.partition('?')
+        environ = {
+            'REQUEST_METHOD' : 'GET',
+            'PATH_INFO'      : path,
+            'QUERY_STRING'   : query,
+            'SERVER_NAME'    : 'bench',
+            'SERVER_PORT'    : '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST'      : 'bench',
+            'wsgi.input'     : io.BytesIO(),
+            'wsgi.url_scheme': 'http',
+            'wsgi.errors'    : io.StringIO(),
+        }
+        start    = time.perf_counter()
+        response = handler(environ, lambda status, headers: None)
+        b''.join(response)
+        response.close()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, urls))
+    return latencies, time.perf_counter() - start
+
+
+def _asgi_load(urls, concurrency):
+    import asyncio
+    from django.core.handlers.asgi import ASGIHandler
+
+    handler = ASGIHandler()
+
+    async def one(url, gate):
+        path, _, query = url.partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'query_string': query.encode(), 'root_path': '', 'headers': [(b'host', b'bench')],
+            'client': ('127.0.0.1', 0), 'server': ('bench', 80),
+        }
+        sent, hold = [], asyncio.Event()
+
+        async def receive():
+            if not sent:
+                sent.append(True)
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await hold.wait()      # no disconnect until the response is out
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            pass
+
+        async with gate:
+            start = time.perf_counter()
+            await handler(scope, receive, send)
+            hold.set()
+            return time.perf_counter() - start
+
+    async def run():
+        gate  = asyncio.Semaphore(concurrency)
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(one(url, gate) for url in urls))
+        return latencies, time.perf_counter() - start
+
+    return asyncio.run(run())
+
+
+@suite('asgi')
+def bench_asgi(rows=20000, repeat=3, concurrency=32, requests=600, **options):
+    """
+    In-process load test of the read endpoints: Django's WSGIHandler on a
+    pool of `concurrency` threads against its ASGIHandler running the async
+    views with `concurrency` requests in flight. Data is committed (other
+    threads must see it) and removed afterwards; the response cache is off.
+    """
+    from django.test.utils import override_settings
+    from django.urls import include, path
+
+    from .synthetic import delete_tenants, seed_tenant
+    from . import urls as api_urls
+
+    with transaction.atomic():
+        seed_tenant(BENCH_CLIENT, debtors=max(1, rows // 10), invoices=rows)
+    mix = [
+        f'/api/debtors/?client_id={BENCH_CLIENT}&limit=100',
+        f'/api/debtors/D000001/?client_id={BENCH_CLIENT}',
+        f'/api/invoices/?client_id={BENCH_CLIENT}&limit=100',
+        f'/api/invoices/?client_id={BENCH_CLIENT}&customerid=D000001',
+        f'/api/invoices/summary/?client_id={BENCH_CLIENT}',
+    ]
+    urls = [mix[i % len(mix)] for i in range(requests)]
+
+    async_conf = types.ModuleType('vsaver_bench_async_urls')
+    async_conf.urlpatterns = [path('api/', include(api_urls.with_async_reads(api_urls.urlpatterns)))]
+
+    results = []
+    try:
+        with override_settings(VSAVER_RESPONSE_CACHE=False):
+            for label, load, conf in (
+                ('WSGI, sync APIViews', _wsgi_load, 'v_saver_API.urls'),
+                ('ASGI, async views', _asgi_load, async_conf),
+            ):
+                with override_settings(ROOT_URLCONF=conf):
+                    best = None
+                    for _ in range(repeat):
+                        latencies, elapsed = load(urls, concurrency)
+                        if best is None or elapsed < best[1]:
+                            best = (latencies, elapsed)
+                results.append(_load_result(f'{label} x{concurrency}', *best))
+    finally:
+        delete_tenants(BENCH_CLIENT)
+    return results
+
+
+# ── Connections: per request vs persistent vs pooled ──────
+
+@suite('pooling')
+def bench_pooling(rows=20000, repeat=3, concurrency=32, requests=600, **options):
+    """
+    Latency of the request cycle (Django's close_old_connections() on
+    both ends, one indexed query in between) on `concurrency` threads,
+    against the configured PostgreSQL. Point DATABASES at a local
+    stand-in; a remote host only widens the gap.
+    """
+    import copy
+    import importlib.util
+    from concurrent.futures import ThreadPoolExecutor
+    from django.db import DEFAULT_DB_ALIAS, connections
+    from django.db.utils import ConnectionHandler
+
+    from .dbstats import pool_stats
+
+    base = connections[DEFAULT_DB_ALIAS].settings_dict
+    if base['ENGINE'] != 'django.db.backends.postgresql':
+        return [{'name': 'skipped: needs a PostgreSQL database', 'rows': 0, 'seconds': 0}]
+
+    def settings_for(conn_max_age, pool=None):
+        conf = copy.deepcopy(base)
+        conf['CONN_MAX_AGE'] = conn_max_age
+        conf['OPTIONS']      = {k: v for k, v in conf['OPTIONS'].items() if k != 'pool'}
+        if pool:
+            conf['OPTIONS']['pool'] = pool
+        return conf
+
+    modes = [
+        ('new connection per request', settings_for(0)),
+        ('persistent, health-checked', settings_for(600)),
+    ]
+    if importlib.util.find_spec('psycopg_pool'):
+        modes.append(('psycopg_pool', settings_for(0, {'min_size': concurrency, 'max_size': concurrency})))
+    query = 'SELECT code, name FROM acc_master_sync WHERE client_id = %s AND code = %s'
+
+    results = []
+    for label, conf in modes:
+        alias   = f'bench_{len(results)}'
+        handler = ConnectionHandler({DEFAULT_DB_ALIAS: base, alias: conf})   # own alias: pools are kept per alias
+
+        def worker(count):
+            conn, latencies = handler[alias], []
+            try:
+                for _ in range(count):
+                    start = time.perf_counter()
+                    conn.close_if_unusable_or_obsolete()      # request_started
+                    with conn.cursor() as cursor:
+                        cursor.execute(query, [BENCH_CLIENT, 'D000001'])
+                        cursor.fetchall()
+                    conn.close_if_unusable_or_obsolete()      # request_finished
+                    latencies.append(time.perf_counter() - start)
+            finally:
+                conn.close()
+            return latencies
+
+        best = None
+        for _ in range(repeat):
+            shares = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+            start  = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                latencies = [t for part in pool.map(worker, shares) for t in part]
+            elapsed = time.perf_counter() - start
+            if best is None or elapsed < best[1]:
+                best = (latencies, elapsed)
+        result = _load_result(f'{label} x{concurrency}', *best)
+        stats  = pool_stats(handler[alias])
+        if stats is not None:
+            result['pool_wait_ms'] = stats['avg_wait_ms']
+            handler[alias].close_pool()
+        results.append(result)
+
+    if len(modes) < 3:
+        results.append({'name': 'psycopg_pool: not installed, skipped', 'rows': 0, 'seconds': 0})
+    return results
+
+
+# ── Every endpoint through the full stack ─────────────────
+
+def _sample(name, call, samples, records=0, setup=None):
+    """
+    Time `samples` requests made by call() (after an untimed setup()).
+    Reports req/s and p50/p99, or records/s when each request carries
+    `records` rows.
+    """
+    latencies = []
+    for _ in range(samples):
+        if setup:
+            setup()
+        start    = time.perf_counter()
+        response = call()
+        if response.status_code >= 300:
+            raise RuntimeError(f'{name}: HTTP {response.status_code} {response.content[:200]!r}')
+        if response.streaming:
+            b''.join(response.streaming_content)
+        latencies.append(time.perf_counter() - start)
+    result = _load_result(name, latencies, sum(latencies))
+    if records:
+        total = records * samples
+        result.update(rows=total, rows_per_sec=round(total / sum(latencies)), unit='rows')
+    return result
+
+
+@suite('endpoints')
+def bench_endpoints(rows=20000, repeat=3, requests=600, **options):
+    """
+    Every route in api/urls.py through the full Django stack (test client,
+    middleware, routing, rendering) against a synthetic tenant of `rows`
+    invoices and rows/10 debtors, in a transaction that is rolled back.
+    Bulk pushes are timed at several batch sizes, `repeat` times each;
+    reads take requests/20 samples each. The response cache is off, so
+    every sample does the endpoint's full work.
+    """
+    import datetime
+    from urllib.parse import urlencode
+
+    from django.test import Client
+    from django.test.utils import override_settings
+    from django.utils import timezone
+
+    from .renderers import dumps
+    from .synthetic import seed_tenant
+
+    client  = Client()
+    debtors = max(1, rows // 10)
+    samples = max(5, requests // 20)
+    q       = f'client_id={BENCH_CLIENT}'
+
+    def post(url, body, **extra):
+        return client.post(url, dumps(body), content_type='application/json', **extra)
+
+    def invoices(count, first_slno, seed):
+        batch = invoice_records(count, customers=debtors, seed=seed)
+        for rec in batch:
+            rec['slno'] += first_slno - 1
+        return batch
+
+    def run():
+        seed_tenant(BENCH_CLIENT, debtors, rows)
+        results = []
+
+        # Bulk pushes: fresh keys (inserts), then the last batch again (unchanged rows)
+        next_slno = rows + 1
+        for size in (100, 1000, 10000):
+            if size > rows:
+                continue
+            batches = [invoices(size, next_slno + n * size, seed=n) for n in range(repeat)]
+            next_slno += size * repeat
+            fresh = iter(batches)
+            results += [
+                _sample(f'POST invoices/bulk/ x{size} new', lambda: post(
+                    '/api/invoices/bulk/', {'client_id': BENCH_CLIENT, 'records': next(fresh)},
+                ), repeat, records=size),
+                _sample(f'POST invoices/bulk/ x{size} unchanged', lambda: post(
+                    '/api/invoices/bulk/', {'client_id': BENCH_CLIENT, 'records': batches[-1]},
+                ), repeat, records=size),
+            ]
+        renamed = [{**rec, 'name': rec['name'] + '*'} for rec in debtor_records(min(debtors, 1000))]
+        results.append(_sample(f'POST debtors/bulk/ x{len(renamed)} updated', lambda: post(
+            '/api/debtors/bulk/', {'client_id': BENCH_CLIENT, 'records': renamed},
+        ), 1, records=len(renamed)))
+        results.append(_sample('POST invoices/bulk/?async=1 x1000 (queue only)', lambda: post(
+            '/api/invoices/bulk/?async=1', {'client_id': BENCH_CLIENT, 'records': batches[0][:1000]},
+        ), repeat, records=min(1000, len(batches[0]))))
+
+        # Streaming loads and load sessions
+        ndjson = b''.join(dumps(rec) + b'\n' for rec in debtor_records(debtors))
+        results.append(_sample('POST debtors/load/?mode=merge (NDJSON)', lambda: client.post(
+            f'/api/debtors/load/?{q}&mode=merge', ndjson, content_type='application/x-ndjson',
+        ), repeat, records=debtors))
+
+        def session_load():
+            session = client.post(f'/api/debtors/sessions/?{q}').json()['session']
+            post(f'/api/sessions/{session}/batches/?{q}', {'records': debtor_records(debtors)})
+            return client.post(f'/api/sessions/{session}/commit/?{q}')
+        results.append(_sample('load session: start + 1 batch + commit', session_load, repeat, records=debtors))
+
+        # Every dataset in one round trip
+        synced = invoices(min(rows, 1000), 1, seed=repeat)
+        results.append(_sample('POST sync/ (debtors replace, misel, invoices)', lambda: post('/api/sync/', {
+            'client_id': BENCH_CLIENT,
+            'debtors'  : {'mode': 'replace', 'records': debtor_records(debtors)},
+            'misel'    : {'records': [{'firm_name': 'Bench Firm', 'address1': 'Road'}]},
+            'invoices' : {'records': synced},
+        }), repeat, records=debtors + 1 + len(synced)))
+
+        # Reads
+        since = urlencode({'since': (timezone.now() - datetime.timedelta(minutes=5)).isoformat()})
+        month = urlencode({'invdate__gte': (timezone.localdate() - datetime.timedelta(days=30)).isoformat()})
+        job   = post('/api/invoices/bulk/?async=1', {'client_id': BENCH_CLIENT, 'records': []}).json()['job']
+        for name, url, count in (
+            ('GET vsaver/status/', '/api/vsaver/status/', samples),
+            ('GET debtors/ (all)', f'/api/debtors/?{q}', samples),
+            ('GET debtors/?limit=100', f'/api/debtors/?{q}&limit=100', samples),
+            ('GET debtors/?since=', f'/api/debtors/?{q}&{since}', samples),
+            ('GET debtors/<code>/', f'/api/debtors/D000001/?{q}', samples),
+            ('GET debtors/manifest/', f'/api/debtors/manifest/?{q}', samples),
+            ('GET misel/', f'/api/misel/?{q}', samples),
+            ('GET invoices/?limit=100', f'/api/invoices/?{q}&limit=100', samples),
+            ('GET invoices/?customerid=', f'/api/invoices/?{q}&customerid=D000001', samples),
+            ('GET invoices/?fields=slno,nettotal (all)', f'/api/invoices/?{q}&fields=slno,nettotal', max(1, samples // 5)),
+            ('GET invoices/?invdate__gte=&nettotal__gte=', f'/api/invoices/?{q}&{month}&nettotal__gte=500', samples),
+            ('GET debtors/?name__istartswith=&ordering=name', f'/api/debtors/?{q}&name__istartswith=a&ordering=name', samples),
+            ('GET invoices/?stream=ndjson (all)', f'/api/invoices/?{q}&stream=ndjson', max(1, samples // 5)),
+            ('GET invoices/<slno>/', f'/api/invoices/1/?{q}', samples),
+            ('GET invoices/summary/', f'/api/invoices/summary/?{q}', samples),
+            ('GET invoices/summary/?customerid=', f'/api/invoices/summary/?{q}&customerid=D000001', samples),
+            ('GET invoices/analytics/?group_by=day', f'/api/invoices/analytics/?{q}&group_by=day', samples),
+            ('GET invoices/analytics/?group_by=month', f'/api/invoices/analytics/?{q}&group_by=month', samples),
+            ('GET invoices/analytics/?group_by=customer', f'/api/invoices/analytics/?{q}&group_by=customer&limit=10', samples),
+            ('GET invoices/manifest/', f'/api/invoices/manifest/?{q}', samples),
+            ('GET jobs/<id>/', f'/api/jobs/{job}/?{q}', samples),
+        ):
+            results.append(_sample(name, lambda url=url: client.get(url), count))
+
+        # Truncates, each on a freshly reloaded dataset
+        results += [
+            _sample('DELETE invoices/truncate/', lambda: client.delete(f'/api/invoices/truncate/?{q}'), repeat,
+                    records=rows, setup=lambda: seed_tenant(BENCH_CLIENT, debtors, rows)),
+            _sample('DELETE debtors/truncate/', lambda: client.delete(f'/api/debtors/truncate/?{q}'), repeat,
+                    records=debtors, setup=lambda: seed_tenant(BENCH_CLIENT, debtors, 0)),
+            _sample('DELETE misel/truncate/', lambda: client.delete(f'/api/misel/truncate/?{q}'), repeat,
+                    setup=lambda: seed_tenant(BENCH_CLIENT, 1, 0)),
+        ]
+        return results
+
+    # Measures the handlers, not the admission limits of one client
+    with override_settings(VSAVER_RESPONSE_CACHE=False, VSAVER_BULK_RATE_PER_MIN=0, VSAVER_BULK_MAX_CONCURRENT_PER_CLIENT=0):
+        return run_in_rollback(run)
+
+
+# ── Tenant resolution per request ─────────────────────────
+
+@suite('auth')
+def bench_auth(rows=20000, repeat=3, requests=600, **options):
+    """
+    api.auth.resolve_tenant() per request: a ?client_id= caller, an API
+    key answered from the in-process cache, an unknown key (cached as
+    such) and a key looked up in the database every time. The target is
+    under 50µs per request for the cached cases; then a full GET with and
+    without a key, for scale.
+    """
+    from django.test import Client, RequestFactory
+
+    from .auth import KEYS, create_key, resolve_tenant
+
+    calls   = max(1000, requests * 10)
+    factory = RequestFactory()
+
+    def per_call(name, request, setup=None):
+        def run():
+            for _ in range(calls):
+                if setup:
+                    setup()
+                resolve_tenant(request)
+        result = timed(name, calls, run, repeat)
+        result.update(unit='requests', us_per_call=round(result['seconds'] / calls * 1e6, 2))
+        return result
+
+    def run():
+        _, raw = create_key(BENCH_CLIENT, 'benchmark')
+        KEYS.clear()
+        results = [
+            per_call('resolve: ?client_id=, no key', factory.get(f'/?client_id={BENCH_CLIENT}')),
+            per_call('resolve: API key, cached', factory.get('/', HTTP_AUTHORIZATION=f'Api-Key {raw}')),
+            per_call('resolve: unknown API key, cached', factory.get('/', HTTP_X_API_KEY='vs_unknown')),
+        ]
+        calls_db = calls // 10
+        miss     = factory.get('/', HTTP_AUTHORIZATION=f'Api-Key {raw}')
+        result   = timed('resolve: API key, database lookup', calls_db,
+                         lambda: [KEYS.clear() or resolve_tenant(miss) for _ in range(calls_db)], repeat)
+        result.update(unit='requests', us_per_call=round(result['seconds'] / calls_db * 1e6, 2))
+        results.append(result)
+
+        client  = Client()
+        samples = max(5, requests // 5)
+        results += [
+            _sample('GET vsaver/status/ ?client_id=', lambda: client.get(f'/api/vsaver/status/?client_id={BENCH_CLIENT}'), samples),
+            _sample('GET vsaver/status/ API key', lambda: client.get('/api/vsaver/status/', HTTP_AUTHORIZATION=f'Api-Key {raw}'), samples),
+        ]
+        KEYS.clear()
+        return results
+
+    return run_in_rollback(run)
+
+
+# ── Debtor type-ahead search ──────────────────────────────
+
+@suite('search')
+def bench_search(rows=20000, repeat=3, requests=600, **options):
+    """
+    /debtors/search/ on a tenant of rows*5 debtors (100k at the default
+    --rows): search_debtors() per query shape, p50/p99 over `requests`
+    calls each, then the full request. Uses pg_trgm when the database has
+    it, else the in-process index, whose build is timed on its own.
+    """
+    from django.db import router
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    from .search import _index, search_debtors, trigram_ready
+    from .synthetic import seed_tenant
+
+    debtors = rows * 5
+    samples = max(20, requests)
+
+    def run():
+        seed_tenant(BENCH_CLIENT, debtors, 0)
+        alias   = router.db_for_read(AccMaster)
+        backend = 'pg_trgm' if trigram_ready(alias) else 'in-process'
+        results = []
+        if backend == 'in-process':
+            results.append(timed(f'build trigram index ({debtors:,} debtors)', debtors,
+                                 lambda: _index(alias, BENCH_CLIENT), 1))
+        for label, q in (
+            ('2 chars', 'ko'),
+            ('word prefix', 'Kochi'),
+            ('name + number', 'Traders 123'),
+            ('typo', 'Kochii Tradrs'),
+            ('phone digits', '98765'),
+        ):
+            latencies = []
+            for _ in range(samples):
+                start = time.perf_counter()
+                search_debtors(BENCH_CLIENT, q, 20)
+                latencies.append(time.perf_counter() - start)
+            results.append(_load_result(f'search_debtors {label} [{backend}]', latencies, sum(latencies)))
+
+        client = Client()
+        results.append(_sample('GET debtors/search/?q=', lambda: client.get(
+            f'/api/debtors/search/?client_id={BENCH_CLIENT}&q=Kochi+Trad',
+        ), samples))
+        return results
+
+    with override_settings(VSAVER_RESPONSE_CACHE=False):
+        return run_in_rollback(run)
@@ -0,0 +1,186 @@
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+
+DEFAULT_TIMEOUT   = 300               # seconds an entry may live
+DEFAULT_MAX_BYTES = 1024 * 1024       # larger bodies get an ETag but aren't stored
+
+PREFIX = 'vsaver'
+
+
+# Backends whose entries live in one process: a generation bumped there is
+# never seen by the other workers or by `manage.py bulk_worker`
+PROCESS_LOCAL = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def _cache():
+    return caches[getattr(settings, 'VSAVER_CACHE_ALIAS', 'default')]
+
+
+def shared_cache():
+    """Whether the cache holding the generations is seen by every process (redis, db, file on one host)."""
+    alias = getattr(settings, 'VSAVER_CACHE_ALIAS', 'default')
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL
+
+
+def _gen_key(client_id):
+    return f'{PREFIX}:gen:{client_id}'
+
+
+def generation(client_id):
+    """
+    The client's current cache generation. Entries are keyed by it, so
+    moving it on orphans every cached response of that client at once.
+    A generation evicted from the cache just starts a fresh one.
+    """
+    cache = _cache()
+    key   = _gen_key(client_id)
+    gen   = cache.get(key)
+    if gen is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        gen = cache.get(key)
+    return gen
+
+
+async def ageneration(client_id):
+    cache = _cache()
+    key   = _gen_key(client_id)
+    gen   = await cache.aget(key)
+    if gen is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        gen = await cache.aget(key)
+    return gen
+
+
+def _bump(client_id):
+    _cache().set(_gen_key(client_id), time.time_ns(), timeout=None)
+
+
+def invalidate(client_id, using=None):
+    """
+    Drop the client's cached responses. Bumped right away and again on
+    commit: a read that slips in between caches the old rows under the
+    intermediate generation, which the second bump retires.
+    """
+    _bump(client_id)
+    transaction.on_commit(functools.partial(_bump, client_id), using=using)
+
+
+def _client_id(request):
+    # Resolved by api.auth: entries are keyed by the tenant, however it was named
+    return getattr(request, 'tenant', None)
+
+
+def _etag(body):
+    return f'"{hashlib.md5(body).hexdigest()}"'
+
+
+def _entry_key(client_id, gen, endpoint, kwargs, params, fmt):
+    params = sorted(
+        (name, value)
+        for name, values in params.lists() if name != 'client_id'
+        for value in values
+    )
+    shape = repr((endpoint, sorted(kwargs.items()), params, fmt))
+    return f'{PREFIX}:{client_id}:{gen}:{hashlib.md5(shape.encode()).hexdigest()}'
+
+
+def _entry(response):
+    """(etag, body, content type) of a rendered response, and whether it is small enough to store."""
+    body = response.content
+    return (
+        (_etag(body), body, response['Content-Type']),
+        len(body) <= getattr(settings, 'VSAVER_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES),
+    )
+
+
+def _timeout():
+    return getattr(settings, 'VSAVER_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def _conditional(request, response, etag):
+    # Weak comparison: compressed responses carry the ETag as W/"..."
+    matches = {m.removeprefix('W/') for m in parse_etags(request.headers.get('If-None-Match', ''))}
+    if etag in matches or '*' in matches:
+        response = HttpResponseNotModified()
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _enabled(client_id):
+    # Off by default on a process-local cache: a write handled by another
+    # process would leave this one serving the old bodies until they expire
+    return client_id and getattr(settings, 'VSAVER_RESPONSE_CACHE', shared_cache())
+
+
+def cached_response(endpoint):
+    """
+    Cache a GET handler's rendered 200 responses per (client_id, endpoint,
+    URL kwargs, query params, format) under the client's generation, and
+    answer If-None-Match with 304. Streaming responses pass straight through.
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            client_id = _client_id(request)
+            if not _enabled(client_id):
+                return method(view, request, *args, **kwargs)
+
+            key = _entry_key(
+                client_id, generation(client_id), endpoint, kwargs,
+                request.query_params, request.accepted_renderer.format,
+            )
+            cache = _cache()
+            entry = cache.get(key)
+            if entry is None:
+                response = method(view, request, *args, **kwargs)
+                if response.status_code != 200 or response.streaming:
+                    return response
+                response = view.finalize_response(request, response, *args, **kwargs)
+                response.render()
+                entry, store = _entry(response)
+                if store:
+                    cache.set(key, entry, _timeout())
+            else:
+                response = HttpResponse(entry[1], content_type=entry[2])
+            return _conditional(request, response, entry[0])
+        return wrapper
+    return decorate
+
+
+def acached_response(endpoint):
+    """cached_response() for async function views; entries are shared with the sync views."""
+    def decorate(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            client_id = _client_id(request)
+            if not _enabled(client_id):
+                return await view(request, *args, **kwargs)
+
+            key   = _entry_key(client_id, await ageneration(client_id), endpoint, kwargs, request.GET, 'json')
+            cache = _cache()
+            entry = await cache.aget(key)
+            if entry is None:
+                response = await view(request, *args, **kwargs)
+                if response.status_code != 200 or response.streaming:
+                    return response
+                entry, store = _entry(response)
+                if store:
+                    await cache.aset(key, entry, _timeout())
+            else:
+                response = HttpResponse(entry[1], content_type=entry[2])
+            return _conditional(request, response, entry[0])
+        return wrapper
+    return decorate
@@ -0,0 +1,49 @@
+# `manage.py check` (and every runserver / migrate) warnings for settings
+# that only hold up in a single process.
+from django.conf import settings
+from django.core import checks
+
+from .admission import concurrency_limits, rate_limits
+from .caching import shared_cache
+
+
+@checks.register(checks.Tags.caches)
+def check_response_cache(app_configs, **kwargs):
+    if not getattr(settings, 'VSAVER_RESPONSE_CACHE', False) or shared_cache():
+        return []
+    return [checks.Warning(
+        'VSAVER_RESPONSE_CACHE is on with a process-local cache backend.',
+        hint=(
+            'Writes handled by another worker or by bulk_worker will not invalidate this '
+            "process's cached responses. Set VSAVER_CACHE_BACKEND to redis, db or file."
+        ),
+        id='vsaver.W001',
+    )]
+
+
+@checks.register(checks.Tags.database)
+def check_replica_stickiness(app_configs, **kwargs):
+    if not getattr(settings, 'VSAVER_DB_REPLICAS', None) or shared_cache():
+        return []
+    return [checks.Error(
+        'VSAVER_DB_REPLICAS is set but the cache backend is process-local.',
+        hint=(
+            "A client's last write is its cache generation; a write made in another process "
+            'would not keep its next reads off a lagging replica. Set VSAVER_CACHE_BACKEND to redis, db or file.'
+        ),
+        id='vsaver.E002',
+    )]
+
+
+@checks.register(checks.Tags.caches)
+def check_admission_limits(app_configs, **kwargs):
+    if not any(rate_limits()[:1] + concurrency_limits()) or shared_cache():
+        return []
+    return [checks.Warning(
+        'Bulk admission limits are kept in a process-local cache backend.',
+        hint=(
+            'Each worker, and bulk_worker, counts its own token buckets and slots, so the caps apply per '
+            'process. Set VSAVER_CACHE_BACKEND to redis, db or file to make them global.'
+        ),
+        id='vsaver.W003',
+    )]
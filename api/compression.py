@@ -0,0 +1,186 @@
+import gzip
+import io
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstd is offered only when it is installed
+    zstandard = None
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework import status
+from rest_framework.exceptions import APIException, ParseError, UnsupportedMediaType
+
+
+DEFAULT_MIN_BYTES  = 1024     # smaller bodies go out as they are
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_ZSTD_LEVEL = 3
+
+READ_BUFFER = 64 * 1024
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson')
+
+
+class PayloadTooLarge(APIException):
+    status_code    = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Decompressed request body is too large.'
+    default_code   = 'payload_too_large'
+
+
+def request_encodings():
+    return ('gzip', 'x-gzip', 'zstd') if zstandard else ('gzip', 'x-gzip')
+
+
+# ── Request bodies ────────────────────────────────────────
+
+class _Decoded(io.RawIOBase):
+    """Raw stream of a decoder's output that stops at `limit` bytes."""
+
+    def __init__(self, decoder, limit=None):
+        self._decoder = decoder
+        self._limit   = limit
+        self._seen    = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        try:
+            n = self._decoder.readinto(buf)
+        except (OSError, EOFError, zlib.error) as exc:
+            raise ParseError(f'Malformed compressed body ({exc}).')
+        except Exception as exc:
+            if zstandard and isinstance(exc, zstandard.ZstdError):
+                raise ParseError(f'Malformed compressed body ({exc}).')
+            raise
+        self._seen += n
+        if self._limit is not None and self._seen > self._limit:
+            raise PayloadTooLarge()
+        return n
+
+
+def decoded_stream(stream, encoding, limit=None):
+    """
+    Wrap a request body stream so reading it yields the decoded bytes of a
+    Content-Encoding: gzip / zstd body, a buffer at a time. The body is
+    never decompressed as a whole; `limit` caps how much may come out.
+    """
+    encoding = (encoding or '').strip().lower()
+    if stream is None or encoding in ('', 'identity'):
+        return stream
+    if encoding not in request_encodings():
+        raise UnsupportedMediaType(encoding, detail=f'Unsupported Content-Encoding "{encoding}".')
+    if encoding == 'zstd':
+        decoder = zstandard.ZstdDecompressor().stream_reader(stream, read_across_frames=True)
+    else:
+        decoder = gzip.GzipFile(fileobj=stream, mode='rb')
+    return io.BufferedReader(_Decoded(decoder, limit), READ_BUFFER)
+
+
+# ── Responses ─────────────────────────────────────────────
+
+def _accepted(header):
+    """Codings from an Accept-Encoding header with q > 0."""
+    codings = set()
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name and q > 0:
+            codings.add(name.strip().lower())
+    return codings
+
+
+def negotiate(header):
+    """The coding to answer with (zstd before gzip), or None."""
+    accepted = _accepted(header or '')
+    if zstandard and 'zstd' in accepted:
+        return 'zstd'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(body, coding):
+    if coding == 'zstd':
+        return zstandard.ZstdCompressor(
+            level=getattr(settings, 'VSAVER_ZSTD_LEVEL', DEFAULT_ZSTD_LEVEL),
+        ).compress(body)
+    return gzip.compress(body, getattr(settings, 'VSAVER_GZIP_LEVEL', DEFAULT_GZIP_LEVEL), mtime=0)
+
+
+def _compressor(coding):
+    """(compress(chunk), flush()) pair for streaming one response."""
+    if coding == 'zstd':
+        obj = zstandard.ZstdCompressor(
+            level=getattr(settings, 'VSAVER_ZSTD_LEVEL', DEFAULT_ZSTD_LEVEL),
+        ).compressobj()
+        return (
+            lambda chunk: obj.compress(chunk) + obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            obj.flush,
+        )
+    obj = zlib.compressobj(getattr(settings, 'VSAVER_GZIP_LEVEL', DEFAULT_GZIP_LEVEL), zlib.DEFLATED, 31)
+    # Flush per chunk so an NDJSON reader gets rows as they are produced
+    return lambda chunk: obj.compress(chunk) + obj.flush(zlib.Z_SYNC_FLUSH), obj.flush
+
+
+def _compress_stream(chunks, coding):
+    step, finish = _compressor(coding)
+    for chunk in chunks:
+        out = step(chunk)
+        if out:
+            yield out
+    yield finish()
+
+
+async def _acompress_stream(chunks, coding):
+    step, finish = _compressor(coding)
+    async for chunk in chunks:
+        out = step(chunk)
+        if out:
+            yield out
+    yield finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    gzip / zstd for JSON and NDJSON responses, picked from Accept-Encoding.
+    Streams are compressed as they go out. Works for the sync and the
+    async views alike; the ETag becomes weak, as with Django's GZipMiddleware.
+    """
+
+    def process_response(self, request, response):
+        if not getattr(settings, 'VSAVER_RESPONSE_COMPRESSION', True) or response.has_header('Content-Encoding'):
+            return response
+        if response.get('Content-Type', '').split(';')[0].strip() not in COMPRESSIBLE_TYPES:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        coding = negotiate(request.headers.get('Accept-Encoding'))
+        if coding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = _acompress_stream(response.streaming_content, coding)
+            else:
+                response.streaming_content = _compress_stream(response.streaming_content, coding)
+            del response['Content-Length']
+        else:
+            if len(response.content) < getattr(settings, 'VSAVER_COMPRESS_MIN_BYTES', DEFAULT_MIN_BYTES):
+                return response
+            response.content = compress(response.content, coding)
+            response['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = coding
+        return response
@@ -0,0 +1,53 @@
+import collections
+import threading
+
+from django.db import connections
+
+from .routing import in_flight
+
+
+_opened = collections.Counter()
+_lock   = threading.Lock()
+
+
+def count_connection(sender, connection, **kwargs):
+    """connection_created receiver: one more handshake paid on this alias."""
+    with _lock:
+        _opened[connection.alias] += 1
+
+
+def mode(connection):
+    if connection.settings_dict['OPTIONS'].get('pool'):
+        return 'pool'
+    return 'persistent' if connection.settings_dict['CONN_MAX_AGE'] != 0 else 'per-request'
+
+
+def pool_stats(connection):
+    """
+    psycopg_pool counters for a pooled alias, plus the mean wait for a
+    connection; None otherwise. Counters run since the pool opened.
+    """
+    pool = getattr(connection, 'pool', None) if mode(connection) == 'pool' else None
+    if pool is None:
+        return None
+    stats = pool.get_stats()
+    num   = stats.get('requests_num', 0)
+    return {**stats, 'avg_wait_ms': round(stats.get('requests_wait_ms', 0) / num, 3) if num else 0}
+
+
+def database_stats():
+    """Per-alias connection reuse settings and counters for this process."""
+    reads = in_flight()
+    out   = {}
+    for alias in connections:
+        connection = connections[alias]
+        out[alias] = {
+            'vendor'            : connection.vendor,
+            'mode'              : mode(connection),
+            'conn_max_age'      : connection.settings_dict['CONN_MAX_AGE'],
+            'health_checks'     : connection.settings_dict['CONN_HEALTH_CHECKS'],
+            'connections_opened': _opened[alias],
+            'pool'              : pool_stats(connection),
+            **({'reads_in_flight': reads[alias]} if alias in reads else {}),
+        }
+    return out
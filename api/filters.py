@@ -0,0 +1,56 @@
+from django.core.exceptions import ValidationError
+
+from .pagination import Keyset
+
+
+class ListSpec:
+    """
+    What a list endpoint lets the caller narrow and sort by, declared on
+    the view. `filters` maps a query param to the ORM lookup it applies
+    (the param is the lookup unless given otherwise); `orderings` maps
+    each ?ordering= value to the column order an index of the table can
+    serve, the first being the default. ?fields= picks serializer fields.
+
+    The methods raise ValueError with a message for the caller on bad
+    input; params left empty are ignored.
+    """
+
+    def __init__(self, filters=(), orderings=None):
+        self.filters   = {param: param for param in filters} if not isinstance(filters, dict) else dict(filters)
+        self.orderings = {name: Keyset(*order) for name, order in (orderings or {}).items()}
+        self.default   = next(iter(self.orderings.values()))
+
+    def filter(self, qs, params):
+        """`qs` narrowed by every filter param present."""
+        lookups = {}
+        for param, lookup in self.filters.items():
+            raw = params.get(param, '').strip()
+            if not raw:
+                continue
+            field = qs.model._meta.get_field(lookup.split('__')[0])
+            try:
+                lookups[lookup] = raw if lookup.endswith('startswith') else field.to_python(raw)
+            except ValidationError:
+                raise ValueError(f'Invalid {param}={raw!r}.')
+        return qs.filter(**lookups) if lookups else qs
+
+    def ordering(self, params):
+        """The Keyset of ?ordering=, or the default one."""
+        name = params.get('ordering', '').strip()
+        if not name:
+            return self.default
+        if name not in self.orderings:
+            raise ValueError(f"ordering must be one of {', '.join(self.orderings)}.")
+        return self.orderings[name]
+
+    def fields(self, params, serializer_class):
+        """The serializer fields asked for with ?fields=a,b (in their declared order), or all of them."""
+        declared = list(serializer_class.Meta.fields)
+        raw      = params.get('fields', '').strip()
+        if not raw:
+            return declared
+        asked   = {name.strip() for name in raw.split(',') if name.strip()}
+        unknown = sorted(asked - set(declared))
+        if unknown:
+            raise ValueError(f"Unknown field(s) {', '.join(unknown)}; choose from {', '.join(declared)}.")
+        return [name for name in declared if name in asked] or declared
@@ -0,0 +1,48 @@
+import decimal
+import hashlib
+
+
+# Business fields fingerprinted per model, in hashing order.
+HASH_FIELDS = {
+    'accmaster' : ('code', 'name', 'place', 'exregnodate', 'super_code', 'phone2'),
+    'misel'     : ('firm_name', 'address1'),
+    'accinvmast': ('slno', 'invdate', 'customerid', 'nettotal'),
+}
+
+SEPARATOR = '\x1f'
+NULL      = '\\N'
+
+
+def hash_fields(model):
+    return HASH_FIELDS.get(model._meta.model_name)
+
+
+def _canonicalizer(field):
+    if field.get_internal_type() == 'DecimalField':
+        # Round half away from zero, as PostgreSQL numeric does
+        exp = decimal.Decimal(1).scaleb(-field.decimal_places)
+        return lambda v: f'{v.quantize(exp, rounding=decimal.ROUND_HALF_UP):f}'
+    if field.get_internal_type() in ('DateField', 'DateTimeField'):
+        return lambda v: v.isoformat()
+    return str
+
+
+def hasher(model):
+    """
+    Return row -> MD5 hex of the record's business fields, or None when
+    `model` isn't fingerprinted. Desktop clients compute the same thing:
+    each field coerced the way the column stores it (dates ISO-8601,
+    decimals padded to the column's scale, NULL as \\N), joined with U+001F.
+    """
+    names = hash_fields(model)
+    if names is None:
+        return None
+    fields = [(f.name, f.to_python, _canonicalizer(f)) for f in map(model._meta.get_field, names)]
+
+    def row_hash(row):
+        parts = []
+        for name, to_python, canonical in fields:
+            value = to_python(row.get(name))
+            parts.append(NULL if value is None else canonical(value))
+        return hashlib.md5(SEPARATOR.join(parts).encode('utf-8')).hexdigest()
+    return row_hash
@@ -0,0 +1,142 @@
+import datetime
+import logging
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .admission import worker_slot
+from .models import BulkJob
+from .serializers import BulkAccMasterSerializer, BulkMiselSerializer, BulkAccInvMastSerializer
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CHUNK_SIZE  = 5000
+DEFAULT_STALE_AFTER = 300     # seconds without a heartbeat before a running job is retaken
+MAX_ATTEMPTS        = 3
+
+# Bulk serializer whose apply() writes each entity's pushes
+APPLIERS = {
+    'accmaster' : BulkAccMasterSerializer,
+    'misel'     : BulkMiselSerializer,
+    'accinvmast': BulkAccInvMastSerializer,
+}
+
+
+def chunk_size():
+    return max(1, int(getattr(settings, 'VSAVER_JOB_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)))
+
+
+def stale_after():
+    return datetime.timedelta(seconds=getattr(settings, 'VSAVER_JOB_STALE_AFTER', DEFAULT_STALE_AFTER))
+
+
+def submit(entity, validated_data, batch_id=None):
+    """
+    Queue a validated bulk push. Returns (job, created); a batch_id the
+    client already used for this entity returns the existing job instead.
+    """
+    client_id = validated_data['client_id']
+    if batch_id:
+        job = BulkJob.objects.filter(client_id=client_id, entity=entity, batch_id=batch_id).first()
+        if job:
+            return job, False
+    try:
+        with transaction.atomic():
+            job = BulkJob.objects.create(
+                client_id = client_id,
+                entity    = entity,
+                batch_id  = batch_id or None,
+                payload   = {'records': validated_data['records'], 'deleted': validated_data['deleted']},
+                rejected  = validated_data['rejected'],
+                total     = len(validated_data['records']),
+            )
+    except IntegrityError:
+        # Same batch_id submitted concurrently: the other request won
+        return BulkJob.objects.get(client_id=client_id, entity=entity, batch_id=batch_id), False
+    return job, True
+
+
+def _claimable():
+    # Queued, or running under a worker that went quiet
+    return BulkJob.objects.filter(
+        Q(status=BulkJob.QUEUED) | Q(status=BulkJob.RUNNING, updated_at__lt=timezone.now() - stale_after())
+    )
+
+
+def claim():
+    """
+    Take the oldest queued job, or a running one whose worker went quiet,
+    and mark it running. Returns None when there is nothing to do.
+    """
+    with transaction.atomic():
+        qs = _claimable().order_by('created_at')
+        if connection.features.has_select_for_update_skip_locked:
+            qs = qs.select_for_update(skip_locked=True)
+        job = qs.first()
+        if job is None:
+            return None
+        job.status    = BulkJob.RUNNING
+        job.attempts += 1
+        job.save(update_fields=['status', 'attempts', 'updated_at'])
+    return job
+
+
+def run(job):
+    """
+    Apply a claimed job chunk by chunk. Each chunk commits together with
+    the job's counters, so /jobs/<id>/ shows live progress and a job
+    retaken after a crash resumes at `processed` (upserts are idempotent,
+    so replaying a chunk is harmless).
+    """
+    if job.attempts > MAX_ATTEMPTS:
+        return _finish(job, BulkJob.FAILED, f'Gave up after {MAX_ATTEMPTS} attempts.')
+
+    apply   = APPLIERS[job.entity].apply
+    records = job.payload['records']
+    size    = chunk_size()
+    try:
+        # Always at least one pass, so a deletes-only push still runs
+        for start in range(job.processed, max(len(records), 1), size):
+            chunk = records[start:start + size]
+            with transaction.atomic():
+                result = apply(job.client_id, chunk, job.payload['deleted'] if start == 0 else [])
+                BulkJob.objects.filter(pk=job.pk).update(
+                    processed  = F('processed') + len(chunk),
+                    created    = F('created') + result['created'],
+                    updated    = F('updated') + result['updated'],
+                    unchanged  = F('unchanged') + result['unchanged'],
+                    deleted    = F('deleted') + result['deleted'],
+                    updated_at = timezone.now(),
+                )
+    except Exception as exc:
+        logger.exception(f"[JOB] {job.id} {job.entity} client={job.client_id} failed")
+        return _finish(job, BulkJob.FAILED, str(exc))
+    return _finish(job, BulkJob.DONE)
+
+
+def _finish(job, status, error=None):
+    # A failed job keeps its payload for inspection
+    fields = {'payload': None} if status == BulkJob.DONE else {}
+    BulkJob.objects.filter(pk=job.pk).update(
+        status=status, error=error, finished_at=timezone.now(), updated_at=timezone.now(), **fields,
+    )
+    job.refresh_from_db()
+    return job
+
+
+def run_next():
+    """
+    Claim and run one job; returns it, or None if the queue is empty. Jobs
+    take a slot of the global bulk write cap, waiting for one if need be;
+    an idle poll doesn't, so it never holds a slot from web pushes. The
+    claim is made under the slot, so a job isn't left marked running (and
+    open to being retaken as stale) while its worker waits.
+    """
+    if not _claimable().exists():
+        return None
+    with worker_slot():
+        job = claim()
+        return run(job) if job else None
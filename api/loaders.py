@@ -0,0 +1,347 @@
+import csv
+import io
+import itertools
+import json
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ParseError, UnsupportedMediaType
+
+from . import metrics
+from .caching import invalidate
+from .compression import decoded_stream
+from .hashing import hasher
+from .models import LoadSessionBatch, SyncTombstone
+from .partitions import is_partitioned
+from .tombstones import entity, record_deleted
+from .upsert import bulk_upsert, get_batch_size
+from .validation import validate_records
+
+
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+CSV_TYPES    = ('text/csv', 'application/csv')
+
+COPY_CHUNK_BYTES = 64 * 1024
+COPY_NULL        = r'\N'
+
+
+# ── Body parsing (one row at a time) ──────────────────────
+
+def _iter_ndjson(stream, columns):
+    for lineno, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError as exc:
+            raise ParseError(f'Line {lineno}: invalid JSON ({exc}).')
+        if not isinstance(obj, dict):
+            raise ParseError(f'Line {lineno}: expected a JSON object.')
+        yield lineno, {c: obj.get(c) for c in columns}
+
+
+def _iter_csv(stream, columns):
+    reader = csv.reader(line.decode('utf-8-sig') for line in stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    header = [h.strip() for h in header]
+    index  = [(c, header.index(c) if c in header else None) for c in columns]
+    for row in reader:
+        if not row:
+            continue
+        # Missing columns and empty cells are NULLs, not empty strings
+        yield reader.line_num, {
+            c: (row[i] if i is not None and i < len(row) and row[i] != '' else None)
+            for c, i in index
+        }
+
+
+def _numbered_records(request, columns):
+    media_type = (request.content_type or '').split(';')[0].strip().lower()
+    stream     = decoded_stream(request.stream, request.headers.get('Content-Encoding'))
+    if stream is None:
+        return iter(())
+    if media_type in NDJSON_TYPES:
+        return _iter_ndjson(stream, columns)
+    if media_type in CSV_TYPES:
+        return _iter_csv(stream, columns)
+    raise UnsupportedMediaType(media_type)
+
+
+def iter_records(request, columns):
+    """
+    Yield one dict per record from an NDJSON or CSV request body without
+    reading the whole body into memory. gzip / zstd bodies are decoded on
+    the fly.
+    """
+    return (rec for _, rec in _numbered_records(request, columns))
+
+
+def iter_valid_records(request, model, key, columns):
+    """
+    iter_records(), coerced to `model`'s column types by validate_records()
+    a batch at a time as the body streams. The first bad value raises
+    ParseError naming its line and column, which rolls the load back.
+    """
+    rows = _numbered_records(request, columns)
+
+    def validated():
+        size = get_batch_size()
+        while chunk := list(itertools.islice(rows, size)):
+            typed, refused = validate_records(model, columns, [rec for _, rec in chunk], required=(key,))
+            if refused:
+                column, message = next(iter(refused[0]['errors'].items()))
+                raise ParseError(f"Line {chunk[refused[0]['index']][0]}: {column}: {message}")
+            yield from typed
+    return validated()
+
+
+# ── PostgreSQL: COPY into a temp staging table, then merge ──
+
+class _ChunkReader:
+    """File-like wrapper over a generator of str chunks (psycopg2 copy_expert)."""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buf    = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buf) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buf += chunk
+        if size < 0:
+            out, self._buf = self._buf, ''
+        else:
+            out, self._buf = self._buf[:size], self._buf[size:]
+        return out
+
+
+def _csv_field(value):
+    if value is None:
+        return COPY_NULL
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _csv_chunks(records, columns, row_hash=None):
+    # Every value is quoted, and COPY only takes an unquoted \N for NULL,
+    # so a string that reads \N stays a string
+    buf = io.StringIO()
+    for rec in records:
+        values = [rec[c] for c in columns]
+        if row_hash:
+            values.append(row_hash(rec))
+        buf.write(','.join(map(_csv_field, values)) + '\n')
+        if buf.tell() >= COPY_CHUNK_BYTES:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def _copy(cursor, sql, chunks):
+    raw = cursor.cursor
+    if hasattr(raw, 'copy'):                       # psycopg 3
+        with raw.copy(sql) as copy:
+            for chunk in chunks:
+                copy.write(chunk)
+    else:                                          # psycopg2
+        raw.copy_expert(sql, _ChunkReader(chunks))
+
+
+def _copy_fill(records, columns, row_hash):
+    def fill(cursor, stage, cols):
+        _copy(
+            cursor,
+            f"COPY {stage} ({cols}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+            _csv_chunks(records, columns, row_hash),
+        )
+    return fill
+
+
+def _session_fill(conn, session_id):
+    # Batches hold JSON arrays of {column: value, 'row_hash': ...} objects
+    qn    = conn.ops.quote_name
+    batch = LoadSessionBatch._meta
+
+    def fill(cursor, stage, cols):
+        cursor.execute(
+            f"INSERT INTO {stage} ({cols}) "
+            f"SELECT {cols} FROM {qn(batch.db_table)} b "
+            f"CROSS JOIN LATERAL ROWS FROM (jsonb_populate_recordset(NULL::{stage}, b.{qn('records')})) "
+            f"WITH ORDINALITY AS r "
+            f"WHERE b.{qn(batch.get_field('session').column)} = %s "
+            f"ORDER BY b.{qn('id')}, r.ordinality",
+            [session_id],
+        )
+    return fill
+
+
+def _pg_load(conn, model, key, columns, client_id, fill, replace):
+    qn       = conn.ops.quote_name
+    table    = qn(model._meta.db_table)
+    stage    = qn(f'{model._meta.db_table}_load')
+    row_hash = hasher(model)
+    fields   = [model._meta.get_field(c) for c in columns]
+    if row_hash:
+        fields.append(model._meta.get_field('row_hash'))
+    kcol   = qn(model._meta.get_field(key).column)
+    cols   = ', '.join(qn(f.column) for f in fields)
+    now    = timezone.now()
+    counts = {'deleted': 0}
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMP TABLE {stage} ("
+            f"_seq bigserial, "
+            + ', '.join(f'{qn(f.column)} {f.db_type(conn)}' for f in fields)
+            + ") ON COMMIT DROP"
+        )
+        with conn.wrap_database_errors:
+            fill(cursor, stage, cols)
+        cursor.execute(f"ANALYZE {stage}")
+        cursor.execute(f"SELECT count(*), count(DISTINCT {kcol}) FROM {stage}")
+        counts['total'], distinct = cursor.fetchone()
+
+        if replace:
+            # Rows missing from the load go, each leaving a tombstone
+            tomb = SyncTombstone._meta
+            cursor.execute(
+                f"WITH gone AS ("
+                f"DELETE FROM {table} t WHERE t.{qn('client_id')} = %s "
+                f"AND NOT EXISTS (SELECT 1 FROM {stage} s WHERE s.{kcol} = t.{kcol}) "
+                f"RETURNING t.{kcol}"
+                f") INSERT INTO {qn(tomb.db_table)} "
+                f"({', '.join(qn(tomb.get_field(f).column) for f in ('client_id', 'entity', 'key', 'deleted_at'))}) "
+                f"SELECT %s, %s, CAST({kcol} AS text), %s FROM gone",
+                [client_id, client_id, entity(model), now],
+            )
+            counts['deleted'] = cursor.rowcount
+
+        updates = ', '.join(
+            f'{qn(c)} = EXCLUDED.{qn(c)}'
+            for c in [f.column for f in fields if f.name != key] + ['synced_at']
+        )
+        skip_same = 'WHERE t.row_hash IS DISTINCT FROM EXCLUDED.row_hash ' if row_hash else ''
+        upsert    = (
+            f"INSERT INTO {table} AS t ({cols}, {qn('client_id')}, {qn('synced_at')}) "
+            f"SELECT DISTINCT ON ({kcol}) {cols}, %s, %s FROM {stage} ORDER BY {kcol}, _seq DESC "
+            f"ON CONFLICT ({kcol}, {qn('client_id')}) DO UPDATE SET {updates} {skip_same}"
+        )
+        if not is_partitioned(model, conn):
+            cursor.execute(
+                f"WITH up AS ({upsert}RETURNING (xmax = 0) AS inserted) "
+                f"SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM up",
+                [client_id, now],
+            )
+            counts['created'], counts['updated'] = cursor.fetchone()
+        else:
+            # A partitioned table has no xmax to RETURNING: count the new keys first
+            cursor.execute(
+                f"SELECT count(*) FROM (SELECT DISTINCT {kcol} FROM {stage}) s WHERE NOT EXISTS "
+                f"(SELECT 1 FROM {table} t WHERE t.{qn('client_id')} = %s AND t.{kcol} = s.{kcol})",
+                [client_id],
+            )
+            counts['created'] = cursor.fetchone()[0]
+            cursor.execute(upsert, [client_id, now])
+            counts['updated'] = cursor.rowcount - counts['created']
+        counts['unchanged'] = distinct - counts['created'] - counts['updated']
+        # Rows collapsed by DISTINCT ON still count as updates
+        counts['updated'] += counts['total'] - distinct
+        # Dropped now, not just at commit, so a second load in the same
+        # transaction (an outer atomic block) can stage again
+        cursor.execute(f"DROP TABLE {stage}")
+    return counts
+
+
+# ── Fallback (SQLite / tests): batched bulk_upsert ────────
+
+def _orm_load(using, model, key, client_id, records, replace):
+    key_field = model._meta.get_field(key)
+    size      = get_batch_size()
+    seen      = set()
+    counts    = {'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0, 'total': 0}
+    batch     = []
+
+    def flush():
+        result = bulk_upsert(model, client_id, batch, key=key, using=using)
+        for name in ('created', 'updated', 'unchanged'):
+            counts[name] += result[name]
+        batch.clear()
+
+    for rec in records:
+        seen.add(key_field.to_python(rec[key]))
+        batch.append(rec)
+        counts['total'] += 1
+        if len(batch) >= size:
+            flush()
+    if batch:
+        flush()
+
+    if replace:
+        qs    = model.objects.using(using).filter(client_id=client_id)
+        stale = [k for k in qs.values_list(key, flat=True).iterator() if k not in seen]
+        for start in range(0, len(stale), size):
+            chunk      = stale[start:start + size]
+            deleted, _ = qs.filter(**{f'{key}__in': chunk}).delete()
+            record_deleted(model, client_id, chunk, using=using)
+            counts['deleted'] += deleted
+    return counts
+
+
+def load_records(model, key, columns, client_id, records, replace=True):
+    """
+    Load a stream of record dicts for one client in a single transaction.
+
+    With replace=True the client's rows end up exactly matching the load:
+    rows missing from it are deleted (and tombstoned). With replace=False it is a plain
+    upsert. On PostgreSQL the stream is piped through COPY into a temp
+    staging table, so memory stays flat regardless of payload size.
+
+    Returns {'created', 'updated', 'unchanged', 'deleted', 'total'}.
+    """
+    using = router.db_for_write(model)
+    conn  = connections[using]
+    invalidate(client_id, using=using)
+    with transaction.atomic(using=using):
+        if conn.vendor == 'postgresql':
+            fill   = _copy_fill(records, columns, hasher(model))
+            result = _pg_load(conn, model, key, columns, client_id, fill, replace)
+        else:
+            result = _orm_load(using, model, key, client_id, records, replace)
+    metrics.add_rows(result['created'] + result['updated'] + result['deleted'])
+    return result
+
+
+def _session_records(using, session_id, columns):
+    ids = list(
+        LoadSessionBatch.objects.using(using)
+        .filter(session_id=session_id).order_by('id').values_list('id', flat=True)
+    )
+    for batch_id in ids:
+        records = LoadSessionBatch.objects.using(using).values_list('records', flat=True).get(id=batch_id)
+        for rec in records:
+            yield {c: rec.get(c) for c in columns}
+
+
+def load_session_batches(model, key, columns, client_id, session_id, replace=True):
+    """
+    load_records() fed from a load session's stored batches, in upload
+    order. On PostgreSQL the batches are expanded into the staging table
+    by one INSERT ... SELECT, so nothing passes back through Python.
+    """
+    using = router.db_for_write(model)
+    conn  = connections[using]
+    invalidate(client_id, using=using)
+    with transaction.atomic(using=using):
+        if conn.vendor == 'postgresql':
+            fill   = _session_fill(conn, session_id)
+            result = _pg_load(conn, model, key, columns, client_id, fill, replace)
+        else:
+            result = _orm_load(using, model, key, client_id, _session_records(using, session_id, columns), replace)
+    metrics.add_rows(result['created'] + result['updated'] + result['deleted'])
+    return result
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.auth import create_key, revoke_keys
+from api.models import ApiKey
+
+
+class Command(BaseCommand):
+    help = (
+        'Issue, revoke and list tenant API keys. A new key is printed once and only its '
+        'sha256 is stored; send it as "Authorization: Api-Key <key>" or X-API-Key.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--create', metavar='CLIENT_ID', help='Issue a key for this client_id.')
+        parser.add_argument('--name', default='', help='Label for --create, e.g. the machine it is installed on.')
+        parser.add_argument('--revoke', metavar='PREFIX', help='Revoke the active key(s) starting with PREFIX.')
+        parser.add_argument('--client', help='Only list the keys of this client_id.')
+
+    def handle(self, *args, **options):
+        if options['create']:
+            key, raw = create_key(options['create'].strip(), options['name'])
+            self.stdout.write(self.style.SUCCESS(f'Key for {key.client_id} (shown only now):'))
+            self.stdout.write(raw)
+            return
+        if options['revoke']:
+            if len(options['revoke']) < 6:
+                raise CommandError('Give at least the first 6 characters of the key to revoke.')
+            count = revoke_keys(options['revoke'])
+            if not count:
+                raise CommandError(f"No active key starts with {options['revoke']!r}.")
+            self.stdout.write(self.style.SUCCESS(f'{count} key(s) revoked.'))
+            return
+
+        keys = ApiKey.objects.order_by('client_id', 'created_at')
+        if options['client']:
+            keys = keys.filter(client_id=options['client'])
+        for key in keys:
+            state = f'revoked {key.revoked_at:%Y-%m-%d}' if key.revoked_at else 'active'
+            self.stdout.write(f'  {key.prefix:<14} {key.client_id:<30} {key.name:<24} {key.created_at:%Y-%m-%d}  {state}')
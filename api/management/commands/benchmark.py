@@ -0,0 +1,97 @@
+import datetime
+import json
+import platform
+import subprocess
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.benchmarks import SUITES
+
+
+class Command(BaseCommand):
+    help = (
+        'Run one or more benchmark suites and print rows/sec (optionally write a JSON report). '
+        'Runs against the configured database; use --settings to point it at a local SQLite or PostgreSQL.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('suites', nargs='*', help=f'Suites to run (default: all). Available: {", ".join(sorted(SUITES))}')
+        parser.add_argument('--rows', type=int, default=20000, help='Rows per synthetic dataset.')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement; the best is kept.')
+        parser.add_argument('--concurrency', type=int, default=32, help='Requests in flight for the load-test suites.')
+        parser.add_argument('--requests', type=int, default=600, help='Requests per run for the load-test suites.')
+        parser.add_argument('--json', dest='json_path', help='Write the results to this file as JSON.')
+        parser.add_argument('--compare', dest='compare_path', help='A previous --json report to print changes against.')
+
+    def handle(self, *args, **options):
+        names   = options['suites'] or sorted(SUITES)
+        unknown = [n for n in names if n not in SUITES]
+        if unknown:
+            raise CommandError(f'Unknown suite(s): {", ".join(unknown)}. Available: {", ".join(sorted(SUITES))}')
+        baseline = self._load(options['compare_path']) if options['compare_path'] else {}
+
+        report = {'meta': self._meta(options), 'suites': {}}
+        for name in names:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'── {name}'))
+            results = SUITES[name](
+                rows=options['rows'], repeat=options['repeat'],
+                concurrency=options['concurrency'], requests=options['requests'],
+            )
+            report['suites'][name] = results
+            before = {r['name']: r for r in baseline.get(name, [])}
+            for r in results:
+                rate = f"{r['rows_per_sec']:>12,} {r.get('unit', 'rows')}/s" if r.get('rows_per_sec') else ''
+                if 'us_per_call' in r:
+                    rate += f"  {r['us_per_call']}µs each"
+                if 'p99_ms' in r:
+                    rate += f"  p50 {r['p50_ms']}ms  p99 {r['p99_ms']}ms"
+                self.stdout.write(f"  {r['name']:<55} {r['seconds']:>10.4f}s {rate}{self._change(r, before)}")
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['json_path']}"))
+
+    def _meta(self, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, timeout=10,
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+        return {
+            'commit'     : commit,
+            'time'       : datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'database'   : connection.vendor,
+            'python'     : platform.python_version(),
+            'django'     : django.get_version(),
+            'rows'       : options['rows'],
+            'repeat'     : options['repeat'],
+            'concurrency': options['concurrency'],
+            'requests'   : options['requests'],
+        }
+
+    def _load(self, path):
+        try:
+            with open(path) as fh:
+                data = json.load(fh)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Cannot read {path}: {exc}')
+        # Reports written before the meta block are a bare {suite: results}
+        return data.get('suites', data)
+
+    def _change(self, result, before):
+        """'  (+12.3% time, p99 -4.0%)' against the baseline result of the same name."""
+        old = before.get(result['name'])
+        if not old or not old.get('seconds'):
+            return ''
+        parts = [f"{(result['seconds'] / old['seconds'] - 1) * 100:+.1f}% time"]
+        if old.get('p99_ms') and 'p99_ms' in result:
+            parts.append(f"p99 {(result['p99_ms'] / old['p99_ms'] - 1) * 100:+.1f}%")
+        text  = f"  ({', '.join(parts)})"
+        style = self.style.ERROR if result['seconds'] > old['seconds'] * 1.1 else self.style.SUCCESS
+        return style(text)
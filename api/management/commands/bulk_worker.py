@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.jobs import run_next
+
+
+class Command(BaseCommand):
+    help = 'Process queued ?async=1 bulk pushes. Run one or more of these next to the web workers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue, then exit.')
+        parser.add_argument('--poll', type=float, default=1.0, help='Seconds to sleep when the queue is empty.')
+
+    def handle(self, *args, **options):
+        done = 0
+        try:
+            while True:
+                close_old_connections()
+                job = run_next()
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll'])
+                    continue
+                done += 1
+                self.stdout.write(
+                    f'{job.id} {job.entity} client={job.client_id}: {job.status} '
+                    f'({job.processed}/{job.total} rows)'
+                )
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Processed {done} job(s).'))
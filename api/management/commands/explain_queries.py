@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+
+from api.benchmarks import run_in_rollback
+from api.models import AccMaster, AccInvMast, AccInvMastClientSummary, AccInvMastCustomerSummary
+from api.pagination import Keyset
+from api.summaries import sales_by
+from api.synthetic import seed_tenant
+
+
+def view_queries(client_id, code, customerid, slno, invdate=None):
+    """The querysets behind each read view, in the shape the views issue them."""
+    invoices = AccInvMast.objects.filter(client_id=client_id)
+    keyset   = Keyset('-invdate', '-slno')
+    return [
+        ('debtor-list',             AccMaster.objects.filter(client_id=client_id)),
+        ('debtor-detail',           AccMaster.objects.filter(client_id=client_id, code=code)),
+        ('invoice-list',            invoices),
+        ('invoice-list customer',   invoices.filter(customerid=customerid)),
+        ('invoice-list page',       invoices.order_by(*keyset.order_by())[:1000]),
+        ('invoice-list next page',  invoices.filter(keyset.seek([invdate, slno], AccInvMast)[0])
+                                    .order_by(*keyset.order_by())[:1000]),
+        ('invoice-detail',          invoices.filter(slno=slno)),
+        ('invoice-summary',         AccInvMastClientSummary.objects.filter(client_id=client_id)),
+        ('invoice-summary customer', AccInvMastCustomerSummary.objects.filter(client_id=client_id, customerid=customerid)),
+        ('invoice-analytics day',   sales_by(client_id, 'day')),
+        ('invoice-analytics month', sales_by(client_id, 'month')),
+        ('invoice-analytics customer', sales_by(client_id, 'customer')[:10]),
+        ('summary re-aggregation',  invoices.filter(customerid=customerid).order_by()
+                                    .values('customerid').annotate(n=Count('slno'))),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Print EXPLAIN (ANALYZE on PostgreSQL) for every read view's query."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--client', help='Explain against an existing client_id.')
+        parser.add_argument('--seed-debtors', type=int, default=2000, help='Debtors to seed when --client is not given.')
+        parser.add_argument('--seed-invoices', type=int, default=100000, help='Invoices to seed when --client is not given.')
+        parser.add_argument('--fail-on-seqscan', action='store_true',
+                            help='Exit non-zero if any plan sequentially scans a synced table.')
+
+    def handle(self, *args, **options):
+        if options['client']:
+            self._explain(options['client'], options)
+        else:
+            def seeded():
+                seed_tenant('__explain__', options['seed_debtors'], options['seed_invoices'])
+                self._explain('__explain__', options)
+            # Seeded rows are rolled back once the plans are printed
+            run_in_rollback(seeded)
+
+    def _explain(self, client_id, options):
+        is_pg = connection.vendor == 'postgresql'
+        if is_pg:
+            with connection.cursor() as cursor:
+                for model in (AccMaster, AccInvMast):
+                    cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+        sample = AccInvMast.objects.filter(client_id=client_id).exclude(customerid=None).first()
+        code   = AccMaster.objects.filter(client_id=client_id).values_list('code', flat=True).first()
+        if sample is None or code is None:
+            raise CommandError(f'No debtors/invoices for client {client_id!r}.')
+
+        seqscans = []
+        for name, qs in view_queries(client_id, code, sample.customerid, sample.slno, sample.invdate):
+            plan = qs.explain(analyze=True, buffers=True) if is_pg else qs.explain()
+            self.stdout.write(self.style.MIGRATE_HEADING(f'── {name}'))
+            self.stdout.write(plan)
+            if is_pg and ('Seq Scan on acc_' in plan or 'Seq Scan on misel_' in plan):
+                seqscans.append(name)
+
+        if seqscans and options['fail_on_seqscan']:
+            raise CommandError(f'Sequential scans in: {", ".join(seqscans)}')
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.partitions import (
+    is_partitioned, min_rows, partition_table, partitions, split_client, split_large_clients, unpartition_table,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Manage the client_id list partitions of acc_invmast_sync (PostgreSQL). Without options, '
+        'lists them; run --split periodically to move clients that have grown out of DEFAULT.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--split', action='store_true',
+                            help='Give every client with at least --min-rows rows in DEFAULT its own partition.')
+        parser.add_argument('--client', action='append', dest='clients',
+                            help='Give this client_id its own partition now (repeatable), e.g. ahead of a first big load.')
+        parser.add_argument('--min-rows', type=int, default=None, help=f'Threshold for --split/--partition (default {min_rows()}).')
+        parser.add_argument('--partition', action='store_true', help='Convert a plain acc_invmast_sync to partitions.')
+        parser.add_argument('--unpartition', action='store_true', help='Convert it back into a plain table.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Partitioning needs PostgreSQL.')
+
+        if options['unpartition']:
+            if is_partitioned():
+                unpartition_table()
+            self.stdout.write(self.style.SUCCESS('acc_invmast_sync is a plain table.'))
+            return
+        if options['partition'] and not is_partitioned():
+            partition_table(options['min_rows'])
+        if not is_partitioned():
+            raise CommandError('acc_invmast_sync is not partitioned. Run with --partition first.')
+
+        for client_id in options['clients'] or []:
+            moved = split_client(client_id)
+            self.stdout.write(f'{client_id}: ' + ('already has a partition' if moved is None else f'{moved} row(s) moved'))
+        if options['split']:
+            for client_id, moved in split_large_clients(options['min_rows']).items():
+                self.stdout.write(f'{client_id}: {moved} row(s) moved')
+
+        for name, client_id, rows in partitions():
+            self.stdout.write(f"  {name:<40} {'DEFAULT' if client_id is None else client_id:<30} {rows:>12,}")
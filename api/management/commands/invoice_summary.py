@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import AccInvMast, AccInvMastClientSummary
+from api.summaries import rebuild_invoice_summary, verify_invoice_summary
+
+
+class Command(BaseCommand):
+    help = 'Rebuild (default) or verify the invoice summary tables against acc_invmast_sync.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--client', action='append', dest='clients', help='Limit to this client_id (repeatable).')
+        parser.add_argument('--verify', action='store_true', help='Only compare; exit non-zero on any mismatch.')
+
+    def handle(self, *args, **options):
+        clients = options['clients'] or sorted(
+            set(AccInvMast.objects.order_by().values_list('client_id', flat=True).distinct())
+            | set(AccInvMastClientSummary.objects.values_list('client_id', flat=True))
+        )
+
+        if not options['verify']:
+            for client_id in clients:
+                with transaction.atomic():
+                    rebuild_invoice_summary(client_id)
+                self.stdout.write(f'Rebuilt {client_id}')
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(clients)} client(s).'))
+            return
+
+        bad = 0
+        for client_id in clients:
+            for customerid, stored, actual in verify_invoice_summary(client_id):
+                bad += 1
+                self.stdout.write(self.style.ERROR(
+                    f'{client_id} / {customerid}: stored={stored} actual={actual}'
+                ))
+        if bad:
+            raise CommandError(f'{bad} summary row(s) out of date. Run without --verify to rebuild.')
+        self.stdout.write(self.style.SUCCESS(f'{len(clients)} client(s) verified.'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.tombstones import prune, retention
+
+
+class Command(BaseCommand):
+    help = 'Delete sync tombstones older than VSAVER_TOMBSTONE_RETENTION_DAYS (run daily).'
+
+    def handle(self, *args, **options):
+        count = prune(timezone.now() - retention())
+        self.stdout.write(self.style.SUCCESS(f'Pruned {count} tombstone(s).'))
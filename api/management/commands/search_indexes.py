@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.search import create_trigram_indexes, drop_trigram_indexes, trigram_indexes, trigram_ready
+
+
+class Command(BaseCommand):
+    help = (
+        'Show, build or drop the pg_trgm GIN indexes behind /debtors/search/ (PostgreSQL). '
+        'Run --create once pg_trgm is available on a server where migration 0015 found it missing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--create', action='store_true',
+                            help='Install pg_trgm and build the indexes CONCURRENTLY (rebuilding invalid ones).')
+        parser.add_argument('--drop', action='store_true', help='Drop the indexes; search falls back to the in-process index.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Trigram indexes need PostgreSQL; this database searches with the in-process index.')
+
+        if options['create']:
+            if not create_trigram_indexes(connection):
+                raise CommandError('pg_trgm could not be installed (not shipped with this server, or no privilege to CREATE EXTENSION).')
+            self.stdout.write(self.style.SUCCESS('Trigram indexes built. Restart the app processes to search through them.'))
+        elif options['drop']:
+            drop_trigram_indexes(connection)
+            self.stdout.write(self.style.SUCCESS('Trigram indexes dropped.'))
+
+        self.stdout.write(f"pg_trgm: {'installed' if trigram_ready(connection.alias) else 'not installed'}")
+        for name, state in trigram_indexes(connection).items():
+            self.stdout.write(f'  {name:<28} {state}')
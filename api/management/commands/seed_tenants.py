@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.synthetic import delete_tenants, seed_tenant
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate synthetic tenants: N clients x M debtors x K invoices (plus a firm row and '
+        'invoice summaries each), for benchmarks and load tests. Re-running is idempotent.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=3, help='Number of clients (N).')
+        parser.add_argument('--debtors', type=int, default=1000, help='Debtors per client (M).')
+        parser.add_argument('--invoices', type=int, default=20000, help='Invoices per client (K).')
+        parser.add_argument('--prefix', default='synth-', help='client_id prefix; clients are <prefix>001, <prefix>002...')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; client n uses seed + n.')
+        parser.add_argument('--batch-size', type=int, help='Rows per upsert statement (default VSAVER_UPSERT_BATCH_SIZE).')
+        parser.add_argument('--clear', action='store_true', help='Delete every client with the prefix first (with --clients 0, only delete).')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if not prefix:
+            raise CommandError('--prefix must not be empty.')
+        if options['clear']:
+            deleted = delete_tenants(prefix)
+            self.stdout.write(f'Deleted {deleted} row(s) of clients {prefix}*.')
+            if options['clients'] == 0:
+                return
+
+        for n in range(1, options['clients'] + 1):
+            client_id = f'{prefix}{n:03}'
+            start     = time.perf_counter()
+            with transaction.atomic():
+                seed_tenant(
+                    client_id, options['debtors'], options['invoices'],
+                    seed=options['seed'] + n, batch_size=options['batch_size'],
+                )
+            self.stdout.write(
+                f"  {client_id}: {options['debtors']} debtors, {options['invoices']} invoices "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Seeded {options['clients']} client(s)."))
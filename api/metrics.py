@@ -0,0 +1,297 @@
+import bisect
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Request latency histogram buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DEFAULT_SLOW_REQUEST_MS = 1000
+DEFAULT_MAX_CLIENTS     = 100     # client_id label values before the rest are counted as OTHER
+
+OTHER = 'other'
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+# ── Per-request stats ─────────────────────────────────────
+
+class RequestStats:
+    __slots__ = ('client_id', 'queries', 'db', 'serialize', 'rows', 'bytes')
+
+    def __init__(self, client_id):
+        self.client_id = client_id
+        self.queries   = 0
+        self.db        = 0.0
+        self.serialize = 0.0
+        self.rows      = 0
+        self.bytes     = 0
+
+
+_current = contextvars.ContextVar('vsaver_request_stats', default=None)
+
+
+def set_client(client_id):
+    """Attribute the running request to its resolved tenant (api.auth), or a bulk body's client_id."""
+    stats = _current.get()
+    if stats is not None and client_id:
+        stats.client_id = client_id
+
+
+def add_rows(count):
+    """Count rows written or deleted by the running request."""
+    stats = _current.get()
+    if stats is not None:
+        stats.rows += count
+
+
+@contextlib.contextmanager
+def serializing():
+    """Time a block as serialization for the running request."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialize += time.perf_counter() - start
+
+
+def _timed_execute(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db      += time.perf_counter() - start
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """connection_created receiver: time every query run on the connection."""
+    if _timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_timed_execute)
+
+
+# ── Process-wide registry ─────────────────────────────────
+
+class Registry:
+    """
+    Counters and latency histograms keyed by (view, client_id). Per
+    process: with several workers, each one serves its own numbers.
+    Only the first VSAVER_METRICS_MAX_CLIENTS client_ids get series of
+    their own; later ones share the OTHER label, so callers can't grow
+    the registry without bound.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._requests  = {}     # (view, client, method, status) -> count
+            self._totals    = {}     # (view, client) -> [queries, db, serialize, bytes, rows]
+            self._latency   = {}     # (view, client) -> [bucket counts..., +Inf], sum
+            self._clients   = set()  # client labels handed out
+
+    def _client(self, client_id):
+        # Under self._lock
+        if not client_id or client_id in self._clients:
+            return client_id
+        if len(self._clients) >= getattr(settings, 'VSAVER_METRICS_MAX_CLIENTS', DEFAULT_MAX_CLIENTS):
+            return OTHER
+        self._clients.add(client_id)
+        return client_id
+
+    def observe(self, view, method, status, stats, elapsed):
+        with self._lock:
+            key  = (view, self._client(stats.client_id) if client_label() else '')
+            rkey = (*key, method, str(status))
+            self._requests[rkey] = self._requests.get(rkey, 0) + 1
+            totals = self._totals.setdefault(key, [0, 0.0, 0.0, 0, 0])
+            totals[0] += stats.queries
+            totals[1] += stats.db
+            totals[2] += stats.serialize
+            totals[3] += stats.bytes
+            totals[4] += stats.rows
+            hist = self._latency.setdefault(key, [[0] * (len(BUCKETS) + 1), 0.0])
+            hist[0][bisect.bisect_left(BUCKETS, elapsed)] += 1
+            hist[1] += elapsed
+
+    def render(self):
+        """Prometheus text exposition format."""
+        with self._lock:
+            requests = sorted(self._requests.items())
+            totals   = sorted(self._totals.items())
+            latency  = sorted(self._latency.items())
+
+        lines = [
+            '# HELP vsaver_requests_total Requests served.',
+            '# TYPE vsaver_requests_total counter',
+        ]
+        for (view, client, method, status), count in requests:
+            lines.append(
+                f'vsaver_requests_total{_labels(view=view, client_id=client, method=method, status=status)} {count}'
+            )
+        for n, (name, kind, help_text) in enumerate((
+            ('vsaver_db_queries_total', 'counter', 'SQL queries run.'),
+            ('vsaver_db_seconds_total', 'counter', 'Time spent in SQL.'),
+            ('vsaver_serialize_seconds_total', 'counter', 'Time spent serializing and rendering bodies.'),
+            ('vsaver_response_bytes_total', 'counter', 'Response body bytes sent.'),
+            ('vsaver_bulk_rows_total', 'counter', 'Rows written or deleted by bulk pushes and loads.'),
+        )):
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+            for (view, client), values in totals:
+                lines.append(f'{name}{_labels(view=view, client_id=client)} {_number(values[n])}')
+
+        lines += [
+            '# HELP vsaver_request_duration_seconds Request latency.',
+            '# TYPE vsaver_request_duration_seconds histogram',
+        ]
+        for (view, client), (counts, total) in latency:
+            running = 0
+            for le, count in zip((*BUCKETS, '+Inf'), counts):
+                running += count
+                lines.append(
+                    f'vsaver_request_duration_seconds_bucket{_labels(view=view, client_id=client, le=str(le))} {running}'
+                )
+            lines.append(f'vsaver_request_duration_seconds_sum{_labels(view=view, client_id=client)} {_number(total)}')
+            lines.append(f'vsaver_request_duration_seconds_count{_labels(view=view, client_id=client)} {running}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _number(value):
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+
+REGISTRY = Registry()
+
+
+def enabled():
+    return getattr(settings, 'VSAVER_METRICS', True)
+
+
+def client_label():
+    return getattr(settings, 'VSAVER_METRICS_CLIENT_LABEL', False)
+
+
+# ── Middleware ────────────────────────────────────────────
+
+def server_timing(stats, elapsed):
+    return ', '.join((
+        f'db;dur={stats.db * 1000:.1f};desc="{stats.queries} queries"',
+        f'serialize;dur={stats.serialize * 1000:.1f}',
+        f'total;dur={elapsed * 1000:.1f}',
+    ))
+
+
+class MetricsMiddleware:
+    """
+    Times every request and records it per view (URL name) and tenant:
+    SQL queries and time, serialization time, response bytes, bulk rows
+    and a latency histogram, served by /api/vsaver/metrics/. Responses
+    get a Server-Timing header. A streamed body is measured until it has
+    been sent, so its header only covers the time to the first byte.
+    """
+    sync_capable  = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not enabled():
+            return self.get_response(request)
+        stats, start = self._begin(request)
+        token = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._end(request, response, stats, start)
+
+    async def __acall__(self, request):
+        if not enabled():
+            return await self.get_response(request)
+        stats, start = self._begin(request)
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._end(request, response, stats, start)
+
+    def _begin(self, request):
+        # The client is attributed once api.auth has resolved the tenant, never from the raw params
+        return RequestStats(''), time.perf_counter()
+
+    def _end(self, request, response, stats, start):
+        response['Server-Timing'] = server_timing(stats, time.perf_counter() - start)
+        if not response.streaming:
+            stats.bytes = len(response.content)
+            self._record(request, response, stats, start)
+            return response
+        wrap = self._aiterate if response.is_async else self._iterate
+        response.streaming_content = wrap(response.streaming_content, request, response, stats, start)
+        return response
+
+    # Queries run while a body is streamed belong to its request. The
+    # generators may be finalized elsewhere, so the var is cleared, not reset.
+
+    def _iterate(self, content, request, response, stats, start):
+        _current.set(stats)
+        try:
+            for chunk in content:
+                stats.bytes += len(chunk)
+                yield chunk
+        finally:
+            _current.set(None)
+            self._record(request, response, stats, start)
+
+    async def _aiterate(self, content, request, response, stats, start):
+        _current.set(stats)
+        try:
+            async for chunk in content:
+                stats.bytes += len(chunk)
+                yield chunk
+        finally:
+            _current.set(None)
+            self._record(request, response, stats, start)
+
+    def _record(self, request, response, stats, start):
+        elapsed = time.perf_counter() - start
+        match   = getattr(request, 'resolver_match', None)
+        view    = (match.view_name if match else None) or 'unmatched'
+        REGISTRY.observe(view, request.method, response.status_code, stats, elapsed)
+        if elapsed * 1000 >= getattr(settings, 'VSAVER_SLOW_REQUEST_MS', DEFAULT_SLOW_REQUEST_MS):
+            logger.warning(
+                f"[SLOW] {request.method} {view} client={stats.client_id or '-'} "
+                f"{elapsed * 1000:.0f}ms status={response.status_code} queries={stats.queries} "
+                f"db={stats.db * 1000:.0f}ms serialize={stats.serialize * 1000:.0f}ms "
+                f"bytes={stats.bytes} rows={stats.rows}"
+            )
@@ -0,0 +1,61 @@
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_summaries(apps, schema_editor):
+    db         = schema_editor.connection.alias
+    AccInvMast = apps.get_model('api', 'AccInvMast')
+    Customer   = apps.get_model('api', 'AccInvMastCustomerSummary')
+    Client     = apps.get_model('api', 'AccInvMastClientSummary')
+
+    grouped = (
+        AccInvMast.objects.using(db).order_by()
+        .values('client_id', 'customerid')
+        .annotate(total_sales=Sum('nettotal'), invoice_count=Count('slno'))
+    )
+    Customer.objects.using(db).bulk_create((Customer(**row) for row in grouped), batch_size=1000)
+
+    per_client = (
+        Customer.objects.using(db).order_by()
+        .values('client_id')
+        .annotate(total_sales=Sum('total_sales'), invoice_count=Sum('invoice_count'))
+    )
+    Client.objects.using(db).bulk_create((Client(**row) for row in per_client), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_alter_accinvmast_client_id_alter_accmaster_client_id_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccInvMastClientSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_id', models.CharField(max_length=50, unique=True)),
+                ('total_sales', models.DecimalField(blank=True, decimal_places=3, max_digits=20, null=True)),
+                ('invoice_count', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'acc_invmast_client_summary',
+            },
+        ),
+        migrations.CreateModel(
+            name='AccInvMastCustomerSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_id', models.CharField(max_length=50)),
+                ('customerid', models.CharField(blank=True, max_length=30, null=True)),
+                ('total_sales', models.DecimalField(blank=True, decimal_places=3, max_digits=20, null=True)),
+                ('invoice_count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'acc_invmast_customer_summary',
+                'unique_together': {('client_id', 'customerid')},
+            },
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
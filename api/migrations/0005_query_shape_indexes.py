@@ -0,0 +1,53 @@
+from django.db import migrations, models
+
+
+# Built with CREATE INDEX CONCURRENTLY on PostgreSQL so a deploy doesn't
+# block bulk syncs on the large tables; plain CREATE INDEX elsewhere.
+INDEXES = [
+    ('accmaster', models.Index(fields=['client_id', 'code'], name='acc_master_client_code_idx')),
+    ('accinvmast', models.Index(fields=['client_id', '-invdate', '-slno'], name='acc_invmast_client_date_idx')),
+    ('accinvmast', models.Index(
+        fields  = ['client_id', 'customerid', '-invdate', '-slno'],
+        include = ['nettotal'],
+        name    = 'acc_invmast_cust_date_idx',
+    )),
+]
+
+
+def _add_indexes(apps, schema_editor):
+    for model_name, index in INDEXES:
+        model = apps.get_model('api', model_name)
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.add_index(model, index, concurrently=True)
+        else:
+            schema_editor.add_index(model, index)
+
+
+def _remove_indexes(apps, schema_editor):
+    for model_name, index in INDEXES:
+        model = apps.get_model('api', model_name)
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.remove_index(model, index, concurrently=True)
+        else:
+            schema_editor.remove_index(model, index)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('api', '0004_invoice_summaries'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name=model_name, index=index)
+                for model_name, index in INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(_add_indexes, _remove_indexes),
+            ],
+        ),
+    ]
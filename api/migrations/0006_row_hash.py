@@ -0,0 +1,57 @@
+from django.db import migrations, models
+
+
+# Existing rows keep row_hash NULL until their next push: the manifest
+# reports them as unknown and clients simply resend them once.
+MANIFEST_INDEX = models.Index(fields=['client_id', 'slno'], include=['row_hash'], name='acc_invmast_client_slno_idx')
+
+
+def _add_index(apps, schema_editor):
+    model = apps.get_model('api', 'accinvmast')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(model, MANIFEST_INDEX, concurrently=True)
+    else:
+        schema_editor.add_index(model, MANIFEST_INDEX)
+
+
+def _remove_index(apps, schema_editor):
+    model = apps.get_model('api', 'accinvmast')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.remove_index(model, MANIFEST_INDEX, concurrently=True)
+    else:
+        schema_editor.remove_index(model, MANIFEST_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('api', '0005_query_shape_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accmaster',
+            name='row_hash',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='misel',
+            name='row_hash',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='accinvmast',
+            name='row_hash',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='accinvmast', index=MANIFEST_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(_add_index, _remove_index),
+            ],
+        ),
+    ]
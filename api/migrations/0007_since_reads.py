@@ -0,0 +1,62 @@
+from django.db import migrations, models
+
+
+# Same CONCURRENTLY treatment as 0005: these land on the large sync tables
+INDEXES = [
+    ('accmaster', models.Index(fields=['client_id', 'synced_at'], name='acc_master_client_synced_idx')),
+    ('misel', models.Index(fields=['client_id', 'synced_at'], name='misel_client_synced_idx')),
+    ('accinvmast', models.Index(fields=['client_id', 'synced_at'], name='acc_invmast_client_synced_idx')),
+]
+
+
+def _add_indexes(apps, schema_editor):
+    for model_name, index in INDEXES:
+        model = apps.get_model('api', model_name)
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.add_index(model, index, concurrently=True)
+        else:
+            schema_editor.add_index(model, index)
+
+
+def _remove_indexes(apps, schema_editor):
+    for model_name, index in INDEXES:
+        model = apps.get_model('api', model_name)
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.remove_index(model, index, concurrently=True)
+        else:
+            schema_editor.remove_index(model, index)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('api', '0006_row_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_id', models.CharField(max_length=50)),
+                ('entity', models.CharField(max_length=30)),
+                ('key', models.CharField(blank=True, max_length=150, null=True)),
+                ('deleted_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'sync_tombstone',
+                'indexes': [models.Index(fields=['client_id', 'entity', 'deleted_at'], name='sync_tombstone_since_idx')],
+            },
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name=model_name, index=index)
+                for model_name, index in INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(_add_indexes, _remove_indexes),
+            ],
+        ),
+    ]
@@ -0,0 +1,41 @@
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_since_reads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('client_id', models.CharField(max_length=50)),
+                ('entity', models.CharField(max_length=30)),
+                ('status', models.CharField(default='open', max_length=10)),
+                ('rows', models.BigIntegerField(default=0)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'load_session',
+                'indexes': [models.Index(fields=['client_id', 'created_at'], name='load_session_client_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LoadSessionBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('records', models.JSONField()),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='batches', to='api.loadsession')),
+            ],
+            options={
+                'db_table': 'load_session_batch',
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_load_sessions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('client_id', models.CharField(max_length=50)),
+                ('entity', models.CharField(max_length=30)),
+                ('batch_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('status', models.CharField(default='queued', max_length=10)),
+                ('payload', models.JSONField(blank=True, null=True)),
+                ('total', models.BigIntegerField(default=0)),
+                ('processed', models.BigIntegerField(default=0)),
+                ('created', models.BigIntegerField(default=0)),
+                ('updated', models.BigIntegerField(default=0)),
+                ('unchanged', models.BigIntegerField(default=0)),
+                ('deleted', models.BigIntegerField(default=0)),
+                ('attempts', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'bulk_job',
+                'indexes': [models.Index(fields=['status', 'created_at'], name='bulk_job_queue_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('batch_id__isnull', False)), fields=('client_id', 'entity', 'batch_id'), name='bulk_job_batch_uniq')],
+            },
+        ),
+    ]
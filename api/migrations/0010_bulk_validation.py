@@ -0,0 +1,22 @@
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_bulk_jobs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bulkjob',
+            name='payload',
+            field=models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True),
+        ),
+        migrations.AddField(
+            model_name='bulkjob',
+            name='rejected',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
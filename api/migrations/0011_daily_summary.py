@@ -0,0 +1,41 @@
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+
+
+def populate_daily_summaries(apps, schema_editor):
+    # Existing ledgers: bulk pushes only re-aggregate the days they touch
+    db         = schema_editor.connection.alias
+    AccInvMast = apps.get_model('api', 'AccInvMast')
+    Daily      = apps.get_model('api', 'AccInvMastDailySummary')
+
+    grouped = (
+        AccInvMast.objects.using(db).filter(invdate__isnull=False).order_by()
+        .values('client_id', day=F('invdate'))
+        .annotate(total_sales=Sum('nettotal'), invoice_count=Count('slno'))
+    )
+    Daily.objects.using(db).bulk_create((Daily(**row) for row in grouped), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_bulk_validation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccInvMastDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_id', models.CharField(max_length=50)),
+                ('day', models.DateField()),
+                ('total_sales', models.DecimalField(blank=True, decimal_places=3, max_digits=20, null=True)),
+                ('invoice_count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'acc_invmast_daily_summary',
+                'unique_together': {('client_id', 'day')},
+            },
+        ),
+        migrations.RunPython(populate_daily_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.db import migrations
+
+# acc_invmast_sync becomes list-partitioned by client_id when
+# VSAVER_PARTITION_INVOICES is on; otherwise (and on SQLite) this is a
+# no-op, and `manage.py invoice_partitions --partition` can do it later.
+# No model state changes: Django keeps addressing the parent table.
+
+
+def partition(apps, schema_editor):
+    from api.partitions import is_partitioned, partition_table
+
+    if schema_editor.connection.vendor == 'postgresql' and getattr(settings, 'VSAVER_PARTITION_INVOICES', False):
+        if not is_partitioned():
+            partition_table()
+
+
+def unpartition(apps, schema_editor):
+    from api.partitions import is_partitioned, unpartition_table
+
+    if schema_editor.connection.vendor == 'postgresql' and is_partitioned():
+        unpartition_table()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_daily_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, unpartition),
+    ]
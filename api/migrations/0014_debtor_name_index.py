@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+
+# ?ordering=name / -name on the debtor list. Built with CREATE INDEX
+# CONCURRENTLY on PostgreSQL so a deploy doesn't block bulk syncs on
+# acc_master_sync; plain CREATE INDEX elsewhere.
+INDEX = models.Index(fields=['client_id', 'name', 'code'], name='acc_master_client_name_idx')
+
+
+def _add_index(apps, schema_editor):
+    model = apps.get_model('api', 'accmaster')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(model, INDEX, concurrently=True)
+    else:
+        schema_editor.add_index(model, INDEX)
+
+
+def _remove_index(apps, schema_editor):
+    model = apps.get_model('api', 'accmaster')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.remove_index(model, INDEX, concurrently=True)
+    else:
+        schema_editor.remove_index(model, INDEX)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('api', '0013_api_keys'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='accmaster', index=INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(_add_index, _remove_index),
+            ],
+        ),
+    ]
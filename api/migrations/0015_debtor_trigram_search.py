@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# GIN trigram indexes on acc_master_sync.name / phone2 for /debtors/search/
+# (see api.search), built CONCURRENTLY so a deploy doesn't block bulk syncs.
+# PostgreSQL only, and only where pg_trgm can be installed; without it search
+# uses the in-process index instead. A server that gets pg_trgm later is
+# switched over with `manage.py search_indexes --create`.
+
+
+def create(apps, schema_editor):
+    from api.search import create_trigram_indexes
+
+    if schema_editor.connection.vendor == 'postgresql':
+        create_trigram_indexes(schema_editor.connection)
+
+
+def drop(apps, schema_editor):
+    from api.search import drop_trigram_indexes
+
+    if schema_editor.connection.vendor == 'postgresql':
+        drop_trigram_indexes(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('api', '0014_debtor_name_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create, drop),
+    ]
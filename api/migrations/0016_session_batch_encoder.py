@@ -0,0 +1,17 @@
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_debtor_trigram_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='loadsessionbatch',
+            name='records',
+            field=models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder),
+        ),
+    ]
@@ -1,3 +1,6 @@
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
 
@@ -10,11 +13,20 @@ class AccMaster(models.Model):
     phone2       = models.CharField(max_length=60,  null=True, blank=True)
     client_id    = models.CharField(max_length=50,  db_index=True)   # NON-NULLABLE
     synced_at    = models.DateTimeField(auto_now=True)
+    row_hash     = models.CharField(max_length=32,  null=True, blank=True, editable=False)  # see api.hashing
 
     class Meta:
         db_table        = 'acc_master_sync'
         ordering        = ['code']
         unique_together = [('code', 'client_id')]
+        indexes         = [
+            # Debtor list / detail: WHERE client_id = ? [AND code = ?] ORDER BY code
+            models.Index(fields=['client_id', 'code'], name='acc_master_client_code_idx'),
+            # ?ordering=name / -name
+            models.Index(fields=['client_id', 'name', 'code'], name='acc_master_client_name_idx'),
+            # ?since= reads: WHERE client_id = ? AND synced_at > ?
+            models.Index(fields=['client_id', 'synced_at'], name='acc_master_client_synced_idx'),
+        ]
 
     def __str__(self):
         return f"{self.code} - {self.name} [{self.client_id}]"
@@ -25,10 +37,14 @@ class Misel(models.Model):
     address1     = models.CharField(max_length=50,  null=True, blank=True)
     client_id    = models.CharField(max_length=50,  db_index=True)   # NON-NULLABLE
     synced_at    = models.DateTimeField(auto_now=True)
+    row_hash     = models.CharField(max_length=32,  null=True, blank=True, editable=False)  # see api.hashing
 
     class Meta:
         db_table        = 'misel_sync'
         unique_together = [('firm_name', 'client_id')]
+        indexes         = [
+            models.Index(fields=['client_id', 'synced_at'], name='misel_client_synced_idx'),
+        ]
 
     def __str__(self):
         return f"{self.firm_name} [{self.client_id}]"
@@ -41,11 +57,184 @@ class AccInvMast(models.Model):
     nettotal     = models.DecimalField(max_digits=16, decimal_places=3, null=True, blank=True)
     client_id    = models.CharField(max_length=50,  db_index=True)   # NON-NULLABLE
     synced_at    = models.DateTimeField(auto_now=True)
+    row_hash     = models.CharField(max_length=32,  null=True, blank=True, editable=False)  # see api.hashing
 
     class Meta:
         db_table        = 'acc_invmast_sync'
         ordering        = ['-invdate', '-slno']
         unique_together = [('slno', 'client_id')]
+        indexes         = [
+            # Invoice list: WHERE client_id = ? ORDER BY invdate DESC, slno DESC
+            models.Index(fields=['client_id', '-invdate', '-slno'], name='acc_invmast_client_date_idx'),
+            # Per-customer list + summary re-aggregation (index-only with nettotal)
+            models.Index(
+                fields  = ['client_id', 'customerid', '-invdate', '-slno'],
+                include = ['nettotal'],
+                name    = 'acc_invmast_cust_date_idx',
+            ),
+            # Delta-sync manifest: WHERE client_id = ? AND slno > ? ORDER BY slno
+            models.Index(fields=['client_id', 'slno'], include=['row_hash'], name='acc_invmast_client_slno_idx'),
+            models.Index(fields=['client_id', 'synced_at'], name='acc_invmast_client_synced_idx'),
+        ]
+
+    def __str__(self):
+        return f"Invoice {self.slno} | {self.customerid} | {self.client_id}"
+
+# ── Invoice summaries (maintained by the bulk / load / truncate paths) ──
+
+class AccInvMastCustomerSummary(models.Model):
+    client_id     = models.CharField(max_length=50)
+    customerid    = models.CharField(max_length=30, null=True, blank=True)
+    total_sales   = models.DecimalField(max_digits=20, decimal_places=3, null=True, blank=True)
+    invoice_count = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table        = 'acc_invmast_customer_summary'
+        unique_together = [('client_id', 'customerid')]
+
+    def __str__(self):
+        return f"{self.customerid} | {self.invoice_count} invoices [{self.client_id}]"
+
+
+class AccInvMastClientSummary(models.Model):
+    client_id     = models.CharField(max_length=50, unique=True)
+    total_sales   = models.DecimalField(max_digits=20, decimal_places=3, null=True, blank=True)
+    invoice_count = models.BigIntegerField(default=0)
+    updated_at    = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'acc_invmast_client_summary'
+
+    def __str__(self):
+        return f"{self.client_id} | {self.invoice_count} invoices"
+
+
+class AccInvMastDailySummary(models.Model):
+    client_id     = models.CharField(max_length=50)
+    day           = models.DateField()                              # invdate; undated invoices are not bucketed
+    total_sales   = models.DecimalField(max_digits=20, decimal_places=3, null=True, blank=True)
+    invoice_count = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table        = 'acc_invmast_daily_summary'
+        unique_together = [('client_id', 'day')]
+
+    def __str__(self):
+        return f"{self.day} | {self.invoice_count} invoices [{self.client_id}]"
+
+
+# ── Deletions, for ?since= readers (see api.tombstones) ──
+
+class SyncTombstone(models.Model):
+    client_id  = models.CharField(max_length=50)
+    entity     = models.CharField(max_length=30)                         # model_name: accmaster / misel / accinvmast
+    key        = models.CharField(max_length=150, null=True, blank=True)  # NULL: every row was removed (truncate)
+    deleted_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'sync_tombstone'
+        indexes  = [
+            models.Index(fields=['client_id', 'entity', 'deleted_at'], name='sync_tombstone_since_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.entity} {self.key if self.key is not None else '*'} @ {self.deleted_at} [{self.client_id}]"
+
+
+# ── Replace-dataset load sessions (see api.sessions) ─────
+
+class LoadSession(models.Model):
+    OPEN      = 'open'
+    COMMITTED = 'committed'
+
+    id         = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    client_id  = models.CharField(max_length=50)
+    entity     = models.CharField(max_length=30)                 # model_name of the dataset being replaced
+    status     = models.CharField(max_length=10, default=OPEN)
+    rows       = models.BigIntegerField(default=0)
+    result     = models.JSONField(null=True, blank=True)         # load counts, replayed on a repeated commit
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'load_session'
+        indexes  = [
+            models.Index(fields=['client_id', 'created_at'], name='load_session_client_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.entity} load {self.id} ({self.status}) [{self.client_id}]"
+
+
+class LoadSessionBatch(models.Model):
+    session = models.ForeignKey(LoadSession, on_delete=models.CASCADE, related_name='batches')
+    records = models.JSONField(encoder=DjangoJSONEncoder)         # list of {column: typed value}, plus row_hash
+
+    class Meta:
+        db_table = 'load_session_batch'
+
+    def __str__(self):
+        return f"Batch {self.pk} of {self.session_id}"
+
+
+# ── Asynchronous bulk pushes (see api.jobs) ──────────────
+
+class BulkJob(models.Model):
+    QUEUED  = 'queued'
+    RUNNING = 'running'
+    DONE    = 'done'
+    FAILED  = 'failed'
+
+    id          = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    client_id   = models.CharField(max_length=50)
+    entity      = models.CharField(max_length=30)                 # model_name of the pushed dataset
+    batch_id    = models.CharField(max_length=100, null=True, blank=True)  # client's idempotency key
+    status      = models.CharField(max_length=10, default=QUEUED)
+    payload     = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)  # {'records', 'deleted'}; cleared when done
+    rejected    = models.JSONField(default=list, blank=True)      # rows left out at validation, by index
+    total       = models.BigIntegerField(default=0)
+    processed   = models.BigIntegerField(default=0)
+    created     = models.BigIntegerField(default=0)
+    updated     = models.BigIntegerField(default=0)
+    unchanged   = models.BigIntegerField(default=0)
+    deleted     = models.BigIntegerField(default=0)
+    attempts    = models.IntegerField(default=0)
+    error       = models.TextField(null=True, blank=True)
+    created_at  = models.DateTimeField(auto_now_add=True)
+    updated_at  = models.DateTimeField(auto_now=True)             # worker heartbeat
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table    = 'bulk_job'
+        constraints = [
+            models.UniqueConstraint(
+                fields    = ['client_id', 'entity', 'batch_id'],
+                condition = models.Q(batch_id__isnull=False),
+                name      = 'bulk_job_batch_uniq',
+            ),
+        ]
+        indexes     = [
+            models.Index(fields=['status', 'created_at'], name='bulk_job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.entity} job {self.id} ({self.status}) [{self.client_id}]"
+
+
+# ── Tenant API keys (see api.auth) ───────────────────────
+
+class ApiKey(models.Model):
+    client_id  = models.CharField(max_length=50)
+    name       = models.CharField(max_length=100, blank=True, default='')
+    prefix     = models.CharField(max_length=12)                  # first characters of the key, to tell keys apart
+    key_hash   = models.CharField(max_length=64, unique=True)     # sha256 of the key; the key itself isn't kept
+    created_at = models.DateTimeField(auto_now_add=True)
+    revoked_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'api_key'
+        indexes  = [
+            models.Index(fields=['client_id'], name='api_key_client_idx'),
+        ]
 
     def __str__(self):
-        return f"Invoice {self.slno} | {self.customerid} | {self.client_id}"
\ No newline at end of file
+        return f"{self.prefix}… [{self.client_id}]"
@@ -0,0 +1,193 @@
+import base64
+import binascii
+import itertools
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from django.http import StreamingHttpResponse
+
+from .renderers import dumps
+
+
+DEFAULT_PAGE_SIZE  = 1000
+DEFAULT_MAX_PAGE   = 10000
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_MANIFEST   = 5000
+MAX_MANIFEST       = 50000
+
+
+def page_size_limits():
+    return (
+        getattr(settings, 'VSAVER_PAGE_SIZE', DEFAULT_PAGE_SIZE),
+        getattr(settings, 'VSAVER_MAX_PAGE_SIZE', DEFAULT_MAX_PAGE),
+    )
+
+
+def manifest_size_limits():
+    return (
+        getattr(settings, 'VSAVER_MANIFEST_PAGE_SIZE', DEFAULT_MANIFEST),
+        getattr(settings, 'VSAVER_MAX_MANIFEST_PAGE_SIZE', MAX_MANIFEST),
+    )
+
+
+def stream_chunk_size():
+    return getattr(settings, 'VSAVER_STREAM_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+class Keyset:
+    """
+    Keyset (seek) pagination over a fixed ordering such as ('-invdate', '-slno').
+
+    NULLs sort the PostgreSQL way on every backend: last for ascending
+    columns, first for descending ones, so the ordering matches the
+    default btree index direction.
+    """
+
+    def __init__(self, *ordering):
+        self.ordering = ordering
+        self.fields   = [o.lstrip('-') for o in ordering]
+        self.desc     = [o.startswith('-') for o in ordering]
+
+    def order_by(self):
+        return [
+            F(f).desc(nulls_first=True) if d else F(f).asc(nulls_last=True)
+            for f, d in zip(self.fields, self.desc)
+        ]
+
+    @staticmethod
+    def _after(field, desc, value):
+        if desc:
+            return ~Q(**{f'{field}__isnull': True}) if value is None else Q(**{f'{field}__lt': value})
+        if value is None:
+            return Q(pk__in=[])
+        return Q(**{f'{field}__gt': value}) | Q(**{f'{field}__isnull': True})
+
+    def filter_after(self, values):
+        """Q matching every row strictly after the row holding `values`."""
+        q      = Q(pk__in=[])
+        prefix = Q()
+        for field, desc, value in zip(self.fields, self.desc, values):
+            q |= prefix & self._after(field, desc, value)
+            prefix &= Q(**{f'{field}__isnull': True}) if value is None else Q(**{field: value})
+        return q
+
+    def seek(self, values, model=None):
+        """
+        filter_after() split into Qs whose rows follow one another in the
+        keyset order, each holding the first key column to a single range
+        or to NULL. Next to client_id = ? that is what lets an index on
+        (client_id, first column, ...) seek to the cursor, where the OR of
+        filter_after() alone makes it walk every row before it. `model`
+        tells whether the column can be NULL at all.
+        """
+        field, desc, value = self.fields[0], self.desc[0], values[0]
+        after   = self.filter_after(values)
+        is_null = Q(**{f'{field}__isnull': True})
+        if value is None:
+            # Descending: the rest of the NULLs, then every other row; ascending: NULLs are last
+            return [is_null & after, ~is_null] if desc else [is_null & after]
+        bound = Q(**{f'{field}__lte' if desc else f'{field}__gte': value})
+        if desc or (model is not None and not model._meta.get_field(field).null):
+            return [bound & after]
+        return [bound & after, is_null]
+
+    # ── cursor encoding ──────────────────────────────────
+
+    def encode(self, row):
+        values = [row[f] if isinstance(row, dict) else getattr(row, f) for f in self.fields]
+        raw    = json.dumps([None if v is None else str(v) for v in values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode(self, model, cursor):
+        """Return the cursor's key values, or None if it is malformed."""
+        try:
+            raw    = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(raw)
+        except (binascii.Error, ValueError):
+            return None
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            return None
+        try:
+            return [
+                None if v is None else model._meta.get_field(f).to_python(v)
+                for f, v in zip(self.fields, values)
+            ]
+        except ValidationError:
+            return None
+
+
+def paginate(qs, keyset, cursor, limit, fields):
+    """
+    Return (rows, next_cursor) for one keyset page of `qs`, rows being
+    values_list() tuples of `fields` (which must include the keyset's).
+    `cursor` holds the decoded key values of the previous page's last row.
+    """
+    rows = []
+    for part in _page_queries(qs, keyset, cursor, fields):
+        rows += part[:limit + 1 - len(rows)]
+        if len(rows) > limit:
+            break
+    return _page(rows, keyset, limit, fields)
+
+
+async def apaginate(qs, keyset, cursor, limit, fields):
+    """paginate() through the async ORM."""
+    rows = []
+    for part in _page_queries(qs, keyset, cursor, fields):
+        rows += [row async for row in part[:limit + 1 - len(rows)]]
+        if len(rows) > limit:
+            break
+    return _page(rows, keyset, limit, fields)
+
+
+def _page_queries(qs, keyset, cursor, fields):
+    # The page's rows come from these in turn: usually one, a second only
+    # when a page runs into the NULLs of the first key column
+    qs = qs.order_by(*keyset.order_by()).values_list(*fields)
+    if cursor is None:
+        return [qs]
+    return [qs.filter(q) for q in keyset.seek(cursor, qs.model)]
+
+
+def _page(rows, keyset, limit, fields):
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, keyset.encode(dict(zip(fields, rows[-1])))
+    return rows, None
+
+
+def stream_ndjson(qs, lean):
+    """
+    Stream `qs` as one JSON object per line. Rows come straight from
+    values_list() in chunks, so memory stays flat however large the
+    client's ledger is; `lean` (a LeanSerializer) keeps the output
+    identical to the regular list response.
+    """
+    def lines():
+        rows = lean.values(qs).iterator(chunk_size=stream_chunk_size())
+        for item in lean.iter_rows(rows):
+            yield dumps(item) + b'\n'
+
+    return StreamingHttpResponse(lines(), content_type='application/x-ndjson')
+
+
+async def _achunked(qs, chunk_size):
+    # values_list().aiterator() starts its query on the event loop thread,
+    # so pull chunks of a plain iterator() through sync_to_async instead
+    rows = qs.iterator(chunk_size=chunk_size)
+    while chunk := await sync_to_async(lambda: list(itertools.islice(rows, chunk_size)))():
+        for row in chunk:
+            yield row
+
+
+def astream_ndjson(qs, lean):
+    """stream_ndjson() for async views: rows are fetched off the event loop under ASGI."""
+    async def lines():
+        rows = _achunked(lean.values(qs), stream_chunk_size())
+        async for item in lean.aiter_rows(rows):
+            yield dumps(item) + b'\n'
+
+    return StreamingHttpResponse(lines(), content_type='application/x-ndjson')
@@ -0,0 +1,20 @@
+from django.conf import settings
+from rest_framework import parsers
+
+from .compression import decoded_stream
+
+
+class JSONParser(parsers.JSONParser):
+    """
+    JSONParser that also takes Content-Encoding: gzip / zstd bodies. They
+    are decoded as they are read, and may not expand past
+    DATA_UPLOAD_MAX_MEMORY_SIZE.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = (parser_context or {}).get('request')
+        if request is not None:
+            stream = decoded_stream(
+                stream, request.headers.get('Content-Encoding'), settings.DATA_UPLOAD_MAX_MEMORY_SIZE,
+            )
+        return super().parse(stream, media_type, parser_context)
@@ -0,0 +1,212 @@
+# PostgreSQL list partitioning of acc_invmast_sync by client_id. Large
+# tenants get a partition of their own, the rest share the DEFAULT one
+# until `manage.py invoice_partitions` splits them out. Every query is
+# scoped to one client_id, so it prunes to one partition, and a
+# per-client truncate becomes a TRUNCATE of it.
+#
+# The partition key must be part of every unique constraint. The table
+# is keyed on (id, client_id) and keeps its (slno, client_id) upsert key.
+# Range partitions on invdate would have forced the date into that key,
+# and a re-dated invoice would then insert a duplicate.
+import hashlib
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import AccInvMast
+
+
+DEFAULT_MIN_ROWS = 10000
+
+
+def _table():
+    return AccInvMast._meta.db_table
+
+
+def _qn(name):
+    return connection.ops.quote_name(name)
+
+
+def default_partition():
+    return f'{_table()}_default'
+
+
+def partition_name(client_id):
+    """Deterministic partition table of a client (client_ids aren't safe identifiers)."""
+    return f"{_table()}_c{hashlib.md5(client_id.encode()).hexdigest()[:16]}"
+
+
+def min_rows():
+    return getattr(settings, 'VSAVER_PARTITION_MIN_ROWS', DEFAULT_MIN_ROWS)
+
+
+def _exists(cursor, name):
+    cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [name])
+    return cursor.fetchone()[0]
+
+
+def is_partitioned(model=AccInvMast, conn=None):
+    """Whether `model`'s table is a partitioned one (so RETURNING can't see xmax)."""
+    conn = conn or connection
+    if conn.vendor != 'postgresql':
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute(
+            'SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))',
+            [model._meta.db_table],
+        )
+        return cursor.fetchone()[0]
+
+
+def partitions():
+    """[(partition table, client_id or None for DEFAULT, rows)] of a partitioned table."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname",
+            [_table()],
+        )
+        found = cursor.fetchall()
+        result = []
+        for name, bound in found:
+            cursor.execute(f'SELECT client_id, count(*) FROM {_qn(name)} GROUP BY client_id')
+            counts = cursor.fetchall()
+            if bound == 'DEFAULT':
+                result.append((name, None, sum(n for _, n in counts)))
+            else:
+                result.append((name, counts[0][0] if counts else None, counts[0][1] if counts else 0))
+    return result
+
+
+def _definitions(cursor, table):
+    """(constraint DDL, index DDL) of a table, replayable on a table of the same name."""
+    cursor.execute(
+        'SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = to_regclass(%s)',
+        [table],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        'SELECT pg_get_indexdef(indexrelid) FROM pg_index WHERE indrelid = to_regclass(%s) '
+        'AND indexrelid NOT IN (SELECT conindid FROM pg_constraint WHERE conrelid = to_regclass(%s))',
+        [table, table],
+    )
+    return constraints, [row[0] for row in cursor.fetchall()]
+
+
+def _swap(cursor, create, key_columns):
+    """
+    Rebuild acc_invmast_sync through `create(cursor, old)`, which makes
+    the new (empty) table, then copy the rows and put the constraints,
+    indexes and id sequence back, the primary key on `key_columns`.
+    """
+    table, old = _table(), f'{_table()}_old'
+    constraints, indexes = _definitions(cursor, table)
+    cursor.execute(f"SELECT COALESCE(max(id), 0) FROM {_qn(table)}")
+    next_id = cursor.fetchone()[0] + 1
+
+    cursor.execute(f'ALTER TABLE {_qn(table)} RENAME TO {_qn(old)}')
+    # Identity columns can't be partitioned (before PostgreSQL 17); a sequence default can
+    cursor.execute(f'ALTER TABLE {_qn(old)} ALTER COLUMN id DROP IDENTITY IF EXISTS')
+    cursor.execute(f'ALTER TABLE {_qn(old)} ALTER COLUMN id DROP DEFAULT')
+    cursor.execute(f'DROP SEQUENCE IF EXISTS {_qn(table + "_id_seq")}')
+    create(cursor, old)
+    cursor.execute(f'INSERT INTO {_qn(table)} SELECT * FROM {_qn(old)}')
+    cursor.execute(f'DROP TABLE {_qn(old)}')
+
+    for name, kind, definition in constraints:
+        if kind == 'p':
+            definition = f"PRIMARY KEY ({', '.join(key_columns)})"
+        cursor.execute(f'ALTER TABLE {_qn(table)} ADD CONSTRAINT {_qn(name)} {definition}')
+    for definition in indexes:
+        cursor.execute(definition.replace(' ON ONLY ', ' ON ', 1))
+
+    seq = _qn(f'{table}_id_seq')
+    cursor.execute(f'CREATE SEQUENCE {seq} START WITH {next_id} OWNED BY {_qn(table)}.id')
+    cursor.execute(f'ALTER TABLE {_qn(table)} ALTER COLUMN id SET DEFAULT nextval(%s)', [f'{table}_id_seq'])
+    cursor.execute(f'ANALYZE {_qn(table)}')
+
+
+def partition_table(threshold=None):
+    """
+    Turn acc_invmast_sync into a table list-partitioned by client_id: one
+    partition per client with at least `threshold` invoices, a DEFAULT
+    partition for the rest. Rows are copied, so this holds an exclusive
+    lock for as long as that takes.
+    """
+    threshold = min_rows() if threshold is None else threshold
+
+    def create(cursor, old):
+        cursor.execute(
+            f'SELECT client_id FROM {_qn(old)} GROUP BY client_id HAVING count(*) >= %s', [threshold],
+        )
+        clients = [row[0] for row in cursor.fetchall()]
+        table = _qn(_table())
+        cursor.execute(f'CREATE TABLE {table} (LIKE {_qn(old)} INCLUDING DEFAULTS) PARTITION BY LIST (client_id)')
+        cursor.execute(f'CREATE TABLE {_qn(default_partition())} PARTITION OF {table} DEFAULT')
+        for client_id in clients:
+            cursor.execute(
+                f'CREATE TABLE {_qn(partition_name(client_id))} PARTITION OF {table} FOR VALUES IN (%s)', [client_id],
+            )
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        _swap(cursor, create, ('id', 'client_id'))
+
+
+def unpartition_table():
+    """Put acc_invmast_sync back into a single plain table."""
+    def create(cursor, old):
+        cursor.execute(f'CREATE TABLE {_qn(_table())} (LIKE {_qn(old)} INCLUDING DEFAULTS)')
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        _swap(cursor, create, ('id',))
+
+
+def split_client(client_id):
+    """
+    Give one client its own partition, moving its rows out of DEFAULT.
+    Returns the rows moved, or None if it already has one.
+    """
+    table, name = _qn(_table()), partition_name(client_id)
+    with transaction.atomic(), connection.cursor() as cursor:
+        if _exists(cursor, name):
+            return None
+        cursor.execute(f'CREATE TABLE {_qn(name)} (LIKE {table} INCLUDING DEFAULTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {_qn(default_partition())} WHERE client_id = %s RETURNING *) '
+            f'INSERT INTO {_qn(name)} SELECT * FROM moved',
+            [client_id],
+        )
+        moved = cursor.rowcount
+        # Attaching builds the parent's indexes on the new partition
+        cursor.execute(f'ALTER TABLE {table} ATTACH PARTITION {_qn(name)} FOR VALUES IN (%s)', [client_id])
+    return moved
+
+
+def split_large_clients(threshold=None):
+    """Split every client holding at least `threshold` rows of DEFAULT into its own partition."""
+    threshold = min_rows() if threshold is None else threshold
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT client_id FROM {_qn(default_partition())} GROUP BY client_id HAVING count(*) >= %s',
+            [threshold],
+        )
+        clients = [row[0] for row in cursor.fetchall()]
+    return {client_id: split_client(client_id) for client_id in clients}
+
+
+def truncate_invoices(client_id):
+    """
+    Delete every invoice of a client and return how many there were: a
+    TRUNCATE of its partition when it has one, a DELETE otherwise.
+    """
+    if is_partitioned():
+        name = partition_name(client_id)
+        with connection.cursor() as cursor:
+            if _exists(cursor, name):
+                cursor.execute(f'SELECT count(*) FROM {_qn(name)}')
+                count = cursor.fetchone()[0]
+                cursor.execute(f'TRUNCATE {_qn(name)}')
+                return count
+    count, _ = AccInvMast.objects.filter(client_id=client_id).delete()
+    return count
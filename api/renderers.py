@@ -0,0 +1,53 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+from rest_framework.renderers import JSONRenderer
+
+from .metrics import serializing
+
+
+def dumps(data, default=None):
+    """Compact UTF-8 JSON bytes, via orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, default=default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(data, default=default, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in JSONRenderer that encodes with orjson.
+
+    Anything orjson can't handle natively (Decimal, datetimes, lazy
+    strings...) is handed to DRF's own encoder, so the bytes match
+    JSONRenderer's compact output. ?indent / browsable-API rendering goes
+    through the stock renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with serializing():
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if data is None:
+            return b''
+        if (
+            orjson is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data,
+            default = self.encoder_class().default,
+            option  = orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+        # Same JS-safety escaping as JSONRenderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,124 @@
+# Read replicas for the list, detail and summary reads. Views opt in with
+# @replica_read / @areplica_read; everything else, writes and the reads
+# they do included, stays on `default`. A request picks the replica with
+# the fewest reads in flight in this process and runs all its queries
+# there.
+#
+# Read-your-writes: a client that wrote in the last
+# VSAVER_REPLICA_STICKY_SECONDS reads from the primary. "Wrote" is the
+# response cache generation (api.caching). Every write path bumps it when
+# it commits and it is a time_ns() stamp, so no write path needs another
+# hook. A generation evicted from the cache restarts as "just now", which
+# only costs a few reads on the primary. The stamp has to be seen by every
+# process, the bulk_worker included, so replicas need a shared cache
+# backend: settings refuse replica hosts with locmem, and check vsaver.E002
+# flags any other setup that lacks one.
+#
+# ?since= reads stay on the primary too: their watermark assumes every row
+# committed before it is visible, which a lagging replica can't promise.
+# Streamed (?stream=ndjson) rows are fetched after the view returns, so
+# they come from the primary as well.
+import collections
+import contextlib
+import contextvars
+import functools
+import itertools
+import threading
+import time
+
+from django.conf import settings
+
+from .caching import ageneration, generation
+
+
+DEFAULT_STICKY_SECONDS = 10
+
+_alias  = contextvars.ContextVar('vsaver_read_alias', default=None)
+_lock   = threading.Lock()
+_active = collections.Counter()          # reads in flight per replica, this process
+_turn   = itertools.count()              # rotates ties between equally idle replicas
+
+
+def replicas():
+    return list(getattr(settings, 'VSAVER_DB_REPLICAS', []))
+
+
+def sticky_seconds():
+    return getattr(settings, 'VSAVER_REPLICA_STICKY_SECONDS', DEFAULT_STICKY_SECONDS)
+
+
+def _wrote_recently(gen):
+    return time.time_ns() - gen < sticky_seconds() * 1_000_000_000
+
+
+def in_flight():
+    with _lock:
+        return {alias: _active[alias] for alias in replicas()}
+
+
+def _take():
+    """The least busy replica, counted as one read busier until _give()."""
+    aliases = replicas()
+    with _lock:
+        start = next(_turn) % len(aliases)
+        alias = min(aliases[start:] + aliases[:start], key=_active.__getitem__)
+        _active[alias] += 1
+    return alias
+
+
+def _give(alias):
+    with _lock:
+        _active[alias] -= 1
+
+
+@contextlib.contextmanager
+def _reading_from(alias):
+    token = _alias.set(alias)
+    try:
+        yield
+    finally:
+        _alias.reset(token)
+        _give(alias)
+
+
+def _eligible(request):
+    return replicas() and getattr(request, 'tenant', None) and not request.GET.get('since')
+
+
+def replica_read(method):
+    """Run an APIView GET handler's queries on a replica unless its client just wrote."""
+    @functools.wraps(method)
+    def wrapper(view, request, *args, **kwargs):
+        if not _eligible(request) or _wrote_recently(generation(request.tenant)):
+            return method(view, request, *args, **kwargs)
+        with _reading_from(_take()):
+            return method(view, request, *args, **kwargs)
+    return wrapper
+
+
+def areplica_read(view):
+    """replica_read() for the async function views."""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if not _eligible(request) or _wrote_recently(await ageneration(request.tenant)):
+            return await view(request, *args, **kwargs)
+        with _reading_from(_take()):
+            return await view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """DATABASE_ROUTERS entry: reads inside replica_read() go to its replica, the rest to `default`."""
+
+    def db_for_read(self, model, **hints):
+        return _alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas copy the primary's schema; nothing is migrated on them directly
+        return db not in replicas()
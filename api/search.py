@@ -0,0 +1,284 @@
+# Debtor type-ahead (/debtors/search/?q=): a substring of name or phone2,
+# or a name word close to q, ranked prefix matches first, then other
+# substring matches, then by word similarity.
+#
+# On PostgreSQL with the pg_trgm extension this is one query served by
+# the GIN trigram indexes of migration 0015. Elsewhere (SQLite, or a server
+# without pg_trgm) a trigram index of the client's debtors is built in
+# process on first use. It is kept while the client's last synced_at and
+# last deletion stay put (any process's write moves them), and for at
+# most VSAVER_SEARCH_INDEX_TTL seconds: synced_at is stamped before a write
+# commits, so one committing late can hide behind a newer stamp.
+import bisect
+import collections
+import heapq
+import math
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections, router, transaction
+from django.db.models import BooleanField, FloatField, Max
+from django.db.models.expressions import RawSQL
+
+from .models import AccMaster, SyncTombstone
+from .tombstones import entity
+
+
+MIN_QUERY         = 2
+DEFAULT_LIMIT     = 20
+MAX_LIMIT         = 100
+SIMILARITY        = 0.6     # pg_trgm's default word_similarity_threshold
+DEFAULT_INDEXES   = 8       # clients whose fallback index a process keeps
+DEFAULT_INDEX_TTL = 60      # seconds before a fallback index is rebuilt regardless
+
+COLUMNS = ('code', 'name', 'place', 'phone2')
+
+TRIGRAM_INDEXES = {
+    'acc_master_name_trgm_idx'  : 'name',
+    'acc_master_phone2_trgm_idx': 'phone2',
+}
+
+
+def search_limits():
+    return (
+        getattr(settings, 'VSAVER_SEARCH_LIMIT', DEFAULT_LIMIT),
+        getattr(settings, 'VSAVER_SEARCH_MAX_LIMIT', MAX_LIMIT),
+    )
+
+
+# ── PostgreSQL: pg_trgm ───────────────────────────────────
+
+_trigram = {}
+
+
+def trigram_ready(alias):
+    """Whether the database behind `alias` has pg_trgm (checked once per process)."""
+    if alias not in _trigram:
+        connection = connections[alias]
+        ready = False
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+                ready = cursor.fetchone()[0]
+        _trigram[alias] = ready
+    return _trigram[alias]
+
+
+def _invalid_indexes(connection):
+    # Left behind by a CONCURRENTLY build that failed part way
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+            'WHERE NOT i.indisvalid AND c.relname = ANY(%s)', [list(TRIGRAM_INDEXES)],
+        )
+        return {name for name, in cursor.fetchall()}
+
+
+def trigram_indexes(connection):
+    """{index name: 'valid' | 'invalid' | 'missing'} for the GIN trigram indexes."""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT indexname FROM pg_indexes WHERE indexname = ANY(%s)', [list(TRIGRAM_INDEXES)])
+        present = {name for name, in cursor.fetchall()}
+    invalid = _invalid_indexes(connection)
+    return {
+        name: 'invalid' if name in invalid else 'valid' if name in present else 'missing'
+        for name in TRIGRAM_INDEXES
+    }
+
+
+def create_trigram_indexes(connection):
+    """
+    Install pg_trgm and build the GIN trigram indexes on acc_master_sync
+    with CREATE INDEX CONCURRENTLY, so writes go on meanwhile; it can't
+    run inside a transaction. An index a failed build left invalid is
+    rebuilt. Returns False, leaving search on the in-process fallback,
+    when the extension can't be installed (not shipped, or no privilege
+    to create it).
+    """
+    qn    = connection.ops.quote_name
+    table = qn(AccMaster._meta.db_table)
+    try:
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except DatabaseError:
+        return False
+    invalid = _invalid_indexes(connection)
+    with connection.cursor() as cursor:
+        for name, column in TRIGRAM_INDEXES.items():
+            if name in invalid:
+                cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {qn(name)}')
+            cursor.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {qn(name)} ON {table} USING gin ({qn(column)} gin_trgm_ops)')
+    _trigram.pop(connection.alias, None)
+    return True
+
+
+def drop_trigram_indexes(connection):
+    with connection.cursor() as cursor:
+        for name in TRIGRAM_INDEXES:
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {connection.ops.quote_name(name)}')
+    _trigram.pop(connection.alias, None)
+
+
+def _like(text):
+    return re.sub(r'([\\%_])', r'\\\1', text)
+
+
+def _sql_search(alias, client_id, q, limit):
+    ops     = connections[alias].ops
+    table   = ops.quote_name(AccMaster._meta.db_table)
+    name    = f'{table}.{ops.quote_name("name")}'
+    phone   = f'{table}.{ops.quote_name("phone2")}'
+    inside  = f'%{_like(q)}%'
+    # `q <% name` and ILIKE '%q%' are what the gin_trgm_ops indexes serve
+    match   = RawSQL(
+        f'{name} ILIKE %s OR {phone} ILIKE %s OR %s <%% {name}', [inside, inside, q],
+        output_field=BooleanField(),
+    )
+    score   = RawSQL(
+        f'CASE WHEN {name} ILIKE %s THEN 2 ELSE 0 END'
+        f' + CASE WHEN {name} ILIKE %s OR {phone} ILIKE %s THEN 1 ELSE 0 END'
+        f' + word_similarity(%s, {name})',
+        [f'{_like(q)}%', inside, inside, q],
+        output_field=FloatField(),
+    )
+    return list(
+        AccMaster.objects.using(alias)
+        .filter(match, client_id=client_id)
+        .annotate(score=score)
+        .order_by('-score', 'name', 'code')
+        .values_list(*COLUMNS, 'score')[:limit]
+    )
+
+
+# ── Fallback: trigram index in process ────────────────────
+
+_WORD = re.compile(r'\w+')
+
+
+def trigrams(text):
+    """pg_trgm's trigrams of `text`: lowercased words padded with two spaces in front, one behind."""
+    grams = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    One client's debtors for the fallback search, shortest name first.
+    Substrings are found by scanning the names (and the phones), joined
+    in that order, with str.find(): the first hits are the best ones, so
+    a scan stops after a handful. Fuzzy matches, needed only when there
+    are too few substring hits, are counted from trigram posting lists.
+    A row's similarity is the share of q's trigrams found in its name. It
+    matches pg_trgm's word_similarity() when the name holds q's words.
+    """
+
+    def __init__(self, rows):
+        rows        = sorted(rows, key=lambda row: (len(row[1] or ''), (row[1] or '').lower(), row[0]))
+        self.rows   = rows
+        self.names  = [(name or '').lower() for _, name, _, _ in rows]
+        self.grams  = collections.defaultdict(list)
+        for i, name in enumerate(self.names):
+            for gram in trigrams(name):
+                self.grams[gram].append(i)
+        self.text   = {}
+        for column, values in (('name', self.names), ('phone', [(row[3] or '').lower() for row in rows])):
+            starts, offset = [], 1
+            for value in values:
+                starts.append(offset)
+                offset += len(value) + 1
+            self.text[column] = ('\n' + '\n'.join(values), starts)
+
+    def _scan(self, column, pattern, found, wanted):
+        """Add rows whose `column` holds `pattern` to `found`, best first, until it has `wanted`."""
+        text, starts = self.text[column]
+        at = text.find(pattern)
+        while at != -1 and len(found) < wanted:
+            row = bisect.bisect_right(starts, at + 1) - 1
+            found.setdefault(row)
+            # On to the newline before the next row: one hit per row is enough
+            at = text.find(pattern, starts[row + 1] - 1) if row + 1 < len(starts) else -1
+
+    def _similarity(self, i, wanted):
+        return len(trigrams(self.names[i]) & wanted) / len(wanted) if wanted else 0.0
+
+    def search(self, q, limit):
+        ql     = q.lower()
+        wanted = trigrams(q)
+        # Name prefix, word prefix, anywhere in the name, in the phone: the
+        # order of the score's fixed part, so only the first few need scoring
+        found  = {}
+        for column, pattern in (('name', f'\n{ql}'), ('name', f' {ql}'), ('name', ql), ('phone', ql)):
+            self._scan(column, pattern, found, limit * 5)
+        order  = lambda item: (-item[0], self.names[item[1]], self.rows[item[1]][0])
+        ranked = [
+            ((2 if self.names[i].startswith(ql) else 0) + 1 + self._similarity(i, wanted), i)
+            for i in found
+        ]
+        if len(found) < limit and wanted:
+            shared = collections.Counter()
+            for gram in wanted:
+                shared.update(self.grams.get(gram, ()))
+            # Fuzzy scores come in len(wanted) steps: take whole steps from
+            # the top, sorting only the best few of each, until limit is met
+            need  = math.ceil(SIMILARITY * len(wanted))
+            steps = collections.defaultdict(list)
+            for i, n in shared.items():
+                if n >= need and i not in found:
+                    steps[n].append((n / len(wanted), i))
+            fuzzy = 0
+            for n in sorted(steps, reverse=True):
+                ranked += heapq.nsmallest(limit - fuzzy, steps[n], key=order)
+                fuzzy  += len(steps[n])
+                if fuzzy >= limit:
+                    break
+        ranked.sort(key=order)
+        return [(*self.rows[i], score) for score, i in ranked[:limit]]
+
+
+_indexes = collections.OrderedDict()     # (alias, client_id) -> (version, expires, TrigramIndex)
+_lock    = threading.Lock()
+
+
+def _version(alias, client_id):
+    """
+    (last synced_at, last deletion) of the client's debtors: moved by any
+    process's write. Both are index-served MAX() lookups; every delete path
+    leaves a tombstone (api.tombstones), which a row count would cost more
+    to notice. Deletes made around the API only show after the TTL.
+    """
+    rows = AccMaster.objects.using(alias).filter(client_id=client_id)
+    gone = SyncTombstone.objects.using(alias).filter(client_id=client_id, entity=entity(AccMaster))
+    return rows.aggregate(last=Max('synced_at'))['last'], gone.aggregate(last=Max('deleted_at'))['last']
+
+
+def _index(alias, client_id):
+    """The client's TrigramIndex as of its current rows, rebuilt when they change or it outlives its TTL."""
+    key     = (alias, client_id)
+    version = _version(alias, client_id)
+    with _lock:
+        held = _indexes.get(key)
+        if held is not None and held[0] == version and time.monotonic() < held[1]:
+            _indexes.move_to_end(key)
+            return held[2]
+    rows  = list(AccMaster.objects.using(alias).filter(client_id=client_id).values_list(*COLUMNS))
+    index = TrigramIndex(rows)
+    ttl   = getattr(settings, 'VSAVER_SEARCH_INDEX_TTL', DEFAULT_INDEX_TTL)
+    with _lock:
+        _indexes[key] = (version, time.monotonic() + ttl, index)
+        _indexes.move_to_end(key)
+        while len(_indexes) > getattr(settings, 'VSAVER_SEARCH_INDEXES', DEFAULT_INDEXES):
+            _indexes.popitem(last=False)
+    return index
+
+
+def search_debtors(client_id, q, limit):
+    """[(code, name, place, phone2, score)] of the client's best `limit` matches for `q`."""
+    alias = router.db_for_read(AccMaster)
+    if trigram_ready(alias):
+        return _sql_search(alias, client_id, q, limit)
+    return _index(alias, client_id).search(q, limit)
@@ -1,7 +1,65 @@
 from django.db import transaction
-from django.utils import timezone
 from rest_framework import serializers
 from .models import AccMaster, Misel, AccInvMast
+from .summaries import buckets_of, refresh_invoice_summary
+from .upsert import bulk_upsert, delete_keys
+from .validation import validate_records
+
+
+class RecordsField(serializers.ListField):
+    """
+    Bulk records as a list of objects, or columnar, which doesn't repeat
+    every key on every row: {"columns": ["code", "name"], "rows": [["D1", "Asha"], ...]}.
+    """
+    def to_internal_value(self, data):
+        if isinstance(data, dict) and 'columns' in data:
+            return self.from_columns(data)
+        if not isinstance(data, list):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        # Rows are checked by BulkRecordsSerializer.validate(), column by column
+        return data
+
+    @staticmethod
+    def from_columns(data):
+        columns, rows = data.get('columns'), data.get('rows')
+        if (
+            not isinstance(columns, list)
+            or not all(isinstance(c, str) for c in columns)
+            or len(set(columns)) != len(columns)
+        ):
+            raise serializers.ValidationError('columns must be a list of distinct names.')
+        if not isinstance(rows, list):
+            raise serializers.ValidationError('rows must be a list of arrays.')
+        width = len(columns)
+        for n, row in enumerate(rows):
+            if not isinstance(row, list) or len(row) != width:
+                raise serializers.ValidationError(f'Row {n}: expected an array of {width} values.')
+        return [dict(zip(columns, row)) for row in rows]
+
+
+class BulkRecordsSerializer(serializers.Serializer):
+    """
+    Base of the bulk push serializers. Records are coerced to the model's
+    column types by api.validation, a column at a time; rows that don't
+    fit are left out of the write and reported by index in `rejected`.
+    """
+    model            = None
+    columns          = ()
+    required_columns = ()
+
+    records   = RecordsField()
+    client_id = serializers.CharField(max_length=50)
+
+    def validate(self, attrs):
+        attrs['records'], attrs['rejected'] = validate_records(
+            self.model, self.columns, attrs['records'], self.required_columns,
+        )
+        return attrs
+
+    def create(self, validated_data):
+        rejected = validated_data['rejected']
+        result   = self.apply(validated_data['client_id'], validated_data['records'], validated_data['deleted'])
+        return {**result, 'total': result['total'] + len(rejected), 'rejected': rejected}
 
 
 # ── AccMaster ─────────────────────────────────────────────
@@ -13,34 +71,35 @@ class AccMasterSerializer(serializers.ModelSerializer):
         read_only_fields = ['synced_at']
 
 
-class BulkAccMasterSerializer(serializers.Serializer):
-    records   = serializers.ListField(child=serializers.DictField())
-    client_id = serializers.CharField(max_length=50)
+class BulkAccMasterSerializer(BulkRecordsSerializer):
+    model            = AccMaster
+    columns          = ('code', 'name', 'place', 'exregnodate', 'super_code', 'phone2')
+    required_columns = ('code', 'name')
 
-    def create(self, validated_data):
-        records   = validated_data['records']
-        client_id = validated_data['client_id']
-        now       = timezone.now()
-        created = updated = 0
-
-        # Use update_or_create scoped strictly to (code + client_id)
-        for r in records:
-            _, is_new = AccMaster.objects.update_or_create(
-                code      = r['code'],
-                client_id = client_id,
-                defaults  = {
-                    'name'       : r['name'],
-                    'place'      : r.get('place'),
-                    'exregnodate': r.get('exregnodate'),
-                    'super_code' : r.get('super_code'),
-                    'phone2'     : r.get('phone2'),
-                    'synced_at'  : now,
-                }
-            )
-            if is_new: created += 1
-            else:      updated += 1
+    # Delta sync: codes removed on the desktop since the last manifest
+    deleted = serializers.ListField(child=serializers.CharField(max_length=30), required=False, default=list)
+
+    @staticmethod
+    def apply(client_id, records, deleted):
+        """Write one push (also called per chunk by api.jobs); returns the counts."""
+        rows = [
+            {
+                'code'       : r['code'],
+                'name'       : r['name'],
+                'place'      : r.get('place'),
+                'exregnodate': r.get('exregnodate'),
+                'super_code' : r.get('super_code'),
+                'phone2'     : r.get('phone2'),
+            }
+            for r in records
+        ]
 
-        return {'created': created, 'updated': updated, 'total': len(records)}
+        # Upsert scoped strictly to (code + client_id), one transaction per push
+        with transaction.atomic():
+            deleted = delete_keys(AccMaster, client_id, 'code', deleted)
+            result  = bulk_upsert(AccMaster, client_id, rows, key='code')
+
+        return {**result, 'deleted': deleted, 'total': len(records)}
 
 
 # ── Misel ─────────────────────────────────────────────────
@@ -52,30 +111,25 @@ class MiselSerializer(serializers.ModelSerializer):
         read_only_fields = ['synced_at']
 
 
-class BulkMiselSerializer(serializers.Serializer):
-    records   = serializers.ListField(child=serializers.DictField())
-    client_id = serializers.CharField(max_length=50)
+class BulkMiselSerializer(BulkRecordsSerializer):
+    model            = Misel
+    columns          = ('firm_name', 'address1')
+    required_columns = ()
 
-    def create(self, validated_data):
-        records   = validated_data['records']
-        client_id = validated_data['client_id']
-        created = updated = 0
-        for rec in records:
-            firm_name = rec.get('firm_name')
-            # Skip records with no firm_name — can't safely key on NULL
-            if not firm_name:
-                continue
-            _, is_new = Misel.objects.update_or_create(
-                firm_name = rec.get('firm_name'),
-                client_id = client_id,
-                defaults  = {
-                    'address1' : rec.get('address1'),
-                    'client_id': client_id,
-                }
-            )
-            if is_new: created += 1
-            else:      updated += 1
-        return {'created': created, 'updated': updated, 'total': len(records)}
+    deleted = serializers.ListField(child=serializers.CharField(max_length=150), required=False, default=list)
+
+    @staticmethod
+    def apply(client_id, records, deleted):
+        # Skip records with no firm_name — can't safely key on NULL
+        rows = [
+            {'firm_name': rec['firm_name'], 'address1': rec.get('address1')}
+            for rec in records
+            if rec.get('firm_name')
+        ]
+        with transaction.atomic():
+            deleted = delete_keys(Misel, client_id, 'firm_name', deleted)
+            result  = bulk_upsert(Misel, client_id, rows, key='firm_name')
+        return {**result, 'deleted': deleted, 'total': len(records)}
 
 
 # ── AccInvMast ────────────────────────────────────────────
@@ -87,29 +141,36 @@ class AccInvMastSerializer(serializers.ModelSerializer):
         read_only_fields = ['synced_at']
 
 
-class BulkAccInvMastSerializer(serializers.Serializer):
-    records   = serializers.ListField(child=serializers.DictField())
-    client_id = serializers.CharField(max_length=50)
-
-    def create(self, validated_data):
-        records   = validated_data['records']
-        client_id = validated_data['client_id']
-        now       = timezone.now()
-        created = updated = 0
-
-        # Use update_or_create scoped strictly to (slno + client_id)
-        for r in records:
-            _, is_new = AccInvMast.objects.update_or_create(
-                slno      = r['slno'],
-                client_id = client_id,
-                defaults  = {
-                    'invdate'   : r.get('invdate'),
-                    'customerid': r.get('customerid'),
-                    'nettotal'  : r.get('nettotal'),
-                    'synced_at' : now,
-                }
+class BulkAccInvMastSerializer(BulkRecordsSerializer):
+    model            = AccInvMast
+    columns          = ('slno', 'invdate', 'customerid', 'nettotal')
+    required_columns = ('slno',)
+
+    # Delta sync: slnos removed on the desktop since the last manifest
+    deleted = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+    @staticmethod
+    def apply(client_id, records, deleted):
+        rows = [
+            {
+                'slno'      : r['slno'],
+                'invdate'   : r.get('invdate'),
+                'customerid': r.get('customerid'),
+                'nettotal'  : r.get('nettotal'),
+            }
+            for r in records
+        ]
+
+        # Upsert scoped strictly to (slno + client_id), one transaction per push.
+        # Summaries are re-aggregated for every customer and day whose invoices moved.
+        with transaction.atomic():
+            customers, days = buckets_of(client_id, [r['slno'] for r in rows] + list(deleted))
+            deleted = delete_keys(AccInvMast, client_id, 'slno', deleted)
+            result  = bulk_upsert(AccInvMast, client_id, rows, key='slno')
+            refresh_invoice_summary(
+                client_id,
+                customers | {r['customerid'] for r in rows},
+                days | {r['invdate'] for r in rows},
             )
-            if is_new: created += 1
-            else:      updated += 1
 
-        return {'created': created, 'updated': updated, 'total': len(records)}
\ No newline at end of file
+        return {**result, 'deleted': deleted, 'total': len(records)}
\ No newline at end of file
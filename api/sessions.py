@@ -0,0 +1,114 @@
+import collections
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound, ParseError
+
+from .hashing import hasher
+from .loaders import load_session_batches
+from .models import AccMaster, Misel, AccInvMast, LoadSession, LoadSessionBatch
+from .summaries import rebuild_invoice_summary
+from .validation import validate_records
+
+
+DEFAULT_SESSION_TTL = 6 * 3600    # seconds
+
+# What a load (or load session) writes for each dataset
+Dataset  = collections.namedtuple('Dataset', 'model key columns after_load')
+DATASETS = {
+    'accmaster' : Dataset(AccMaster, 'code', ['code', 'name', 'place', 'exregnodate', 'super_code', 'phone2'], None),
+    'misel'     : Dataset(Misel, 'firm_name', ['firm_name', 'address1'], None),
+    'accinvmast': Dataset(AccInvMast, 'slno', ['slno', 'invdate', 'customerid', 'nettotal'], rebuild_invoice_summary),
+}
+
+
+class SessionClosed(APIException):
+    status_code    = status.HTTP_409_CONFLICT
+    default_detail = 'This load session is already committed.'
+    default_code   = 'session_closed'
+
+
+def session_ttl():
+    return datetime.timedelta(seconds=getattr(settings, 'VSAVER_LOAD_SESSION_TTL', DEFAULT_SESSION_TTL))
+
+
+def start_session(entity, client_id):
+    """Open a session for replacing one client's dataset; expired ones of that client are dropped."""
+    LoadSession.objects.filter(client_id=client_id, created_at__lt=timezone.now() - session_ttl()).delete()
+    return LoadSession.objects.create(client_id=client_id, entity=entity)
+
+
+def _locked(session_id, client_id):
+    try:
+        return LoadSession.objects.select_for_update().get(id=session_id, client_id=client_id)
+    except LoadSession.DoesNotExist:
+        raise NotFound('No such load session.')
+
+
+def add_batch(session_id, client_id, records):
+    """
+    Stage one batch of records in an open session. Only the dataset's
+    columns are kept, and row hashes are computed now so the commit
+    doesn't have to. The batch is refused whole (ParseError naming the
+    first bad record) if any record doesn't fit the columns. Returns the
+    refreshed session and the batch size.
+    """
+    records = list(records)
+    with transaction.atomic():
+        session = _locked(session_id, client_id)
+        if session.status != LoadSession.OPEN:
+            raise SessionClosed()
+        dataset        = DATASETS[session.entity]
+        typed, refused = validate_records(dataset.model, dataset.columns, records, required=(dataset.key,))
+        if refused:
+            column, message = next(iter(refused[0]['errors'].items()))
+            raise ParseError(f"Record {refused[0]['index']}: {column}: {message}")
+        row_hash = hasher(dataset.model)
+        rows     = []
+        # Stored typed, as /bulk/ would write them, so the commit can't
+        # trip over input validation accepted (12.0 for a BIGINT, say)
+        for n, row in enumerate(typed):
+            if row[dataset.key] == '':
+                raise ParseError(f'Record {n}: {dataset.key} is required.')
+            if row_hash:
+                row['row_hash'] = row_hash(row)
+            rows.append(row)
+        LoadSessionBatch.objects.create(session=session, records=rows)
+        LoadSession.objects.filter(id=session.id).update(rows=F('rows') + len(rows))
+        session.refresh_from_db(fields=['rows'])
+    return session, len(rows)
+
+
+def commit_session(session_id, client_id):
+    """
+    Replace the client's dataset with everything staged in the session,
+    in one transaction: readers see the old rows until it commits, then
+    the new ones. Committing twice returns the first result.
+    """
+    with transaction.atomic():
+        session = _locked(session_id, client_id)
+        if session.status == LoadSession.COMMITTED:
+            return session.result
+        dataset = DATASETS[session.entity]
+        result  = load_session_batches(
+            dataset.model, dataset.key, dataset.columns, client_id, session.id, replace=True,
+        )
+        if dataset.after_load:
+            dataset.after_load(client_id)
+        session.batches.all().delete()
+        session.status = LoadSession.COMMITTED
+        session.result = result
+        session.save(update_fields=['status', 'result'])
+    return result
+
+
+def abort_session(session_id, client_id):
+    with transaction.atomic():
+        session = _locked(session_id, client_id)
+        if session.status != LoadSession.OPEN:
+            raise SessionClosed()
+        session.delete()
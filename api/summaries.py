@@ -0,0 +1,215 @@
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import AccInvMast, AccInvMastClientSummary, AccInvMastCustomerSummary, AccInvMastDailySummary
+
+
+CHUNK = 1000
+
+
+def _chunks(items, size=CHUNK):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def buckets_of(client_id, slnos):
+    """
+    (customerids, days) of the existing invoices in `slnos`, i.e. the
+    summary rows they count towards now (call before overwriting them).
+    """
+    slno_field = AccInvMast._meta.get_field('slno')
+    customers, days = set(), set()
+    for chunk in _chunks({slno_field.to_python(s) for s in slnos}):
+        for customerid, invdate in (
+            AccInvMast.objects.filter(client_id=client_id, slno__in=chunk)
+            .order_by()
+            .values_list('customerid', 'invdate')
+            .distinct()
+        ):
+            customers.add(customerid)
+            days.add(invdate)
+    return customers, days
+
+
+def _lock_client(client_id):
+    """
+    Create-if-missing and row-lock the client's summary row. Concurrent
+    pushes for the same client queue up here, so each one re-aggregates
+    after the previous one committed.
+    """
+    AccInvMastClientSummary.objects.bulk_create(
+        [AccInvMastClientSummary(client_id=client_id)], ignore_conflicts=True,
+    )
+    return AccInvMastClientSummary.objects.select_for_update().get(client_id=client_id)
+
+
+def _grouped(client_id, customer_filter=Q()):
+    return (
+        AccInvMast.objects.filter(customer_filter, client_id=client_id)
+        .order_by()
+        .values('customerid')
+        .annotate(total_sales=Sum('nettotal'), invoice_count=Count('slno'))
+    )
+
+
+def _grouped_days(client_id, day_filter=Q()):
+    return (
+        AccInvMast.objects.filter(day_filter, client_id=client_id, invdate__isnull=False)
+        .order_by()
+        .values(day=F('invdate'))
+        .annotate(total_sales=Sum('nettotal'), invoice_count=Count('slno'))
+    )
+
+
+def _roll_up(summary):
+    agg = AccInvMastCustomerSummary.objects.filter(client_id=summary.client_id).aggregate(
+        total_sales=Sum('total_sales'), invoice_count=Sum('invoice_count'),
+    )
+    summary.total_sales   = agg['total_sales']
+    summary.invoice_count = agg['invoice_count'] or 0
+    summary.save()
+
+
+def refresh_invoice_summary(client_id, customerids, days=()):
+    """
+    Re-aggregate only the given customers and invoice days of one client,
+    then roll the per-client total up from the customer rows. Must run
+    inside the same transaction as the invoice writes it follows.
+    """
+    customer_field = AccInvMast._meta.get_field('customerid')
+    customerids    = {customer_field.to_python(c) for c in customerids}
+    summary        = _lock_client(client_id)
+
+    for chunk in _chunks(customerids):
+        ids  = [c for c in chunk if c is not None]
+        cond = Q(customerid__in=ids)
+        if None in chunk:
+            cond |= Q(customerid__isnull=True)
+        AccInvMastCustomerSummary.objects.filter(cond, client_id=client_id).delete()
+        AccInvMastCustomerSummary.objects.bulk_create(
+            AccInvMastCustomerSummary(client_id=client_id, **row)
+            for row in _grouped(client_id, cond)
+        )
+
+    date_field = AccInvMast._meta.get_field('invdate')
+    days       = {date_field.to_python(d) for d in days} - {None}
+    for chunk in _chunks(days):
+        AccInvMastDailySummary.objects.filter(client_id=client_id, day__in=chunk).delete()
+        AccInvMastDailySummary.objects.bulk_create(
+            AccInvMastDailySummary(client_id=client_id, **row)
+            for row in _grouped_days(client_id, Q(invdate__in=chunk))
+        )
+    _roll_up(summary)
+
+
+def rebuild_invoice_summary(client_id):
+    """Recompute every summary row of one client from acc_invmast_sync."""
+    summary = _lock_client(client_id)
+    AccInvMastCustomerSummary.objects.filter(client_id=client_id).delete()
+    AccInvMastCustomerSummary.objects.bulk_create(
+        (AccInvMastCustomerSummary(client_id=client_id, **row) for row in _grouped(client_id)),
+        batch_size=CHUNK,
+    )
+    AccInvMastDailySummary.objects.filter(client_id=client_id).delete()
+    AccInvMastDailySummary.objects.bulk_create(
+        (AccInvMastDailySummary(client_id=client_id, **row) for row in _grouped_days(client_id)),
+        batch_size=CHUNK,
+    )
+    _roll_up(summary)
+
+
+def clear_invoice_summary(client_id):
+    AccInvMastCustomerSummary.objects.filter(client_id=client_id).delete()
+    AccInvMastDailySummary.objects.filter(client_id=client_id).delete()
+    AccInvMastClientSummary.objects.filter(client_id=client_id).delete()
+
+
+def verify_invoice_summary(client_id):
+    """Return a list of (customerid, stored, actual) mismatches for one client."""
+    stored = {
+        r['customerid']: (r['total_sales'], r['invoice_count'])
+        for r in AccInvMastCustomerSummary.objects.filter(client_id=client_id)
+        .values('customerid', 'total_sales', 'invoice_count')
+    }
+    actual = {r['customerid']: (r['total_sales'], r['invoice_count']) for r in _grouped(client_id)}
+    problems = [
+        (c, stored.get(c), actual.get(c))
+        for c in set(stored) | set(actual)
+        if stored.get(c) != actual.get(c)
+    ]
+
+    stored_days = {
+        r['day']: (r['total_sales'], r['invoice_count'])
+        for r in AccInvMastDailySummary.objects.filter(client_id=client_id)
+        .values('day', 'total_sales', 'invoice_count')
+    }
+    actual_days = {r['day']: (r['total_sales'], r['invoice_count']) for r in _grouped_days(client_id)}
+    problems += [
+        (f'day {d}', stored_days.get(d), actual_days.get(d))
+        for d in set(stored_days) | set(actual_days)
+        if stored_days.get(d) != actual_days.get(d)
+    ]
+
+    client = AccInvMastClientSummary.objects.filter(client_id=client_id).first()
+    raw    = AccInvMast.objects.filter(client_id=client_id).aggregate(
+        total_sales=Sum('nettotal'), invoice_count=Count('slno'),
+    )
+    have = (client.total_sales, client.invoice_count) if client else (None, 0)
+    if have != (raw['total_sales'], raw['invoice_count']):
+        problems.append(('*', have, (raw['total_sales'], raw['invoice_count'])))
+    return problems
+
+
+# ── Sales analytics (served from the rollups above) ───────
+
+GROUP_BY = ('day', 'month', 'customer')
+
+
+def sales_by(client_id, group_by, start=None, end=None):
+    """
+    Queryset of {'bucket', 'total_sales', 'invoice_count'} rows for one
+    client. Days and months are read from the daily rollup, customers
+    from the customer rollup; a customer breakdown over a date range has
+    no rollup and is grouped from the invoices. Days and months come
+    oldest first, customers by sales, highest first.
+    """
+    dated = Q()
+    if start is not None:
+        dated &= Q(day__gte=start)
+    if end is not None:
+        dated &= Q(day__lte=end)
+
+    if group_by == 'day':
+        return (
+            AccInvMastDailySummary.objects.filter(dated, client_id=client_id)
+            .order_by('day')
+            .values('total_sales', 'invoice_count', bucket=F('day'))
+        )
+    if group_by == 'month':
+        return (
+            AccInvMastDailySummary.objects.filter(dated, client_id=client_id)
+            .annotate(bucket=TruncMonth('day'))
+            .order_by('bucket')
+            .values('bucket')
+            .annotate(total_sales=Sum('total_sales'), invoice_count=Sum('invoice_count'))
+        )
+
+    by_sales = (F('total_sales').desc(nulls_last=True), 'bucket')
+    if start is None and end is None:
+        return (
+            AccInvMastCustomerSummary.objects.filter(client_id=client_id)
+            .values('total_sales', 'invoice_count', bucket=F('customerid'))
+            .order_by(*by_sales)
+        )
+    invdate = Q()
+    if start is not None:
+        invdate &= Q(invdate__gte=start)
+    if end is not None:
+        invdate &= Q(invdate__lte=end)
+    return (
+        AccInvMast.objects.filter(invdate, client_id=client_id)
+        .values(bucket=F('customerid'))
+        .annotate(total_sales=Sum('nettotal'), invoice_count=Count('slno'))
+        .order_by(*by_sales)
+    )
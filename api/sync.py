@@ -0,0 +1,88 @@
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from .loaders import load_records
+from .serializers import BulkAccMasterSerializer, BulkMiselSerializer, BulkAccInvMastSerializer
+from .sessions import DATASETS
+
+
+# /sync/ body sections, in the order they are written
+SECTIONS = {
+    'debtors' : ('accmaster', BulkAccMasterSerializer),
+    'misel'   : ('misel', BulkMiselSerializer),
+    'invoices': ('accinvmast', BulkAccInvMastSerializer),
+}
+
+MODES = ('upsert', 'replace')
+
+
+def validate_sync(data):
+    """
+    Validate every section of a /sync/ body before anything is written.
+    Returns (client_id, [(name, mode, bulk serializer)]); raises a
+    ValidationError keyed by section otherwise.
+    """
+    if not isinstance(data, dict):
+        raise ValidationError({'non_field_errors': ['Expected an object.']})
+    client_id = data.get('client_id')
+    if not isinstance(client_id, str) or not client_id.strip():
+        raise ValidationError({'client_id': ['This field is required.']})
+    unknown   = sorted(set(data) - set(SECTIONS) - {'client_id'})
+    errors    = {name: ['Unknown section.'] for name in unknown}
+    sections  = []
+    for name, (_, serializer_class) in SECTIONS.items():
+        section = data.get(name)
+        if section is None:
+            continue
+        if not isinstance(section, dict):
+            errors[name] = ['Expected an object with records.']
+            continue
+        mode = section.get('mode', 'upsert')
+        if mode not in MODES:
+            errors[name] = {'mode': [f"mode must be one of {', '.join(MODES)}."]}
+            continue
+        if mode == 'replace' and section.get('deleted'):
+            errors[name] = {'deleted': ['deleted cannot be combined with mode=replace.']}
+            continue
+        serializer = serializer_class(data={**section, 'client_id': client_id})
+        if not serializer.is_valid():
+            errors[name] = serializer.errors
+            continue
+        # A replace drops what it doesn't carry, so a rejected row would be lost, not skipped
+        if mode == 'replace' and serializer.validated_data['rejected']:
+            errors[name] = {'rejected': serializer.validated_data['rejected']}
+            continue
+        sections.append((name, mode, serializer))
+
+    if errors:
+        raise ValidationError(errors)
+    if not sections:
+        raise ValidationError({'non_field_errors': [f"Nothing to sync; send any of {', '.join(SECTIONS)}."]})
+    return sections[0][2].validated_data['client_id'], sections
+
+
+def _replace(client_id, entity, records):
+    dataset = DATASETS[entity]
+    rows    = [r for r in records if r.get(dataset.key) not in (None, '')]
+    result  = load_records(dataset.model, dataset.key, dataset.columns, client_id, iter(rows))
+    if dataset.after_load:
+        dataset.after_load(client_id)
+    return result
+
+
+def run_sync(client_id, sections):
+    """
+    Write the validated sections in one transaction: upserts through the
+    bulk writers, replaces through the set-based loader. Returns the
+    counts per section; a failure in any of them rolls back all of them.
+    """
+    results = {'client_id': client_id}
+    with transaction.atomic():
+        for name, mode, serializer in sections:
+            if mode == 'upsert':
+                result = serializer.save()
+            else:
+                rows   = serializer.validated_data['records']
+                result = {**_replace(client_id, SECTIONS[name][0], rows), 'rejected': []}
+            results[name] = {'mode': mode, **result}
+    return results
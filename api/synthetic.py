@@ -0,0 +1,73 @@
+import datetime
+import random
+from decimal import Decimal
+
+from .models import (
+    AccMaster, AccInvMast, Misel,
+    AccInvMastClientSummary, AccInvMastCustomerSummary, AccInvMastDailySummary,
+    BulkJob, LoadSession, SyncTombstone,
+)
+from .summaries import rebuild_invoice_summary
+from .upsert import bulk_upsert
+
+
+PLACES = ['Calicut', 'Kannur', 'Thrissur', 'Kochi', 'Malappuram', 'Palakkad', 'Kollam', 'Wayanad']
+WORDS  = ['Traders', 'Stores', 'Agencies', 'Enterprises', 'Mart', 'Medicals', 'Textiles', 'Bakery']
+
+
+def debtor_records(count, seed=0):
+    """`count` AccMaster-shaped bulk records with stable codes D000001..."""
+    rnd = random.Random(seed)
+    return [
+        {
+            'code'       : f'D{i:06}',
+            'name'       : f'{rnd.choice(PLACES)} {rnd.choice(WORDS)} {i}',
+            'place'      : rnd.choice(PLACES),
+            'exregnodate': None,
+            'super_code' : rnd.choice(['SD', 'CR', None]),
+            'phone2'     : f'9{rnd.randrange(10**8, 10**9)}',
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def invoice_records(count, customers=100, seed=0, start=datetime.date(2023, 4, 1), days=1095):
+    """`count` AccInvMast-shaped bulk records spread over `customers` debtors and `days` days."""
+    rnd = random.Random(seed)
+    return [
+        {
+            'slno'      : i,
+            'invdate'   : (start + datetime.timedelta(days=rnd.randrange(days))).isoformat(),
+            'customerid': f'D{rnd.randrange(1, customers + 1):06}',
+            'nettotal'  : str(Decimal(rnd.randrange(100, 10_000_000)) / 1000),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def misel_records(client_id):
+    return [{'firm_name': f'Firm {client_id}', 'address1': 'Main Road'}]
+
+
+def seed_tenant(client_id, debtors, invoices, seed=0, batch_size=None):
+    """Write one synthetic client (debtors, firm row, invoices + summaries). Caller owns the transaction."""
+    bulk_upsert(AccMaster, client_id, debtor_records(debtors, seed), key='code', batch_size=batch_size)
+    bulk_upsert(Misel, client_id, misel_records(client_id), key='firm_name')
+    bulk_upsert(
+        AccInvMast, client_id,
+        invoice_records(invoices, customers=max(1, debtors), seed=seed),
+        key='slno', batch_size=batch_size,
+    )
+    rebuild_invoice_summary(client_id)
+
+
+def delete_tenants(prefix):
+    """Remove every row of the clients whose client_id starts with `prefix`; returns the rows deleted."""
+    deleted = 0
+    for model in (
+        AccInvMast, AccMaster, Misel, AccInvMastCustomerSummary, AccInvMastClientSummary,
+        AccInvMastDailySummary, SyncTombstone, LoadSession, BulkJob,
+    ):
+        count, _ = model.objects.filter(client_id__startswith=prefix).delete()
+        deleted += count
+    return deleted
@@ -1,3 +1,1276 @@
-from django.test import TestCase
+import datetime
+import gzip
+import io
+import json
+import tempfile
+import time
+import unittest
+from decimal import Decimal
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from . import admission, async_views, metrics
+from .admission import bulk_slot
+from .auth import KEYS, create_key, resolve_tenant, revoke_keys
+from .caching import _gen_key, shared_cache
+from .checks import check_admission_limits, check_replica_stickiness, check_response_cache
+from .hashing import hasher
+from .lean import LeanSerializer
+from .loaders import load_records
+from .jobs import run_next
+from .models import AccMaster, Misel, AccInvMast, BulkJob, LoadSession, LoadSessionBatch
+from .pagination import Keyset
+from .partitions import is_partitioned, partition_name, partition_table, split_client, unpartition_table
+from .renderers import FastJSONRenderer
+from .routing import ReplicaRouter, _give, _take, in_flight, replica_read
+from .search import TrigramIndex, trigrams
+from .summaries import verify_invoice_summary
+from .tombstones import record_deleted
+from .serializers import (
+    AccMasterSerializer, BulkAccMasterSerializer,
+    MiselSerializer, BulkMiselSerializer,
+    AccInvMastSerializer, BulkAccInvMastSerializer,
+)
+from .upsert import bulk_upsert
+
+
+# The suite pushes as 'c1' far faster than the per-client token bucket allows;
+# AdmissionTests switches it back on
+_unthrottled = override_settings(VSAVER_BULK_RATE_PER_MIN=0)
+
+
+def setUpModule():
+    _unthrottled.enable()
+
+
+def tearDownModule():
+    _unthrottled.disable()
+
+
+def _push(serializer_class, client_id, records):
+    serializer = serializer_class(data={'client_id': client_id, 'records': records})
+    serializer.is_valid(raise_exception=True)
+    return serializer.save()
+
+
+# ── Bulk upsert engine ────────────────────────────────────
+
+class BulkUpsertTests(TestCase):
+    def test_created_then_updated_counts(self):
+        records = [{'code': f'D{i}', 'name': f'Debtor {i}'} for i in range(5)]
+        self.assertEqual(
+            _push(BulkAccMasterSerializer, 'c1', records),
+            {'created': 5, 'updated': 0, 'unchanged': 0, 'deleted': 0, 'total': 5, 'rejected': []},
+        )
+        records[0]['name'] = 'Renamed'
+        records.append({'code': 'D9', 'name': 'New'})
+        self.assertEqual(
+            _push(BulkAccMasterSerializer, 'c1', records),
+            {'created': 1, 'updated': 1, 'unchanged': 4, 'deleted': 0, 'total': 6, 'rejected': []},
+        )
+        self.assertEqual(AccMaster.objects.get(code='D0', client_id='c1').name, 'Renamed')
+
+    def test_scoped_per_client(self):
+        _push(BulkAccMasterSerializer, 'c1', [{'code': 'D1', 'name': 'One'}])
+        result = _push(BulkAccMasterSerializer, 'c2', [{'code': 'D1', 'name': 'Other'}])
+        self.assertEqual(result['created'], 1)
+        self.assertEqual(AccMaster.objects.get(code='D1', client_id='c1').name, 'One')
+
+    def test_duplicate_keys_last_wins(self):
+        records = [
+            {'slno': 1, 'invdate': '2026-01-01', 'customerid': 'A', 'nettotal': '10.5'},
+            {'slno': '1', 'invdate': '2026-01-02', 'customerid': 'A', 'nettotal': '12.25'},
+        ]
+        self.assertEqual(
+            _push(BulkAccInvMastSerializer, 'c1', records),
+            {'created': 1, 'updated': 1, 'unchanged': 0, 'deleted': 0, 'total': 2, 'rejected': []},
+        )
+        inv = AccInvMast.objects.get(slno=1, client_id='c1')
+        self.assertEqual(inv.nettotal, Decimal('12.250'))
+        self.assertEqual(str(inv.invdate), '2026-01-02')
+
+    @override_settings(VSAVER_UPSERT_BATCH_SIZE=3)
+    def test_batches(self):
+        rows = [{'slno': i, 'nettotal': i} for i in range(10)]
+        self.assertEqual(bulk_upsert(AccInvMast, 'c1', rows, key='slno'),
+                         {'created': 10, 'updated': 0, 'unchanged': 0})
+        rows[3]['nettotal'] = 99
+        self.assertEqual(bulk_upsert(AccInvMast, 'c1', rows, key='slno'),
+                         {'created': 0, 'updated': 1, 'unchanged': 9})
+        self.assertEqual(AccInvMast.objects.filter(client_id='c1').count(), 10)
+
+    def test_rejected_rows_are_reported_not_written(self):
+        records = [
+            {'slno': 1, 'invdate': '2026-01-01T10:30:00', 'customerid': 'A', 'nettotal': 10.5},
+            {'slno': 2, 'invdate': '01/02/2026', 'nettotal': '5'},
+            {'slno': 3, 'nettotal': '1' * 14},
+            {'slno': 'x', 'customerid': 'C' * 31},
+            'not a row',
+            {'invdate': None},
+        ]
+        result = _push(BulkAccInvMastSerializer, 'c1', records)
+        self.assertEqual((result['created'], result['total']), (1, 6))
+        self.assertEqual(
+            {r['index']: sorted(r['errors']) for r in result['rejected']},
+            {1: ['invdate'], 2: ['nettotal'], 3: ['customerid', 'slno'], 4: ['non_field_errors'], 5: ['slno']},
+        )
+        inv = AccInvMast.objects.get(client_id='c1')
+        self.assertEqual((inv.slno, str(inv.invdate), inv.nettotal), (1, '2026-01-01', Decimal('10.500')))
+
+        result = _push(BulkAccMasterSerializer, 'c1', [{'code': 7, 'name': 'Seven'}, {'code': 'B'}])
+        self.assertEqual(result['rejected'], [{'index': 1, 'errors': {'name': 'This field is required.'}}])
+        self.assertTrue(AccMaster.objects.filter(client_id='c1', code='7').exists())
+
+    def test_misel_skips_blank_firm_name(self):
+        records = [{'firm_name': 'Shop', 'address1': 'Main St'}, {'firm_name': '', 'address1': 'x'}]
+        self.assertEqual(
+            _push(BulkMiselSerializer, 'c1', records),
+            {'created': 1, 'updated': 0, 'unchanged': 0, 'deleted': 0, 'total': 2, 'rejected': []},
+        )
+        self.assertEqual(Misel.objects.get(client_id='c1').address1, 'Main St')
+
+
+# ── Streaming loads ───────────────────────────────────────
+
+class LoadViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_two_loads_in_one_transaction(self):
+        columns = ['code', 'name']
+        load_records(AccMaster, 'code', columns, 'c1', iter([{'code': 'A', 'name': 'x'}]))
+        result = load_records(AccMaster, 'code', columns, 'c1', iter([{'code': 'B', 'name': 'y'}]))
+        self.assertEqual((result['created'], result['deleted']), (1, 1))
+
+    def test_ndjson_replace_drops_missing_rows(self):
+        _push(BulkAccInvMastSerializer, 'c1', [{'slno': 1}, {'slno': 2}, {'slno': 3}])
+        body = (
+            '{"slno": 2, "invdate": "2026-03-01", "customerid": "A", "nettotal": "5.5"}\n'
+            '\n'
+            '{"slno": 4, "invdate": null, "customerid": "B", "nettotal": 7}\n'
+        )
+        resp = self.client.post(
+            '/api/invoices/load/?client_id=c1', data=body, content_type='application/x-ndjson',
+        )
+        self.assertEqual(resp.status_code, 200, resp.content)
+        self.assertEqual(
+            {k: resp.data[k] for k in ('created', 'updated', 'deleted', 'total')},
+            {'created': 1, 'updated': 1, 'deleted': 2, 'total': 2},
+        )
+        self.assertEqual(
+            sorted(AccInvMast.objects.filter(client_id='c1').values_list('slno', flat=True)), [2, 4],
+        )
+        self.assertEqual(AccInvMast.objects.get(client_id='c1', slno=2).nettotal, Decimal('5.500'))
+
+    def test_csv_merge_keeps_existing_rows(self):
+        _push(BulkAccMasterSerializer, 'c1', [{'code': 'OLD', 'name': 'Old'}])
+        body = 'code,name,place\nD1,"Shop, One",\nD2,Two,Town\n'
+        resp = self.client.post(
+            '/api/debtors/load/?client_id=c1&mode=merge', data=body, content_type='text/csv',
+        )
+        self.assertEqual(resp.status_code, 200, resp.content)
+        self.assertEqual(resp.data['created'], 2)
+        self.assertEqual(resp.data['deleted'], 0)
+        d1 = AccMaster.objects.get(client_id='c1', code='D1')
+        self.assertEqual((d1.name, d1.place), ('Shop, One', None))
+        self.assertTrue(AccMaster.objects.filter(client_id='c1', code='OLD').exists())
+
+    def test_backslash_n_is_text_not_null(self):
+        # COPY's NULL marker, sent as a value, is stored as text
+        body = json.dumps({'code': 'D1', 'name': 'x', 'place': '\\N'}) + '\n' + json.dumps({'code': 'D2', 'name': 'y'}) + '\n'
+        resp = self.client.post('/api/debtors/load/?client_id=c1', data=body, content_type='application/x-ndjson')
+        self.assertEqual(resp.status_code, 200, resp.content)
+        resp = self.client.post('/api/debtors/load/?client_id=c1&mode=merge',
+                                data='code,name,place\nD3,z,\\N\n', content_type='text/csv')
+        self.assertEqual(resp.status_code, 200, resp.content)
+        places = dict(AccMaster.objects.filter(client_id='c1').values_list('code', 'place'))
+        self.assertEqual(places, {'D1': '\\N', 'D2': None, 'D3': '\\N'})
+
+    def test_bad_row_rolls_back_whole_load(self):
+        _push(BulkAccInvMastSerializer, 'c1', [{'slno': 1}])
+        body = '{"slno": 2}\nnot json\n'
+        resp = self.client.post(
+            '/api/invoices/load/?client_id=c1', data=body, content_type='application/x-ndjson',
+        )
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(list(AccInvMast.objects.filter(client_id='c1').values_list('slno', flat=True)), [1])
+
+    def test_bad_values_name_line_and_column(self):
+        _push(BulkAccMasterSerializer, 'c1', [{'code': 'OLD', 'name': 'Old'}])
+        good = json.dumps({'code': 'D1', 'name': 'x'})
+        for bad, column in (({'name': {'nested': 1}}, 'name'), ({'place': 'x' * 61}, 'place'), ({'code': None}, 'code')):
+            body = f"{good}\n\n{json.dumps({'code': 'D2', 'name': 'y', **bad})}\n"
+            resp = self.client.post('/api/debtors/load/?client_id=c1', data=body, content_type='application/x-ndjson')
+            self.assertEqual(resp.status_code, 400, resp.content)
+            self.assertIn(f'Line 3: {column}', resp.data['detail'])
+        self.assertEqual(list(AccMaster.objects.filter(client_id='c1').values_list('code', flat=True)), ['OLD'])
+
+    def test_unsupported_media_type(self):
+        resp = self.client.post('/api/debtors/load/?client_id=c1', data='{}', content_type='application/json')
+        self.assertEqual(resp.status_code, 415)
+
+
+# ── Keyset pages / NDJSON streaming ───────────────────────
+
+class ListPagingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        _push(BulkAccInvMastSerializer, 'c1', [
+            {'slno': 1, 'invdate': '2026-01-01', 'customerid': 'A', 'nettotal': '1'},
+            {'slno': 2, 'invdate': '2026-01-02', 'customerid': 'A', 'nettotal': '2.5'},
+            {'slno': 3, 'invdate': '2026-01-02', 'customerid': 'B', 'nettotal': '3'},
+            {'slno': 4, 'invdate': None,         'customerid': 'B', 'nettotal': None},
+            {'slno': 5, 'invdate': None,         'customerid': 'A', 'nettotal': '5'},
+            {'slno': 6, 'invdate': '2025-12-31', 'customerid': 'A', 'nettotal': '6'},
+        ])
+
+    def _walk(self, limit, **params):
+        slnos, cursor = [], ''
+        while True:
+            resp = self.client.get('/api/invoices/', {'client_id': 'c1', 'limit': limit, 'cursor': cursor, **params})
+            self.assertEqual(resp.status_code, 200, resp.content)
+            slnos += [r['slno'] for r in resp.data['results']]
+            cursor = resp.data['next_cursor']
+            if not cursor:
+                return slnos
+
+    def test_invoice_pages_follow_ordering(self):
+        # NULL invdates first (PostgreSQL DESC default), then newest first
+        for limit in (1, 2, 4, 10):
+            self.assertEqual(self._walk(limit), [5, 4, 3, 2, 1, 6])
+        self.assertEqual(self._walk(2, customerid='A'), [5, 2, 1, 6])
+
+    def test_ascending_pages_reach_the_nulls(self):
+        # NULL invdates last: a page running into them reads them with a second, NULL-only query
+        for limit in (1, 2, 4, 10):
+            self.assertEqual(self._walk(limit, ordering='invdate'), [6, 1, 2, 3, 4, 5])
+        keyset = Keyset('invdate', 'slno')
+        self.assertEqual(len(keyset.seek([datetime.date(2026, 1, 1), 1], AccInvMast)), 2)
+        self.assertEqual(len(keyset.seek([None, 4], AccInvMast)), 1)
+        self.assertEqual(len(Keyset('name', 'code').seek(['x', 'A'], AccMaster)), 1)
+
+    def test_debtor_pages(self):
+        _push(BulkAccMasterSerializer, 'c1', [{'code': f'D{i:02}', 'name': 'x'} for i in range(7)])
+        codes, cursor = [], ''
+        while cursor is not None:
+            resp = self.client.get('/api/debtors/', {'client_id': 'c1', 'limit': 3, 'cursor': cursor})
+            codes += [r['code'] for r in resp.data['results']]
+            cursor = resp.data['next_cursor']
+        self.assertEqual(codes, [f'D{i:02}' for i in range(7)])
+
+    def test_bad_params(self):
+        self.assertEqual(self.client.get('/api/invoices/?client_id=c1&limit=0').status_code, 400)
+        self.assertEqual(self.client.get('/api/invoices/?client_id=c1&cursor=%%%').status_code, 400)
+        self.assertEqual(self.client.get('/api/invoices/?client_id=c1&stream=csv').status_code, 400)
+
+    def test_invoice_filters_and_ordering(self):
+        self.assertEqual(self._walk(2, invdate__gte='2026-01-01', invdate__lte='2026-01-02'), [3, 2, 1])
+        self.assertEqual(self._walk(2, nettotal__gte='2.5', nettotal__lte='5'), [5, 3, 2])
+        self.assertEqual(self._walk(2, ordering='invdate'), [6, 1, 2, 3, 4, 5])
+        self.assertEqual(self._walk(4, ordering='slno', customerid='B'), [3, 4])
+        plain = self.client.get('/api/invoices/', {'client_id': 'c1', 'ordering': '-slno'}).json()
+        self.assertEqual([r['slno'] for r in plain], [6, 5, 4, 3, 2, 1])
+        for bad in ({'ordering': 'nettotal'}, {'invdate__gte': 'yesterday'}, {'nettotal__lte': 'x'}, {'fields': 'slno,oops'}):
+            self.assertEqual(self.client.get('/api/invoices/', {'client_id': 'c1', **bad}).status_code, 400, bad)
+
+    def test_field_projection(self):
+        resp = self.client.get('/api/invoices/', {'client_id': 'c1', 'fields': 'nettotal,slno', 'limit': 4})
+        self.assertEqual(resp.data['results'][0], {'slno': 5, 'nettotal': '5.000'})
+        # The cursor still carries invdate, which isn't in the output
+        resp = self.client.get('/api/invoices/', {'client_id': 'c1', 'fields': 'slno', 'limit': 4, 'cursor': resp.data['next_cursor']})
+        self.assertEqual(resp.data['results'], [{'slno': 1}, {'slno': 6}])
+
+    def test_debtor_filters(self):
+        _push(BulkAccMasterSerializer, 'c1', [
+            {'code': 'D1', 'name': 'Alpha Stores', 'place': 'Kochi', 'super_code': 'SD'},
+            {'code': 'D2', 'name': 'alpine traders', 'place': 'Kochi', 'super_code': 'SC'},
+            {'code': 'D3', 'name': 'Beta', 'place': 'Thrissur', 'super_code': 'SD'},
+        ])
+        def codes(**params):
+            return [r['code'] for r in self.client.get('/api/debtors/', {'client_id': 'c1', **params}).json()]
+        self.assertEqual(codes(place='Kochi'), ['D1', 'D2'])
+        self.assertEqual(codes(super_code='SD', ordering='-code'), ['D3', 'D1'])
+        self.assertEqual(codes(name__istartswith='ALP', ordering='-name'), ['D2', 'D1'])
+        self.assertEqual(self.client.get('/api/debtors/', {'client_id': 'c1', 'fields': 'code,place'}).json()[0], {'code': 'D1', 'place': 'Kochi'})
+
+    def test_stream_matches_list_output(self):
+        plain  = self.client.get('/api/invoices/?client_id=c1&limit=100').json()['results']
+        resp   = self.client.get('/api/invoices/?client_id=c1&stream=ndjson')
+        self.assertEqual(resp['Content-Type'], 'application/x-ndjson')
+        lines  = b''.join(resp.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], plain)
+        self.assertEqual(plain[2]['nettotal'], '3.000')
+
+
+# ── Lean serializer / fast renderer parity ────────────────
+
+class LeanParityTests(TestCase):
+    def setUp(self):
+        _push(BulkAccMasterSerializer, 'c1', [
+            {'code': 'D1', 'name': 'Plain', 'place': 'Kochi', 'super_code': 'SD', 'phone2': '98470'},
+            {'code': 'D2', 'name': 'Ünïcödé \u2028 "quoted" \\ name', 'place': None},
+            {'code': 'D3', 'name': 'Tab\there', 'exregnodate': '01/04/2024'},
+        ])
+        _push(BulkMiselSerializer, 'c1', [{'firm_name': 'Firm', 'address1': None}])
+        _push(BulkAccInvMastSerializer, 'c1', [
+            {'slno': 1, 'invdate': '2026-01-01', 'customerid': 'D1', 'nettotal': '0'},
+            {'slno': 2, 'invdate': None, 'customerid': None, 'nettotal': None},
+            {'slno': 3, 'invdate': '2024-02-29', 'customerid': 'D2', 'nettotal': '1234567890123.456'},
+            {'slno': 4, 'invdate': '2025-07-15', 'customerid': 'D2', 'nettotal': '-0.5'},
+        ])
+
+    def _assert_parity(self, serializer_class, model):
+        qs       = model.objects.filter(client_id='c1')
+        expected = serializer_class(qs, many=True).data
+        actual   = LeanSerializer(serializer_class).data(qs)
+        self.assertEqual(actual, expected)
+        self.assertEqual(FastJSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_parity(self):
+        for tz in ('Asia/Kolkata', 'UTC'):
+            with self.subTest(tz=tz), timezone.override(tz):
+                self._assert_parity(AccMasterSerializer, AccMaster)
+                self._assert_parity(MiselSerializer, Misel)
+                self._assert_parity(AccInvMastSerializer, AccInvMast)
+
+    def test_renderer_parity_for_aggregates(self):
+        data = {
+            'total_amount': Decimal('12.500'), 'total_invoices': 3, 'client_id': 'c1',
+            'time': timezone.now(), 'names': ['a\u2029b', None, 1.5],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+
+# ── Invoice summary tables ────────────────────────────────
+
+class InvoiceSummaryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        _push(BulkAccInvMastSerializer, 'c1', [
+            {'slno': 1, 'customerid': 'A', 'nettotal': '10.5'},
+            {'slno': 2, 'customerid': 'A', 'nettotal': '4.5'},
+            {'slno': 3, 'customerid': 'B', 'nettotal': '100'},
+            {'slno': 4, 'customerid': None, 'nettotal': '1'},
+        ])
+
+    def _summary(self, **params):
+        return self.client.get('/api/invoices/summary/', {'client_id': 'c1', **params}).json()
+
+    def test_summary_served_from_tables(self):
+        self.assertEqual(self._summary(), {'total_invoices': 4, 'total_amount': 116.0, 'client_id': 'c1'})
+        self.assertEqual(self._summary(customerid='A')['total_sales'], 15.0)
+        self.assertEqual(self._summary(customerid='Z'),
+                         {'customerid': 'Z', 'client_id': 'c1', 'total_sales': 0, 'invoice_count': 0})
+        self.assertEqual(verify_invoice_summary('c1'), [])
+
+    def test_moving_invoice_updates_both_customers(self):
+        _push(BulkAccInvMastSerializer, 'c1', [{'slno': 1, 'customerid': 'B', 'nettotal': '20'}])
+        self.assertEqual(self._summary(customerid='A')['invoice_count'], 1)
+        self.assertEqual(self._summary(customerid='B')['total_sales'], 120.0)
+        self.assertEqual(self._summary()['total_amount'], 125.5)
+        self.assertEqual(verify_invoice_summary('c1'), [])
+
+    def test_truncate_and_load_keep_summary_in_step(self):
+        self.client.delete('/api/invoices/truncate/?client_id=c1')
+        self.assertEqual(self._summary(), {'total_invoices': 0, 'total_amount': None, 'client_id': 'c1'})
+        self.client.post(
+            '/api/invoices/load/?client_id=c1',
+            data='{"slno": 9, "customerid": "C", "nettotal": "7"}\n',
+            content_type='application/x-ndjson',
+        )
+        self.assertEqual(self._summary()['total_invoices'], 1)
+        self.assertEqual(self._summary(customerid='C')['total_sales'], 7.0)
+
+    def test_verify_command_detects_drift(self):
+        AccInvMast.objects.filter(client_id='c1', slno=3).update(nettotal=Decimal('1'))
+        with self.assertRaises(CommandError):
+            call_command('invoice_summary', '--verify', stdout=io.StringIO())
+        call_command('invoice_summary', '--client', 'c1', stdout=io.StringIO())
+        call_command('invoice_summary', '--verify', stdout=io.StringIO())
+
+
+# ── Sales analytics rollups ───────────────────────────────
+
+class InvoiceAnalyticsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        _push(BulkAccInvMastSerializer, 'c1', [
+            {'slno': 1, 'invdate': '2026-01-05', 'customerid': 'A', 'nettotal': '10'},
+            {'slno': 2, 'invdate': '2026-01-05', 'customerid': 'B', 'nettotal': '5'},
+            {'slno': 3, 'invdate': '2026-02-01', 'customerid': 'A', 'nettotal': '7'},
+            {'slno': 4, 'invdate': None, 'customerid': 'B', 'nettotal': '1'},
+        ])
+
+    def _results(self, **params):
+        resp = self.client.get('/api/invoices/analytics/', {'client_id': 'c1', **params})
+        self.assertEqual(resp.status_code, 200, resp.content)
+        return [(r['bucket'], r['total_sales'], r['invoice_count']) for r in resp.json()['results']]
+
+    def test_group_by(self):
+        self.assertEqual(self._results(group_by='day'), [('2026-01-05', 15.0, 2), ('2026-02-01', 7.0, 1)])
+        self.assertEqual(self._results(group_by='month'), [('2026-01-01', 15.0, 2), ('2026-02-01', 7.0, 1)])
+        self.assertEqual(self._results(group_by='customer'), [('A', 17.0, 2), ('B', 6.0, 2)])
+        self.assertEqual(self._results(group_by='customer', limit=1), [('A', 17.0, 2)])
+        self.assertEqual(self._results(group_by='customer', **{'from': '2026-01-01', 'to': '2026-01-31'}),
+                         [('A', 10.0, 1), ('B', 5.0, 1)])
+        self.assertEqual(self._results(group_by='day', **{'from': '2026-01-06'}), [('2026-02-01', 7.0, 1)])
+
+    def test_rollups_follow_moves_and_deletes(self):
+        serializer = BulkAccInvMastSerializer(data={
+            'client_id': 'c1', 'deleted': [2],
+            'records'  : [{'slno': 1, 'invdate': '2026-02-01', 'customerid': 'A', 'nettotal': '10'}],
+        })
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.assertEqual(self._results(group_by='day'), [('2026-02-01', 17.0, 2)])
+        self.assertEqual(verify_invoice_summary('c1'), [])
+
+    def test_bad_params(self):
+        for params in ({'group_by': 'year'}, {'from': '01/02/2026'}, {'from': '2026-02-01', 'to': '2026-01-01'},
+                       {'limit': '0'}):
+            resp = self.client.get('/api/invoices/analytics/', {'client_id': 'c1', **params})
+            self.assertEqual(resp.status_code, 400, params)
+
+
+# ── Partitioned invoices (PostgreSQL) ─────────────────────
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'list partitioning needs PostgreSQL')
+class InvoicePartitionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        _push(BulkAccInvMastSerializer, 'big', [
+            {'slno': i, 'invdate': '2026-01-01', 'customerid': 'A', 'nettotal': '1'} for i in range(1, 6)
+        ])
+        _push(BulkAccInvMastSerializer, 'small', [{'slno': 1, 'invdate': '2026-01-01', 'customerid': 'A', 'nettotal': '2'}])
+        partition_table(threshold=5)
+
+    def test_reads_and_writes_go_through_the_parent(self):
+        self.assertTrue(is_partitioned())
+        result = _push(BulkAccInvMastSerializer, 'big', [
+            {'slno': 1, 'invdate': '2026-01-02', 'customerid': 'B', 'nettotal': '9'},
+            {'slno': 2, 'invdate': '2026-01-01', 'customerid': 'A', 'nettotal': '1'},
+            {'slno': 6, 'invdate': '2026-01-02', 'customerid': 'B', 'nettotal': '9'},
+        ])
+        self.assertEqual((result['created'], result['updated'], result['unchanged']), (1, 1, 1))
+        result = load_records(AccInvMast, 'slno', ['slno', 'invdate', 'customerid', 'nettotal'], 'small',
+                              iter([{'slno': 7, 'invdate': '2026-01-03', 'customerid': 'A', 'nettotal': '3'}]))
+        self.assertEqual((result['created'], result['updated'], result['deleted']), (1, 0, 1))
+        self.assertEqual(AccInvMast.objects.get(client_id='big', slno=1).customerid, 'B')
+        self.assertEqual(list(AccInvMast.objects.filter(client_id='small').values_list('slno', flat=True)), [7])
+        self.assertEqual(verify_invoice_summary('big'), [])
+
+        plan = AccInvMast.objects.filter(client_id='big', invdate__gte='2026-01-01').explain()
+        self.assertIn(partition_name('big'), plan)
+        self.assertNotIn('_default', plan)
+
+    def test_truncate_and_split(self):
+        resp = self.client.delete('/api/invoices/truncate/?client_id=big')
+        self.assertEqual(resp.json()['deleted'], 5)
+        self.assertFalse(AccInvMast.objects.filter(client_id='big').exists())
+
+        self.assertEqual(split_client('small'), 1)
+        self.assertIsNone(split_client('small'))
+        self.assertEqual(self.client.delete('/api/invoices/truncate/?client_id=small').json()['deleted'], 1)
+
+        unpartition_table()
+        self.assertFalse(is_partitioned())
+        _push(BulkAccInvMastSerializer, 'big', [{'slno': 1, 'customerid': 'A', 'nettotal': '1'}])
+        self.assertEqual(AccInvMast.objects.filter(client_id='big').count(), 1)
+
+
+# ── Delta sync (row hashes, manifests, deletes) ───────────
+
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        _push(BulkAccInvMastSerializer, 'c1', [
+            {'slno': i, 'invdate': '2026-01-01', 'customerid': 'A', 'nettotal': '10.5'} for i in range(1, 8)
+        ])
+
+    def test_hash_ignores_representation(self):
+        row_hash = hasher(AccInvMast)
+        self.assertEqual(
+            row_hash({'slno': 1, 'invdate': '2026-01-01', 'customerid': 'A', 'nettotal': 10.5}),
+            row_hash({'slno': '1', 'invdate': '2026-01-01', 'customerid': 'A', 'nettotal': '10.500'}),
+        )
+        self.assertNotEqual(
+            row_hash({'slno': 1, 'nettotal': None}), row_hash({'slno': 1, 'nettotal': '0'}),
+        )
+
+    def test_unchanged_rows_are_not_rewritten(self):
+        before = AccInvMast.objects.get(client_id='c1', slno=1).synced_at
+        result = _push(BulkAccInvMastSerializer, 'c1', [
+            {'slno': 1, 'invdate': '2026-01-01', 'customerid': 'A', 'nettotal': 10.5},
+            {'slno': 2, 'invdate': '2026-01-01', 'customerid': 'A', 'nettotal': '11'},
+        ])
+        self.assertEqual((result['updated'], result['unchanged']), (1, 1))
+        self.assertEqual(AccInvMast.objects.get(client_id='c1', slno=1).synced_at, before)
+
+    def test_manifest_chunks_and_matches_hashes(self):
+        seen, after = [], ''
+        while True:
+            resp = self.client.get('/api/invoices/manifest/', {'client_id': 'c1', 'limit': 3, 'after': after})
+            self.assertEqual(resp.status_code, 200, resp.content)
+            seen += resp.data['items']
+            after = resp.data['next']
+            if after is None:
+                break
+        self.assertEqual([k for k, _ in seen], list(range(1, 8)))
+        stored = dict(AccInvMast.objects.filter(client_id='c1').values_list('slno', 'row_hash'))
+        self.assertEqual(dict(seen), stored)
+        self.assertEqual(self.client.get('/api/invoices/manifest/?client_id=c1&after=x').status_code, 400)
+
+    def test_deleted_keys_and_summary(self):
+        result = _push(BulkAccInvMastSerializer, 'c1', [])
+        self.assertEqual(result['deleted'], 0)
+        serializer = BulkAccInvMastSerializer(data={'client_id': 'c1', 'records': [], 'deleted': [1, 2, 99]})
+        serializer.is_valid(raise_exception=True)
+        self.assertEqual(serializer.save()['deleted'], 2)
+        self.assertEqual(AccInvMast.objects.filter(client_id='c1').count(), 5)
+        self.assertEqual(verify_invoice_summary('c1'), [])
+
+    def test_load_reports_unchanged(self):
+        body = ''.join(
+            json.dumps({'slno': i, 'invdate': '2026-01-01', 'customerid': 'A', 'nettotal': '10.5'}) + '\n'
+            for i in range(1, 8)
+        )
+        resp = self.client.post('/api/invoices/load/?client_id=c1', data=body, content_type='application/x-ndjson')
+        self.assertEqual(
+            {k: resp.data[k] for k in ('created', 'updated', 'unchanged', 'deleted')},
+            {'created': 0, 'updated': 0, 'unchanged': 7, 'deleted': 0},
+        )
+
+
+# ── ?since= reads and tombstones ──────────────────────────
+
+class SinceReadTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        _push(BulkAccMasterSerializer, 'c1', [{'code': f'D{i}', 'name': f'N{i}'} for i in range(5)])
+        self.since = timezone.now().isoformat()
+
+    def _since(self, path='/api/debtors/', **params):
+        resp = self.client.get(path, {'client_id': 'c1', 'since': self.since, **params})
+        self.assertEqual(resp.status_code, 200, resp.content)
+        return resp.data
+
+    def test_only_changes_and_tombstones(self):
+        _push(BulkAccMasterSerializer, 'c1', [
+            {'code': 'D0', 'name': 'N0'},          # unchanged: not resent
+            {'code': 'D1', 'name': 'renamed'},
+            {'code': 'D9', 'name': 'new'},
+        ])
+        serializer = BulkAccMasterSerializer(data={'client_id': 'c1', 'records': [], 'deleted': ['D2', 'nope']})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        data = self._since()
+        self.assertEqual([r['code'] for r in data['results']], ['D1', 'D9'])
+        self.assertEqual((data['deleted'], data['reset']), (['D2'], False))
+        self.assertLess(data['watermark'], timezone.now())
+
+    def test_truncate_is_a_reset(self):
+        self.client.delete('/api/debtors/truncate/?client_id=c1')
+        _push(BulkAccMasterSerializer, 'c1', [{'code': 'X', 'name': 'again'}])
+        data = self._since()
+        self.assertTrue(data['reset'])
+        self.assertEqual([r['code'] for r in data['results']], ['X'])
+
+    def test_replace_load_tombstones_missing_rows(self):
+        body = json.dumps({'slno': 2, 'invdate': '2026-01-01'}) + '\n'
+        _push(BulkAccInvMastSerializer, 'c1', [{'slno': 1}, {'slno': 2}])
+        self.since = timezone.now().isoformat()
+        self.client.post('/api/invoices/load/?client_id=c1', data=body, content_type='application/x-ndjson')
+        data = self._since('/api/invoices/')
+        self.assertEqual(data['deleted'], [1])
+        self.assertEqual([r['slno'] for r in data['results']], [2])
+
+    def test_paging_and_errors(self):
+        _push(BulkAccMasterSerializer, 'c1', [{'code': f'E{i}', 'name': 'x'} for i in range(3)])
+        first = self._since(limit=2)
+        self.assertIn('watermark', first)
+        second = self._since(limit=2, cursor=first['next_cursor'])
+        self.assertNotIn('watermark', second)
+        self.assertEqual([r['code'] for r in first['results'] + second['results']], ['E0', 'E1', 'E2'])
+
+        for params in ({'since': 'yesterday'}, {'since': self.since, 'stream': 'ndjson'}):
+            resp = self.client.get('/api/debtors/', {'client_id': 'c1', **params})
+            self.assertEqual(resp.status_code, 400)
+
+    def test_expired_since_resends_everything(self):
+        self.since = '2000-01-01T00:00:00Z'
+        data = self._since('/api/misel/')
+        self.assertTrue(data['reset'])
+        self.assertEqual(data['results'], [])
+
+
+# ── Load sessions ─────────────────────────────────────────
+
+class LoadSessionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        _push(BulkAccInvMastSerializer, 'c1', [
+            {'slno': i, 'invdate': '2026-01-01', 'customerid': 'A', 'nettotal': '5'} for i in range(1, 4)
+        ])
+
+    def _start(self, path='/api/invoices/sessions/'):
+        resp = self.client.post(f'{path}?client_id=c1')
+        self.assertEqual(resp.status_code, 201, resp.content)
+        return f"/api/sessions/{resp.data['session']}/"
+
+    def test_replace_is_invisible_until_commit(self):
+        url = self._start()
+        resp = self.client.post(f'{url}batches/?client_id=c1', {'records': [
+            {'slno': 3, 'invdate': '2026-01-01', 'customerid': 'A', 'nettotal': '5'},
+            {'slno': 4, 'invdate': '2026-01-02', 'customerid': 'B', 'nettotal': '7'},
+        ]}, format='json')
+        self.assertEqual((resp.data['staged'], resp.data['rows']), (2, 2))
+        body = json.dumps({'slno': 5, 'invdate': '2026-01-03', 'customerid': 'B', 'nettotal': '1'}) + '\n'
+        self.client.post(f'{url}batches/?client_id=c1', data=body, content_type='application/x-ndjson')
+
+        # Still the old snapshot
+        self.assertEqual(sorted(AccInvMast.objects.values_list('slno', flat=True)), [1, 2, 3])
+
+        resp = self.client.post(f'{url}commit/?client_id=c1')
+        self.assertEqual(resp.status_code, 200, resp.content)
+        self.assertEqual(
+            {k: resp.data[k] for k in ('created', 'unchanged', 'deleted', 'total')},
+            {'created': 2, 'unchanged': 1, 'deleted': 2, 'total': 3},
+        )
+        self.assertEqual(sorted(AccInvMast.objects.values_list('slno', flat=True)), [3, 4, 5])
+        self.assertEqual(verify_invoice_summary('c1'), [])
+        self.assertFalse(LoadSessionBatch.objects.exists())
+
+        # A retried commit replays the result; later batches are refused
+        self.assertEqual(self.client.post(f'{url}commit/?client_id=c1').data['created'], 2)
+        resp = self.client.post(f'{url}batches/?client_id=c1', {'records': []}, format='json')
+        self.assertEqual(resp.status_code, 409)
+
+    def test_abort_and_scoping(self):
+        url = self._start('/api/debtors/sessions/')
+        self.client.post(f'{url}batches/?client_id=c1', [{'code': 'X', 'name': 'x'}], format='json')
+        self.assertEqual(self.client.get(f'{url}?client_id=c2').status_code, 404)
+        self.assertEqual(self.client.post(f'{url}commit/?client_id=c2').status_code, 404)
+        resp = self.client.post(f'{url}batches/?client_id=c1', [{'name': 'no code'}], format='json')
+        self.assertEqual(resp.status_code, 400)
+
+        self.assertEqual(self.client.delete(f'{url}?client_id=c1').status_code, 204)
+        self.assertFalse(LoadSession.objects.exists())
+        self.assertFalse(AccMaster.objects.exists())
+
+    def test_bad_values_refuse_the_batch(self):
+        url  = self._start()
+        good = {'slno': 7, 'invdate': '2026-01-01', 'customerid': 'A', 'nettotal': '1'}
+        for bad, column in (({'nettotal': 'abc'}, 'nettotal'), ({'slno': 'x'}, 'slno'), ({'invdate': '2024-13-45'}, 'invdate')):
+            resp = self.client.post(f'{url}batches/?client_id=c1', {'records': [good, {**good, **bad}]}, format='json')
+            self.assertEqual(resp.status_code, 400, resp.content)
+            self.assertIn(f'Record 1: {column}', resp.data['detail'])
+        self.assertEqual(self.client.get(f'{url}?client_id=c1').data['rows'], 0)
+
+    def test_batches_are_stored_typed(self):
+        # 12.0 passes validation as a BIGINT, so it must commit as one too
+        url = self._start()
+        self.client.post(f'{url}batches/?client_id=c1', {'records': [
+            {'slno': 12.0, 'invdate': '2026-01-05', 'customerid': 1e20, 'nettotal': 5},
+        ]}, format='json')
+        [row] = LoadSessionBatch.objects.get().records
+        self.assertEqual((row['slno'], row['customerid']), (12, str(1e20)))
+        self.assertEqual(self.client.post(f'{url}commit/?client_id=c1').status_code, 200)
+        invoice = AccInvMast.objects.get(client_id='c1', slno=12)
+        self.assertEqual((invoice.customerid, invoice.nettotal), (str(1e20), 5))
+
+
+# ── Response cache ────────────────────────────────────────
+
+@override_settings(VSAVER_RESPONSE_CACHE=True)
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        _push(BulkAccMasterSerializer, 'c1', [{'code': 'A', 'name': 'first'}])
+
+    def test_hit_etag_and_invalidation(self):
+        first = self.client.get('/api/debtors/A/?client_id=c1')
+        etag  = first['ETag']
+        with self.assertNumQueries(0):
+            again = self.client.get('/api/debtors/A/?client_id=c1')
+        self.assertEqual(again.content, first.content)
+        self.assertEqual(again['ETag'], etag)
+
+        not_modified = self.client.get('/api/debtors/A/?client_id=c1', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((not_modified.status_code, not_modified.content), (304, b''))
+
+        _push(BulkAccMasterSerializer, 'c1', [{'code': 'A', 'name': 'second'}])
+        fresh = self.client.get('/api/debtors/A/?client_id=c1', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual(json.loads(fresh.content)['name'], 'second')
+
+    def test_keyed_by_client_and_params(self):
+        _push(BulkAccMasterSerializer, 'c2', [{'code': 'B', 'name': 'other'}])
+        self.assertEqual([r['code'] for r in self.client.get('/api/debtors/?client_id=c1').json()], ['A'])
+        self.assertEqual([r['code'] for r in self.client.get('/api/debtors/?client_id=c2').json()], ['B'])
+        self.assertIn('results', self.client.get('/api/debtors/?client_id=c1&limit=1').json())
+
+        self.client.delete('/api/debtors/truncate/?client_id=c1')
+        self.assertEqual(self.client.get('/api/debtors/?client_id=c1').json(), [])
+        self.assertEqual(self.client.get('/api/debtors/A/?client_id=c1').status_code, 404)
+
+    def test_process_local_backend_is_flagged(self):
+        # The suite's locmem cache: fine for one process, flagged by `manage.py check`
+        self.assertFalse(shared_cache())
+        self.assertEqual([w.id for w in check_response_cache(None)], ['vsaver.W001'])
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'vsaver_cache'}}
+        with override_settings(CACHES=shared):
+            self.assertTrue(shared_cache())
+            self.assertEqual(check_response_cache(None), [])
+
+
+# ── Compressed bodies ─────────────────────────────────────
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_gzip_columnar_bulk_push(self):
+        body = json.dumps({
+            'client_id': 'c1',
+            'records'  : {'columns': ['code', 'name', 'place'], 'rows': [['A', 'Asha', 'Kochi'], ['B', 'Binu', None]]},
+        }).encode()
+        resp = self.client.post(
+            '/api/debtors/bulk/', gzip.compress(body), content_type='application/json', HTTP_CONTENT_ENCODING='gzip',
+        )
+        self.assertEqual((resp.status_code, resp.json()['created']), (200, 2))
+        self.assertEqual(AccMaster.objects.get(client_id='c1', code='A').place, 'Kochi')
+
+        ragged = {'client_id': 'c1', 'records': {'columns': ['code', 'name'], 'rows': [['A']]}}
+        self.assertEqual(self.client.post('/api/debtors/bulk/', ragged, format='json').status_code, 400)
+
+    def test_gzip_ndjson_load(self):
+        body = b'{"code": "A", "name": "x"}\n{"code": "B", "name": "y"}\n'
+        resp = self.client.post(
+            '/api/debtors/load/?client_id=c1', gzip.compress(body),
+            content_type='application/x-ndjson', HTTP_CONTENT_ENCODING='gzip',
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(AccMaster.objects.filter(client_id='c1').count(), 2)
+
+    def test_rejected_bodies(self):
+        resp = self.client.post(
+            '/api/debtors/bulk/', b'xx', content_type='application/json', HTTP_CONTENT_ENCODING='br',
+        )
+        self.assertEqual(resp.status_code, 415)
+        resp = self.client.post(
+            '/api/debtors/bulk/', b'not gzip', content_type='application/json', HTTP_CONTENT_ENCODING='gzip',
+        )
+        self.assertEqual(resp.status_code, 400)
+        with override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=1000):
+            bomb = gzip.compress(b'[' + b' ' * 100000 + b']')
+            resp = self.client.post(
+                '/api/debtors/bulk/', bomb, content_type='application/json', HTTP_CONTENT_ENCODING='gzip',
+            )
+        self.assertEqual(resp.status_code, 413)
+
+    @override_settings(VSAVER_RESPONSE_CACHE=False)
+    def test_negotiated_responses(self):
+        _push(BulkAccMasterSerializer, 'c1', [{'code': f'D{i:04d}', 'name': 'n' * 20} for i in range(200)])
+        plain = self.client.get('/api/debtors/?client_id=c1')
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        packed = self.client.get('/api/debtors/?client_id=c1', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(packed['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(packed.content), plain.content)
+        self.assertLess(len(packed.content), len(plain.content))
+
+        refused = self.client.get('/api/debtors/?client_id=c1', HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertFalse(refused.has_header('Content-Encoding'))
+
+        stream = self.client.get('/api/debtors/?client_id=c1&stream=ndjson', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(stream['Content-Encoding'], 'gzip')
+        rows = gzip.decompress(b''.join(stream.streaming_content)).splitlines()
+        self.assertEqual(len(rows), 200)
+
+
+# ── Multi-entity sync ─────────────────────────────────────
+
+class SyncTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        _push(BulkAccMasterSerializer, 'c1', [{'code': 'OLD', 'name': 'Old'}])
+        _push(BulkAccInvMastSerializer, 'c1', [{'slno': 1, 'customerid': 'OLD', 'nettotal': '5'}])
+
+    def _sync(self, body):
+        return self.client.post('/api/sync/', {'client_id': 'c1', **body}, format='json')
+
+    def test_sections_in_one_call(self):
+        resp = self._sync({
+            'debtors' : {'mode': 'replace', 'records': [{'code': 'D1', 'name': 'Asha'}]},
+            'misel'   : {'records': [{'firm_name': 'Firm', 'address1': 'Road'}]},
+            'invoices': {'records': [{'slno': 2, 'customerid': 'D1', 'nettotal': '7'}], 'deleted': [1]},
+        })
+        self.assertEqual(resp.status_code, 200, resp.content)
+        body = resp.json()
+        self.assertEqual((body['debtors']['created'], body['debtors']['deleted']), (1, 1))
+        self.assertEqual(body['misel']['created'], 1)
+        self.assertEqual((body['invoices']['mode'], body['invoices']['created'], body['invoices']['deleted']),
+                         ('upsert', 1, 1))
+        self.assertEqual(list(AccMaster.objects.filter(client_id='c1').values_list('code', flat=True)), ['D1'])
+        self.assertEqual(verify_invoice_summary('c1'), [])
+
+    def test_nothing_written_unless_every_section_is_valid(self):
+        resp = self._sync({
+            'debtors' : {'mode': 'replace', 'records': [{'code': 'D1', 'name': 'Asha'}]},
+            'invoices': {'mode': 'replace', 'records': [{'slno': 'x'}]},
+        })
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('rejected', resp.json()['invoices'])
+        self.assertTrue(AccMaster.objects.filter(client_id='c1', code='OLD').exists())
+        self.assertEqual(self._sync({}).status_code, 400)
+        self.assertEqual(self._sync({'misel': {'mode': 'merge', 'records': []}}).status_code, 400)
+
+
+# ── Admission control ─────────────────────────────────────
+
+class AdmissionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+
+    def _push(self, client_id='c1'):
+        return self.client.post('/api/debtors/bulk/', {'client_id': client_id, 'records': []}, format='json')
+
+    @override_settings(VSAVER_BULK_BURST=2, VSAVER_BULK_RATE_PER_MIN=6)
+    def test_token_bucket_per_client(self):
+        self.assertEqual([self._push().status_code for _ in range(3)], [200, 200, 429])
+        resp = self._push()
+        self.assertEqual(resp.status_code, 429)
+        self.assertIn(int(resp['Retry-After']), range(8, 11))
+        self.assertEqual(self._push('c2').status_code, 200)
+        # Reads are never limited
+        self.assertEqual(self.client.get('/api/debtors/?client_id=c1').status_code, 200)
+
+    @override_settings(VSAVER_BULK_MAX_CONCURRENT=2, VSAVER_BULK_MAX_CONCURRENT_PER_CLIENT=1, VSAVER_BULK_RETRY_AFTER=3)
+    def test_concurrency_caps(self):
+        with bulk_slot('c1'):
+            resp = self._push()
+            self.assertEqual((resp.status_code, resp['Retry-After']), (429, '3'))
+            self.assertEqual(self.client.get('/api/vsaver/status/').json()['bulk']['in_flight'], 1)
+            with bulk_slot('c2'):
+                self.assertEqual(self._push('c3').status_code, 429)
+        self.assertEqual(self._push().status_code, 200)
+        self.assertEqual(self.client.get('/api/vsaver/status/').json()['bulk']['in_flight'], 0)
+
+    def test_status_shows_queue_depth(self):
+        self.client.post('/api/debtors/bulk/?async=1', {'client_id': 'c1', 'records': []}, format='json')
+        self.assertEqual(self.client.get('/api/vsaver/status/').json()['bulk']['jobs_queued'], 1)
+
+    def test_process_local_limits_are_flagged(self):
+        self.assertEqual(self.client.get('/api/vsaver/status/').json()['bulk']['scope'], 'process')
+        self.assertEqual([w.id for w in check_admission_limits(None)], ['vsaver.W003'])
+        with override_settings(VSAVER_BULK_RATE_PER_MIN=0, VSAVER_BULK_MAX_CONCURRENT=0, VSAVER_BULK_MAX_CONCURRENT_PER_CLIENT=0):
+            self.assertEqual(check_admission_limits(None), [])
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'vsaver_cache'}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_admission_limits(None), [])
+
+
+# ── Tenant API keys ───────────────────────────────────────
+
+class AuthTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        KEYS.clear()
+        _, self.key = create_key('c1', 'till 1')
+        _push(BulkAccMasterSerializer, 'c1', [{'code': 'A', 'name': 'One'}])
+        _push(BulkAccMasterSerializer, 'c2', [{'code': 'B', 'name': 'Two'}])
+
+    def _get(self, url, key=None, **extra):
+        return self.client.get(url, HTTP_AUTHORIZATION=f'Api-Key {key or self.key}', **extra)
+
+    def test_key_names_the_tenant(self):
+        resp = self._get('/api/debtors/')
+        self.assertEqual([r['code'] for r in resp.json()], ['A'])
+        self.assertEqual(self._get('/api/debtors/?client_id=c1').status_code, 200)
+        self.assertEqual(self._get('/api/debtors/?client_id=c2').status_code, 403)
+        # Same URL, different tenants: the response cache must not mix them up
+        _, other = create_key('c2')
+        self.assertEqual([r['code'] for r in self._get('/api/debtors/', other).json()], ['B'])
+
+    def test_invalid_and_revoked_keys(self):
+        resp = self._get('/api/debtors/', 'vs_nope')
+        self.assertEqual((resp.status_code, resp['WWW-Authenticate']), (401, 'Api-Key'))
+        self.assertEqual(revoke_keys(self.key[:12]), 1)
+        self.assertEqual(self._get('/api/debtors/').status_code, 401)
+
+    def test_lookup_is_cached(self):
+        request = AsyncRequestFactory().get('/', headers={'X-API-Key': self.key})
+        resolve_tenant(request)
+        with self.assertNumQueries(0):
+            self.assertIsNone(resolve_tenant(request))
+        self.assertEqual(request.tenant, 'c1')
+
+    @override_settings(VSAVER_REQUIRE_API_KEY=True)
+    def test_key_required(self):
+        self.assertEqual(self.client.get('/api/debtors/?client_id=c1').status_code, 401)
+        push = self.client.post('/api/debtors/bulk/', {'client_id': 'c1', 'records': []}, format='json')
+        self.assertEqual(push.status_code, 401)
+        self.assertEqual(self._get('/api/debtors/').status_code, 200)
+
+    def test_writes_take_the_tenant_from_the_key(self):
+        auth = {'HTTP_AUTHORIZATION': f'Api-Key {self.key}'}
+        resp = self.client.post('/api/debtors/bulk/', {'records': [{'code': 'C', 'name': 'Three'}]}, format='json', **auth)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(AccMaster.objects.filter(client_id='c1', code='C').exists())
+        resp = self.client.post('/api/debtors/bulk/', {'client_id': 'c2', 'records': []}, format='json', **auth)
+        self.assertEqual(resp.status_code, 403)
+        resp = self.client.post('/api/sync/', {'misel': {'records': [{'firm_name': 'F'}]}}, format='json', **auth)
+        self.assertEqual((resp.status_code, resp.data['client_id']), (200, 'c1'))
+
+    async def test_async_views(self):
+        factory = AsyncRequestFactory()
+        resp = await async_views.debtor_list(factory.get('/api/debtors/', headers={'X-API-Key': self.key}))
+        self.assertEqual([r['code'] for r in json.loads(resp.content)], ['A'])
+        resp = await async_views.debtor_list(factory.get('/api/debtors/?client_id=c2', headers={'X-API-Key': self.key}))
+        self.assertEqual(resp.status_code, 403)
+        resp = await async_views.debtor_list(factory.get('/api/debtors/', headers={'X-API-Key': 'vs_nope'}))
+        self.assertEqual((resp.status_code, resp['WWW-Authenticate']), (401, 'Api-Key'))
+
+
+# ── Async bulk jobs ───────────────────────────────────────
+
+@override_settings(VSAVER_JOB_CHUNK_SIZE=2)
+class BulkJobTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def _submit(self, records, **extra):
+        body = {'client_id': 'c1', 'records': records, **extra}
+        return self.client.post('/api/invoices/bulk/?async=1&batch_id=b1', body, format='json')
+
+    def test_queue_run_and_poll(self):
+        _push(BulkAccInvMastSerializer, 'c1', [{'slno': 9, 'customerid': 'Z', 'nettotal': '1'}])
+        resp = self._submit(
+            [{'slno': i, 'invdate': '2026-01-01', 'customerid': 'A', 'nettotal': '2'} for i in range(1, 6)],
+            deleted=[9],
+        )
+        self.assertEqual((resp.status_code, resp.data['status']), (202, 'queued'))
+        self.assertFalse(AccInvMast.objects.filter(slno=1).exists())
+
+        job = run_next()
+        self.assertEqual((job.status, job.processed, job.created, job.deleted), ('done', 5, 5, 1))
+        self.assertIsNone(job.payload)
+        self.assertIsNone(run_next())
+
+        polled = self.client.get(resp.data['url'], {'client_id': 'c1'})
+        self.assertEqual((polled.data['status'], polled.data['created']), ('done', 5))
+        self.assertEqual(self.client.get(resp.data['url'], {'client_id': 'c2'}).status_code, 404)
+        self.assertEqual(verify_invoice_summary('c1'), [])
+
+    @override_settings(VSAVER_BULK_MAX_CONCURRENT=1)
+    def test_idle_poll_takes_no_slot(self):
+        cache.clear()
+        with bulk_slot('c1'):           # the only slot, held by a web push
+            self.assertIsNone(run_next())
+        self.assertEqual(admission.in_flight(), 0)
+
+    def test_batch_id_makes_retries_idempotent(self):
+        first = self._submit([{'slno': 1}])
+        retry = self._submit([{'slno': 1}])
+        self.assertEqual(first.data['job'], retry.data['job'])
+        self.assertEqual(BulkJob.objects.count(), 1)
+
+    def test_resume_and_failure(self):
+        job = BulkJob.objects.get(id=self._submit([{'slno': i} for i in range(1, 6)]).data['job'])
+        BulkJob.objects.filter(id=job.id).update(processed=4)   # as if a worker died after two chunks
+        self.assertEqual(run_next().created, 1)
+
+        resp = self.client.post(
+            '/api/invoices/bulk/?async=1', {'client_id': 'c1', 'records': [{'slno': 'x'}]}, format='json',
+        )
+        self.assertEqual((resp.data['total'], resp.data['rejected'][0]['index']), (0, 0))   # caught before queueing
+        # A payload that only breaks at write time still fails the job
+        BulkJob.objects.filter(id=resp.data['job']).update(payload={'records': [{'slno': 'x'}], 'deleted': []})
+        failed = run_next()
+        self.assertEqual(failed.status, 'failed')
+        self.assertTrue(failed.error)
+        self.assertIsNotNone(failed.payload)
+
+
+# ── Async read views ──────────────────────────────────────
+
+@override_settings(VSAVER_RESPONSE_CACHE=False)
+class AsyncReadTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        _push(BulkAccMasterSerializer, 'c1', [{'code': f'D{i}', 'name': f'N{i}', 'place': None} for i in range(4)])
+        _push(BulkMiselSerializer, 'c1', [{'firm_name': 'Firm', 'address1': 'Road'}])
+        _push(BulkAccInvMastSerializer, 'c1', [
+            {'slno': i, 'invdate': f'2026-01-0{i}', 'customerid': 'A', 'nettotal': '1.5'} for i in range(1, 5)
+        ])
+
+    async def test_same_bytes_as_sync_views(self):
+        factory = AsyncRequestFactory()
+        cases = [
+            (async_views.debtor_list, '/api/debtors/', {}, 'client_id=c1'),
+            (async_views.debtor_list, '/api/debtors/', {}, 'client_id=c1&limit=3'),
+            (async_views.debtor_list, '/api/debtors/', {}, 'client_id=c1&since=2000-01-01T00:00:00Z'),
+            (async_views.debtor_list, '/api/debtors/', {}, 'client_id=c1&limit=0'),
+            (async_views.debtor_detail, '/api/debtors/D1/', {'code': 'D1'}, 'client_id=c1'),
+            (async_views.debtor_detail, '/api/debtors/nope/', {'code': 'nope'}, 'client_id=c1'),
+            (async_views.misel_list, '/api/misel/', {}, 'client_id=c1'),
+            (async_views.invoice_list, '/api/invoices/', {}, 'client_id=c1&customerid=A&limit=2'),
+            (async_views.invoice_list, '/api/invoices/', {}, 'client_id=c1&ordering=invdate&fields=slno,invdate&limit=2'),
+            (async_views.invoice_list, '/api/invoices/', {}, 'client_id=c1&nettotal__gte=x'),
+            (async_views.debtor_list, '/api/debtors/', {}, 'client_id=c1&name__istartswith=n&ordering=-name'),
+            (async_views.invoice_detail, '/api/invoices/2/', {'slno': 2}, 'client_id=c1'),
+            (async_views.invoice_summary, '/api/invoices/summary/', {}, 'client_id=c1'),
+            (async_views.invoice_summary, '/api/invoices/summary/', {}, 'client_id=c1&customerid=A'),
+            (async_views.invoice_summary, '/api/invoices/summary/', {}, ''),
+            (async_views.invoice_analytics, '/api/invoices/analytics/', {}, 'client_id=c1&group_by=month'),
+            (async_views.invoice_analytics, '/api/invoices/analytics/', {}, 'client_id=c1&group_by=customer&limit=1'),
+            (async_views.invoice_analytics, '/api/invoices/analytics/', {}, 'client_id=c1&from=2026-02-01&to=x'),
+            (async_views.debtor_search, '/api/debtors/search/', {}, 'client_id=c1&q=n2'),
+            (async_views.debtor_search, '/api/debtors/search/', {}, 'client_id=c1&q=n'),
+        ]
+        for view, path, kwargs, query in cases:
+            sync = await sync_to_async(self.client.get)(f'{path}?{query}')
+            resp = await view(factory.get(f'{path}?{query}'), **kwargs)
+            self.assertEqual(resp.status_code, sync.status_code, f'{path}?{query}')
+            if 'since=' in query:
+                # Only the watermark (taken per request) may differ
+                mine, theirs = json.loads(resp.content), json.loads(sync.content)
+                self.assertEqual(mine.pop('watermark')[:16], theirs.pop('watermark')[:16])
+                self.assertEqual(mine, theirs)
+            else:
+                self.assertEqual(resp.content, sync.content, f'{path}?{query}')
+
+    async def test_stream(self):
+        request = AsyncRequestFactory().get('/api/invoices/?client_id=c1&stream=ndjson')
+        resp    = await async_views.invoice_list(request)
+        lines   = [line async for line in resp.streaming_content]
+        self.assertEqual([json.loads(line)['slno'] for line in lines], [4, 3, 2, 1])
+
+
+# ── Debtor search ─────────────────────────────────────────
+
+class SearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        _push(BulkAccMasterSerializer, 'c1', [
+            {'code': 'D1', 'name': 'Kochi Traders',      'place': 'Kochi',  'phone2': '9876543210'},
+            {'code': 'D2', 'name': 'Ernakulam Kochi Co', 'place': 'Aluva',  'phone2': '9447001122'},
+            {'code': 'D3', 'name': 'Thrissur Stores',    'place': 'Kochi',  'phone2': None},
+            {'code': 'D4', 'name': 'Kochi',              'place': None,     'phone2': '0484 2201234'},
+        ])
+        _push(BulkAccMasterSerializer, 'c2', [{'code': 'X1', 'name': 'Kochi Exports'}])
+
+    def _codes(self, **params):
+        resp = self.client.get('/api/debtors/search/', {'client_id': 'c1', **params})
+        self.assertEqual(resp.status_code, 200, resp.content)
+        return [r['code'] for r in resp.json()['results']]
+
+    def test_prefix_matches_rank_first(self):
+        # Name prefix (shortest, exact first), then the word further in
+        self.assertEqual(self._codes(q='kochi'), ['D4', 'D1', 'D2'])
+        self.assertEqual(self._codes(q='kochi', limit=1), ['D4'])
+
+    def test_phone_substring_and_typo(self):
+        self.assertEqual(self._codes(q='7001'), ['D2'])
+        self.assertEqual(self._codes(q='Thrisur Stores'), ['D3'])
+
+    def test_bad_params(self):
+        for params in ({'q': 'k'}, {'q': ''}, {'q': 'kochi', 'limit': 'x'}):
+            self.assertEqual(self.client.get('/api/debtors/search/', {'client_id': 'c1', **params}).status_code, 400)
+
+    def test_tenant_isolation_and_fresh_after_write(self):
+        self.assertEqual(self._codes(q='exports'), [])
+        self.assertEqual(self._codes(client_id='c2', q='kochi'), ['X1'])
+        _push(BulkAccMasterSerializer, 'c1', [{'code': 'D5', 'name': 'Kochi Exports'}])
+        self.assertEqual(self._codes(q='exports'), ['D5'])
+
+    def test_index_follows_writes_from_other_processes(self):
+        # Rows written without this process seeing a cache invalidation
+        self.assertEqual(self._codes(q='thrissur'), ['D3'])
+        AccMaster.objects.create(code='D6', name='Thrissur Agencies', client_id='c1')
+        self.assertEqual(self._codes(q='thrissur'), ['D6', 'D3'])
+        AccMaster.objects.filter(code='D3', client_id='c1').delete()
+        record_deleted(AccMaster, 'c1', ['D3'])
+        self.assertEqual(self._codes(q='thrissur'), ['D6'])
+        debtor = AccMaster.objects.get(code='D6', client_id='c1')
+        debtor.name = 'Thrissur Traders'
+        debtor.save()
+        self.assertEqual(self._codes(q='agencies'), [])
+
+    def test_index_similarity_matches_word_similarity(self):
+        index = TrigramIndex([('A', 'Kochi Traders', None, None)])
+        self.assertEqual(trigrams('ab'), {'  a', ' ab', 'ab '})
+        [(code, _, _, _, score)] = index.search('Kochi Tradrs', 5)
+        self.assertEqual(code, 'A')
+        self.assertAlmostEqual(score, 11 / 13)     # all but "adr" and "drs"
+
+    def test_search_indexes_command(self):
+        if connection.vendor != 'postgresql':
+            with self.assertRaises(CommandError):
+                call_command('search_indexes', stdout=io.StringIO())
+            return
+        out = io.StringIO()
+        call_command('search_indexes', stdout=out)
+        self.assertIn('acc_master_name_trgm_idx', out.getvalue())
+
+
+# ── Database connection stats ─────────────────────────────
+
+@override_settings(VSAVER_OPS_TOKEN='ops-secret')
+class DatabaseStatusTests(TestCase):
+    def test_reports_mode_and_handshakes(self):
+        body = APIClient().get('/api/vsaver/status/db/', HTTP_AUTHORIZATION='Bearer ops-secret').json()['databases']['default']
+        self.assertIn(body['mode'], ('per-request', 'persistent', 'pool'))
+        self.assertGreaterEqual(body['connections_opened'], 1)   # the test database connection
+        self.assertEqual(body['pool'] is None, body['mode'] != 'pool')
+
+
+# ── Read replicas ─────────────────────────────────────────
+
+@override_settings(VSAVER_DB_REPLICAS=['r1', 'r2'])
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.probe = replica_read(lambda view, request: ReplicaRouter().db_for_read(AccMaster))
+
+    def _read(self, query=''):
+        request = RequestFactory().get(f'/?{query}')
+        request.tenant = 'c1'
+        return self.probe(None, request)
+
+    def test_least_loaded_replica(self):
+        first = _take()
+        self.assertNotEqual(_take(), first)
+        _give(first)
+        self.assertEqual(_take(), first)
+        self.assertEqual(in_flight(), {'r1': 1, 'r2': 1})
+        _give('r1')
+        self.assertEqual(_take(), 'r1')
+        _give('r1')
+        _give('r2')
+        self.assertEqual(in_flight(), {'r1': 0, 'r2': 0})
+
+    def test_reads_your_writes(self):
+        cache.set(_gen_key('c1'), time.time_ns() - 60 * 10**9)
+        self.assertIn(self._read(), ('r1', 'r2'))
+        self.assertEqual(in_flight(), {'r1': 0, 'r2': 0})
+        self.assertIsNone(self._read('since=2026-01-01T00:00:00Z'))
+        self.assertIsNone(ReplicaRouter().db_for_read(AccMaster))   # outside a replica_read view
+
+        _push(BulkAccMasterSerializer, 'c1', [{'code': 'A', 'name': 'One'}])
+        self.assertIsNone(self._read())
+        with override_settings(VSAVER_REPLICA_STICKY_SECONDS=0):
+            self.assertIn(self._read(), ('r1', 'r2'))
+
+    def test_needs_a_shared_cache(self):
+        self.assertEqual([e.id for e in check_replica_stickiness(None)], ['vsaver.E002'])
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'vsaver_cache'}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_replica_stickiness(None), [])
+
+
+# Committed rows, so a second connection (the replica alias) can see them
+@unittest.skipUnless('replica1' in connections, 'needs a "replica1" database alias (a TEST MIRROR of default)')
+@override_settings(VSAVER_DB_REPLICAS=['replica1'], VSAVER_REPLICA_STICKY_SECONDS=0, VSAVER_RESPONSE_CACHE=False)
+class ReplicaReadTests(TransactionTestCase):
+    databases = '__all__'
+
+    def test_list_reads_from_replica(self):
+        _push(BulkAccMasterSerializer, 'c1', [{'code': 'A', 'name': 'One'}])
+        with CaptureQueriesContext(connections['replica1']) as replica:
+            resp = APIClient().get('/api/debtors/?client_id=c1')
+        self.assertEqual([r['code'] for r in resp.json()], ['A'])
+        self.assertTrue(replica.captured_queries)
+
+
+# ── Request metrics ───────────────────────────────────────
+
+@override_settings(VSAVER_RESPONSE_CACHE=False, VSAVER_METRICS_CLIENT_LABEL=True, VSAVER_OPS_TOKEN='ops-secret')
+class MetricsTests(TestCase):
+    def setUp(self):
+        metrics.REGISTRY.reset()
+        self.client = APIClient()
+
+    def _scrape(self):
+        return self.client.get('/api/vsaver/metrics/', HTTP_AUTHORIZATION='Bearer ops-secret').content.decode()
+
+    def test_server_timing_and_exposition(self):
+        self.client.post(
+            '/api/debtors/bulk/', {'client_id': 'c1', 'records': [{'code': 'A', 'name': 'x'}, {'code': 'B', 'name': 'y'}]},
+            format='json',
+        )
+        resp = self.client.get('/api/debtors/?client_id=c1')
+        self.assertRegex(resp['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", serialize;dur=[\d.]+, total;dur=[\d.]+$')
+
+        text = self._scrape()
+        self.assertIn('vsaver_requests_total{view="debtor-list",client_id="c1",method="GET",status="200"} 1', text)
+        self.assertIn('vsaver_bulk_rows_total{view="debtor-bulk",client_id="c1"} 2', text)
+        self.assertIn('vsaver_request_duration_seconds_count{view="debtor-list",client_id="c1"} 1', text)
+        self.assertIn('vsaver_request_duration_seconds_bucket{view="debtor-list",client_id="c1",le="+Inf"} 1', text)
+        self.assertRegex(text, r'vsaver_db_queries_total\{view="debtor-list",client_id="c1"\} [1-9]')
+
+    def test_streamed_bodies_are_measured_when_sent(self):
+        _push(BulkAccMasterSerializer, 'c1', [{'code': 'A', 'name': 'x'}])
+        resp = self.client.get('/api/debtors/?client_id=c1&stream=ndjson')
+        body = b''.join(resp.streaming_content)
+        self.assertIn(
+            f'vsaver_response_bytes_total{{view="debtor-list",client_id="c1"}} {len(body)}',
+            metrics.REGISTRY.render(),
+        )
+
+    def test_ops_endpoints_need_the_token(self):
+        _, key = create_key('c1')
+        for path in ('/api/vsaver/metrics/', '/api/vsaver/status/db/'):
+            self.assertIn(self.client.get(path).status_code, (401, 403))
+            self.assertIn(self.client.get(path, HTTP_AUTHORIZATION='Bearer nope').status_code, (401, 403))
+            self.assertIn(self.client.get(path, HTTP_X_API_KEY=key).status_code, (401, 403))   # a tenant's key
+        with override_settings(VSAVER_OPS_TOKEN=''):
+            self.assertIn(self.client.get('/api/vsaver/metrics/', HTTP_AUTHORIZATION='Bearer ').status_code, (401, 403))
+
+    @override_settings(VSAVER_METRICS_MAX_CLIENTS=2)
+    def test_client_labels_are_resolved_and_capped(self):
+        for client_id in ('c1', 'c2', 'c3', 'c4'):
+            self.client.get(f'/api/debtors/?client_id={client_id}')
+        self.client.get('/api/nope/?client_id=minted')          # never resolved: no label
+        text = self._scrape()
+        self.assertIn('vsaver_requests_total{view="debtor-list",client_id="c2",method="GET",status="200"} 1', text)
+        self.assertIn('vsaver_requests_total{view="debtor-list",client_id="other",method="GET",status="200"} 2', text)
+        self.assertNotIn('minted', text)
+
+
+# ── Synthetic tenants and the benchmark harness ───────────
+
+class BenchmarkHarnessTests(TestCase):
+    def test_seed_tenants(self):
+        call_command('seed_tenants', clients=2, debtors=3, invoices=5, prefix='t-', stdout=io.StringIO())
+        self.assertEqual(AccMaster.objects.filter(client_id='t-002').count(), 3)
+        self.assertEqual(AccInvMast.objects.filter(client_id='t-001').count(), 5)
+        call_command('seed_tenants', clients=0, clear=True, prefix='t-', stdout=io.StringIO())
+        self.assertFalse(AccInvMast.objects.filter(client_id__startswith='t-').exists())
+
+    def test_endpoints_suite_reports_every_route(self):
+        out = io.StringIO()
+        with tempfile.NamedTemporaryFile(suffix='.json') as fh:
+            call_command('benchmark', 'endpoints', rows=120, repeat=1, requests=100, json_path=fh.name, stdout=out)
+            report = json.load(open(fh.name))
+            call_command('benchmark', 'endpoints', rows=120, repeat=1, requests=100, compare_path=fh.name, stdout=out)
+        self.assertEqual(report['meta']['rows'], 120)
+        names = [r['name'] for r in report['suites']['endpoints']]
+        self.assertIn('DELETE invoices/truncate/', names)
+        self.assertIn('GET invoices/summary/', names)
+        self.assertIn('% time', out.getvalue())
+        self.assertFalse(AccMaster.objects.filter(client_id='__bench__').exists())
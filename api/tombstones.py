@@ -0,0 +1,96 @@
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import SyncTombstone
+
+
+DEFAULT_SAFETY_WINDOW = 120    # seconds
+DEFAULT_RETENTION     = 30     # days
+
+
+def safety_window():
+    return datetime.timedelta(seconds=getattr(settings, 'VSAVER_SINCE_SAFETY_WINDOW', DEFAULT_SAFETY_WINDOW))
+
+
+def retention():
+    return datetime.timedelta(days=getattr(settings, 'VSAVER_TOMBSTONE_RETENTION_DAYS', DEFAULT_RETENTION))
+
+
+def entity(model):
+    return model._meta.model_name
+
+
+def record_deleted(model, client_id, keys, using=None, deleted_at=None):
+    """Remember that the client's rows with these keys were deleted."""
+    deleted_at = deleted_at or timezone.now()
+    SyncTombstone.objects.using(using).bulk_create(
+        [
+            SyncTombstone(client_id=client_id, entity=entity(model), key=str(k), deleted_at=deleted_at)
+            for k in keys
+        ],
+        batch_size=1000,
+    )
+
+
+def record_reset(model, client_id, using=None):
+    """
+    Remember that every row of `model` was removed for the client. The
+    reset supersedes that entity's older tombstones, so they are dropped.
+    """
+    tombstones = SyncTombstone.objects.using(using).filter(client_id=client_id, entity=entity(model))
+    tombstones.delete()
+    tombstones.create(client_id=client_id, entity=entity(model), key=None, deleted_at=timezone.now())
+
+
+def watermark():
+    """
+    The `since` a reader should send next time. It trails the clock by the
+    safety window so rows stamped by a push that commits late are not
+    missed; rows inside the window are simply sent twice.
+    """
+    return timezone.now() - safety_window()
+
+
+def expired(since):
+    """True when tombstones older than `since` may already be pruned."""
+    return since < timezone.now() - retention()
+
+
+def deleted_since(model, client_id, key, since):
+    """
+    Return (reset, keys): whether the client's `model` rows were all
+    removed after `since`, and the keys deleted after it.
+    """
+    return _split(model, key, list(_keys_since(model, client_id, since)))
+
+
+async def adeleted_since(model, client_id, key, since):
+    return _split(model, key, [k async for k in _keys_since(model, client_id, since)])
+
+
+def _keys_since(model, client_id, since):
+    return (
+        SyncTombstone.objects
+        .filter(client_id=client_id, entity=entity(model), deleted_at__gt=since)
+        .order_by('deleted_at', 'id')
+        .values_list('key', flat=True)
+    )
+
+
+def _split(model, key, rows):
+    key_field = model._meta.get_field(key)
+    reset, keys = False, []
+    for k in rows:
+        if k is None:
+            reset = True
+        else:
+            keys.append(key_field.to_python(k))
+    return reset, list(dict.fromkeys(keys))
+
+
+def prune(before):
+    """Drop tombstones older than `before`; returns how many went."""
+    count, _ = SyncTombstone.objects.filter(deleted_at__lt=before).delete()
+    return count
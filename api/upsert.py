@@ -0,0 +1,186 @@
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from . import metrics
+from .caching import invalidate
+from .hashing import hash_fields, hasher
+from .partitions import is_partitioned
+from .tombstones import record_deleted
+
+DEFAULT_BATCH_SIZE = 1000
+
+# PostgreSQL caps a single statement at 65535 bind parameters
+PG_MAX_PARAMS = 65535
+
+
+def get_batch_size(batch_size=None):
+    size = batch_size or getattr(settings, 'VSAVER_UPSERT_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    return max(1, int(size))
+
+
+def _dedupe(model, key, rows):
+    """
+    Collapse rows sharing the same key, last one wins (same as the old
+    per-row update_or_create loop). Keys are normalised through the model
+    field so 101 and '101' land on the same CharField row.
+    """
+    key_field = model._meta.get_field(key)
+    latest    = {}
+    for row in rows:
+        k = key_field.to_python(row[key])
+        latest[k] = {**row, key: k}
+    return list(latest.values())
+
+
+def _batches(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+# ── PostgreSQL: INSERT ... ON CONFLICT ... RETURNING ──────
+
+def _pg_upsert_batch(conn, model, key, columns, batch, partitioned=False):
+    qn      = conn.ops.quote_name
+    fields  = [model._meta.get_field(c) for c in columns]
+    updates = [f for f in fields if f.name not in (key, 'client_id')]
+    kfield  = model._meta.get_field(key)
+
+    row_sql = '(' + ', '.join(['%s'] * len(fields)) + ')'
+    sql = (
+        f"INSERT INTO {qn(model._meta.db_table)} AS t "
+        f"({', '.join(qn(f.column) for f in fields)}) "
+        f"VALUES {', '.join([row_sql] * len(batch))} "
+        f"ON CONFLICT ({qn(kfield.column)}, {qn('client_id')}) "
+        f"DO UPDATE SET {', '.join(f'{qn(f.column)} = EXCLUDED.{qn(f.column)}' for f in updates)} "
+    )
+    if 'row_hash' in columns:
+        # Unchanged rows are left alone: no new tuple, no RETURNING row
+        sql += "WHERE t.row_hash IS DISTINCT FROM EXCLUDED.row_hash "
+    params = [
+        f.get_db_prep_save(row.get(f.name), conn)
+        for row in batch
+        for f in fields
+    ]
+    with conn.cursor() as cursor:
+        if not partitioned:
+            cursor.execute(sql + "RETURNING (xmax = 0)", params)
+            flags    = [is_new for (is_new,) in cursor.fetchall()]
+            inserted = sum(flags)
+            return inserted, len(flags) - inserted, len(batch) - len(flags)
+
+        # A partitioned table has no xmax to RETURNING: look the keys up first
+        keys = [kfield.get_db_prep_value(row[key], conn) for row in batch]
+        cursor.execute(
+            f"SELECT count(*) FROM {qn(model._meta.db_table)} "
+            f"WHERE {qn('client_id')} = %s AND {qn(kfield.column)} = ANY(%s)",
+            [batch[0]['client_id'], keys],
+        )
+        existing = cursor.fetchone()[0]
+        cursor.execute(sql, params)
+        written  = cursor.rowcount
+    inserted = len(batch) - existing
+    return inserted, written - inserted, len(batch) - written
+
+
+# ── Fallback (SQLite / tests): bulk_create(update_conflicts) ──
+
+def _orm_upsert_batch(using, model, key, columns, batch):
+    hashed   = 'row_hash' in columns
+    existing = dict(
+        model.objects.using(using)
+        .filter(client_id=batch[0]['client_id'], **{f'{key}__in': [r[key] for r in batch]})
+        .values_list(key, 'row_hash' if hashed else key)
+    )
+    changed = [
+        r for r in batch
+        if r[key] not in existing or not hashed or existing[r[key]] != r['row_hash']
+    ]
+    if changed:
+        model.objects.using(using).bulk_create(
+            [model(**row) for row in changed],
+            update_conflicts = True,
+            unique_fields    = [key, 'client_id'],
+            update_fields    = [c for c in columns if c not in (key, 'client_id')],
+        )
+    created = sum(1 for r in changed if r[key] not in existing)
+    return created, len(changed) - created, len(batch) - len(changed)
+
+
+def bulk_upsert(model, client_id, rows, key, batch_size=None, using=None):
+    """
+    Insert or update `rows` for one client, keyed on (key, client_id).
+
+    `rows` are dicts of business fields and must all carry the same keys;
+    for fingerprinted models, business fields left out are written as NULL.
+    client_id, synced_at and row_hash are stamped here. On PostgreSQL each
+    batch is a single INSERT ... ON CONFLICT DO UPDATE; other backends go
+    through bulk_create(update_conflicts=True). Rows whose row_hash matches
+    the stored one are skipped rather than rewritten. Callers own the outer
+    transaction.
+
+    Returns {'created', 'updated', 'unchanged'}; repeated keys count as updates.
+    """
+    using  = using or router.db_for_write(model)
+    conn   = connections[using]
+    now    = timezone.now()
+    unique = _dedupe(model, key, rows)
+    counts = {'created': 0, 'updated': len(rows) - len(unique), 'unchanged': 0}
+    if not unique:
+        return counts
+
+    row_hash = hasher(model)
+    business = list(unique[0])
+    if row_hash:
+        business += [f for f in hash_fields(model) if f not in business]
+    columns = business + ['client_id', 'synced_at'] + (['row_hash'] if row_hash else [])
+    size    = get_batch_size(batch_size)
+    rows    = [
+        {**{f: r.get(f) for f in business}, 'client_id': client_id, 'synced_at': now}
+        for r in unique
+    ]
+    if row_hash:
+        for r in rows:
+            r['row_hash'] = row_hash(r)
+
+    is_pg = conn.vendor == 'postgresql'
+    if is_pg:
+        size        = min(size, PG_MAX_PARAMS // len(columns))
+        partitioned = is_partitioned(model, conn)
+
+    with transaction.atomic(using=using, savepoint=False):
+        for batch in _batches(rows, size):
+            if is_pg:
+                c, u, n = _pg_upsert_batch(conn, model, key, columns, batch, partitioned)
+            else:
+                c, u, n = _orm_upsert_batch(using, model, key, columns, batch)
+            counts['created']   += c
+            counts['updated']   += u
+            counts['unchanged'] += n
+
+    if counts['created'] or counts['updated']:
+        invalidate(client_id, using=using)
+        metrics.add_rows(counts['created'] + counts['updated'])
+    return counts
+
+
+def delete_keys(model, client_id, key, keys, batch_size=None, using=None):
+    """
+    Delete one client's rows whose `key` is in `keys`, leaving a tombstone
+    for each one that existed; returns the number deleted.
+    """
+    using     = using or router.db_for_write(model)
+    key_field = model._meta.get_field(key)
+    keys      = list({key_field.to_python(k) for k in keys})
+    deleted   = 0
+    for chunk in _batches(keys, get_batch_size(batch_size)):
+        qs    = model.objects.using(using).filter(client_id=client_id, **{f'{key}__in': chunk})
+        found = list(qs.values_list(key, flat=True))
+        if found:
+            n, _ = qs.delete()
+            record_deleted(model, client_id, found, using=using)
+            deleted += n
+    if deleted:
+        invalidate(client_id, using=using)
+        metrics.add_rows(deleted)
+    return deleted
@@ -1,32 +1,88 @@
+from django.conf import settings
 from django.urls import path
+
+from . import async_views
 from .views import (
-    HealthView,
+    HealthView, DatabaseStatusView, MetricsView,
     AccMasterListView, AccMasterDetailView, AccMasterBulkView, AccMasterTruncateView,
+    AccMasterLoadView, AccMasterManifestView, AccMasterSearchView,
     MiselListView, MiselBulkView, MiselTruncateView,
     AccInvMastListView, AccInvMastDetailView, AccInvMastBulkView,
-    AccInvMastSummaryView, AccInvMastTruncateView,
+    AccInvMastSummaryView, AccInvMastTruncateView, AccInvMastLoadView,
+    AccInvMastManifestView, AccInvMastAnalyticsView,
+    LoadSessionStartView, LoadSessionBatchView, LoadSessionCommitView, LoadSessionDetailView,
+    BulkJobView, SyncView,
 )
 
 urlpatterns = [
 
     # ── Health ────────────────────────────────────────────
     path('vsaver/status/',          HealthView.as_view(),              name='vsaver-status'),
+    path('vsaver/status/db/',       DatabaseStatusView.as_view(),      name='vsaver-status-db'),
+    path('vsaver/metrics/',         MetricsView.as_view(),             name='vsaver-metrics'),
 
     # ── Debtors ───────────────────────────────────────────
     path('debtors/',                AccMasterListView.as_view(),       name='debtor-list'),
     path('debtors/bulk/',           AccMasterBulkView.as_view(),       name='debtor-bulk'),
     path('debtors/truncate/',       AccMasterTruncateView.as_view(),   name='debtor-truncate'),
+    path('debtors/load/',           AccMasterLoadView.as_view(),       name='debtor-load'),
+    path('debtors/manifest/',       AccMasterManifestView.as_view(),   name='debtor-manifest'),
+    path('debtors/search/',         AccMasterSearchView.as_view(),     name='debtor-search'),
+    path('debtors/sessions/',       LoadSessionStartView.as_view(entity='accmaster'), name='debtor-session'),
     path('debtors/<str:code>/',     AccMasterDetailView.as_view(),     name='debtor-detail'),
 
     # ── Firm info ─────────────────────────────────────────
     path('misel/',                  MiselListView.as_view(),           name='misel-list'),
     path('misel/bulk/',             MiselBulkView.as_view(),           name='misel-bulk'),
     path('misel/truncate/',         MiselTruncateView.as_view(),       name='misel-truncate'),
+    path('misel/sessions/',         LoadSessionStartView.as_view(entity='misel'), name='misel-session'),
 
     # ── Invoices ──────────────────────────────────────────
     path('invoices/',               AccInvMastListView.as_view(),      name='invoice-list'),
     path('invoices/bulk/',          AccInvMastBulkView.as_view(),      name='invoice-bulk'),
     path('invoices/summary/',       AccInvMastSummaryView.as_view(),   name='invoice-summary'),
+    path('invoices/analytics/',     AccInvMastAnalyticsView.as_view(), name='invoice-analytics'),
     path('invoices/truncate/',      AccInvMastTruncateView.as_view(),  name='invoice-truncate'),
+    path('invoices/load/',          AccInvMastLoadView.as_view(),      name='invoice-load'),
+    path('invoices/manifest/',      AccInvMastManifestView.as_view(),  name='invoice-manifest'),
+    path('invoices/sessions/',      LoadSessionStartView.as_view(entity='accinvmast'), name='invoice-session'),
     path('invoices/<int:slno>/',    AccInvMastDetailView.as_view(),    name='invoice-detail'),
-]
\ No newline at end of file
+
+    # ── Every dataset in one round trip ───────────────────
+    path('sync/',                   SyncView.as_view(),                name='sync'),
+
+    # ── Load sessions (open under a dataset above) ────────
+    path('sessions/<uuid:session_id>/',         LoadSessionDetailView.as_view(), name='session-detail'),
+    path('sessions/<uuid:session_id>/batches/', LoadSessionBatchView.as_view(),  name='session-batch'),
+    path('sessions/<uuid:session_id>/commit/',  LoadSessionCommitView.as_view(), name='session-commit'),
+
+    # ── Async bulk jobs (?async=1 on the /bulk/ routes) ───
+    path('jobs/<uuid:job_id>/',     BulkJobView.as_view(),             name='job-detail'),
+]
+
+
+# ── Native async reads (ASGI) ─────────────────────────────
+
+ASYNC_READS = {
+    'debtor-list'      : async_views.debtor_list,
+    'debtor-detail'    : async_views.debtor_detail,
+    'debtor-search'    : async_views.debtor_search,
+    'misel-list'       : async_views.misel_list,
+    'invoice-list'     : async_views.invoice_list,
+    'invoice-detail'   : async_views.invoice_detail,
+    'invoice-summary'  : async_views.invoice_summary,
+    'invoice-analytics': async_views.invoice_analytics,
+}
+
+
+def with_async_reads(patterns):
+    """`patterns` with the read endpoints swapped for their async twins."""
+    return [
+        path(str(p.pattern), ASYNC_READS.get(p.name, p.callback), name=p.name)
+        for p in patterns
+    ]
+
+
+# asgi.py sets VSAVER_ASYNC_READS, so uvicorn serves the reads natively
+if getattr(settings, 'VSAVER_ASYNC_READS', False):
+    urlpatterns = with_async_reads(urlpatterns)
@@ -0,0 +1,158 @@
+import datetime
+import decimal
+
+from django.core.exceptions import ValidationError
+
+
+BIGINT_MIN, BIGINT_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+# ── Per-column coercers ───────────────────────────────────
+# Each takes one non-null value and returns it as the column stores it,
+# or raises ValueError with the message reported for that row.
+
+def _char(field):
+    limit = field.max_length
+
+    def coerce(value):
+        if not isinstance(value, str):
+            if isinstance(value, bool) or not isinstance(value, (int, float, decimal.Decimal)):
+                raise ValueError('Expected a string.')
+            value = str(value)
+        if limit is not None and len(value) > limit:
+            raise ValueError(f'Ensure this field has no more than {limit} characters.')
+        return value
+    return coerce
+
+
+def _integer(field):
+    def coerce(value):
+        if isinstance(value, bool):
+            raise ValueError('A valid integer is required.')
+        if not isinstance(value, int):
+            try:
+                if isinstance(value, float) and not value.is_integer():
+                    raise ValueError
+                value = int(value.strip() if isinstance(value, str) else value)
+            except (TypeError, ValueError, OverflowError):
+                raise ValueError('A valid integer is required.')
+        if not BIGINT_MIN <= value <= BIGINT_MAX:
+            raise ValueError('Integer out of range.')
+        return value
+    return coerce
+
+
+def _decimal(field):
+    exp   = decimal.Decimal(1).scaleb(-field.decimal_places)
+    limit = decimal.Decimal(10) ** (field.max_digits - field.decimal_places)
+
+    def coerce(value):
+        if isinstance(value, bool) or not isinstance(value, (str, int, float, decimal.Decimal)):
+            raise ValueError('A valid number is required.')
+        if isinstance(value, float):
+            value = repr(value)
+        try:
+            number = decimal.Decimal(value.strip() if isinstance(value, str) else value)
+            if not number.is_finite():
+                raise ValueError
+            # Round half away from zero, as PostgreSQL numeric does
+            number = number.quantize(exp, rounding=decimal.ROUND_HALF_UP)
+        except (ValueError, decimal.InvalidOperation):
+            raise ValueError('A valid number is required.')
+        if abs(number) >= limit:
+            raise ValueError(
+                f'Ensure that there are no more than {field.max_digits - field.decimal_places} '
+                f'digits before the decimal point.'
+            )
+        return number
+    return coerce
+
+
+def _date(field):
+    def coerce(value):
+        if isinstance(value, datetime.datetime):
+            return value.date()
+        if isinstance(value, datetime.date):
+            return value
+        if not isinstance(value, str):
+            raise ValueError('Expected a date string (YYYY-MM-DD).')
+        try:
+            # Fast path for the usual YYYY-MM-DD[THH:MM:SS...]
+            return datetime.date.fromisoformat(value[:10] if value[10:11] in ('T', ' ') else value)
+        except ValueError:
+            pass
+        try:
+            parsed = field.to_python(value)
+        except ValidationError:
+            parsed = None
+        if parsed is None:
+            raise ValueError('Expected a date string (YYYY-MM-DD).')
+        return parsed
+    return coerce
+
+
+def _generic(field):
+    def coerce(value):
+        try:
+            return field.to_python(value)
+        except ValidationError as exc:
+            raise ValueError(' '.join(exc.messages))
+    return coerce
+
+
+COERCERS = {
+    'CharField'      : _char,
+    'TextField'      : _char,
+    'IntegerField'   : _integer,
+    'BigIntegerField': _integer,
+    'DecimalField'   : _decimal,
+    'DateField'      : _date,
+}
+
+
+def coercer(field):
+    return COERCERS.get(field.get_internal_type(), _generic)(field)
+
+
+# ── Batch validation ──────────────────────────────────────
+
+def validate_records(model, columns, records, required=()):
+    """
+    Coerce a batch of records to `model`'s column types one column at a
+    time (max_length, BIGINT range, Decimal digits/scale, dates), with
+    each column's coercer built once per batch instead of a serializer
+    per row.
+
+    Returns (rows, rejected): the valid rows, holding exactly `columns`
+    in column order, and [{'index': n, 'errors': {column: message}}]
+    for the rest.
+    """
+    count   = len(records)
+    objects = [rec if isinstance(rec, dict) else None for rec in records]
+    errors  = {n: {'non_field_errors': 'Expected an object.'} for n, rec in enumerate(objects) if rec is None}
+
+    values = {}
+    for name in columns:
+        coerce  = coercer(model._meta.get_field(name))
+        needed  = name in required
+        coerced = [None] * count
+        for n, rec in enumerate(objects):
+            if rec is None:
+                continue
+            value = rec.get(name)
+            if value is None:
+                if needed:
+                    errors.setdefault(n, {})[name] = 'This field is required.'
+                continue
+            try:
+                coerced[n] = coerce(value)
+            except ValueError as exc:
+                errors.setdefault(n, {})[name] = str(exc)
+        values[name] = coerced
+
+    rows = [
+        {name: values[name][n] for name in columns}
+        for n in range(count) if n not in errors
+    ]
+    rejected = [{'index': n, 'errors': errors[n]} for n in sorted(errors)]
+    return rows, rejected
@@ -1,42 +1,55 @@
+import datetime
 import logging
-from django.db.models import Sum, Count
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import DataError, IntegrityError, transaction
+from django.db.models import Count
+from django.http import HttpResponse
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import status
-from rest_framework.parsers import JSONParser, FormParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import AccMaster, Misel, AccInvMast
+from . import metrics
+from .admission import BulkRateThrottle, bulk_slot, concurrency_limits, in_flight
+from .auth import OpsToken, api_key_required, missing_tenant
+from .caching import cached_response, invalidate, shared_cache
+from .dbstats import database_stats
+from .filters import ListSpec
+from .jobs import submit
+from .lean import LeanSerializer
+from .loaders import CSV_TYPES, NDJSON_TYPES, iter_records, iter_valid_records, load_records
+from .models import (
+    AccMaster, Misel, AccInvMast,
+    AccInvMastClientSummary, AccInvMastCustomerSummary, BulkJob, LoadSession,
+)
+from .pagination import manifest_size_limits, page_size_limits, paginate, stream_ndjson
+from .partitions import truncate_invoices
+from .routing import replica_read
+from .search import MIN_QUERY, search_debtors, search_limits
 from .serializers import (
     AccMasterSerializer, BulkAccMasterSerializer,
     MiselSerializer, BulkMiselSerializer,
     AccInvMastSerializer, BulkAccInvMastSerializer,
+    RecordsField,
 )
+from .sessions import DATASETS, abort_session, add_batch, commit_session, start_session
+from .summaries import GROUP_BY, clear_invoice_summary, sales_by
+from .sync import run_sync, validate_sync
+from .tombstones import deleted_since, expired, record_reset, watermark
 
 logger = logging.getLogger(__name__)
 
 
 def _require_client_id(request):
     """
-    Return (client_id, None) if present, or (None, error_response).
-
-    Checks in this order:
-      1. ?client_id= query param       <- most reliable, always works
-      2. X-Client-ID request header
-      3. request.data body             <- works on DELETE only when the view
-                                          declares parser_classes (see truncate views)
-
-    NOTE: DRF does NOT parse DELETE bodies by default — truncate views
-    override parser_classes so all three sources work.
+    Return (client_id, None), or (None, error_response) when the request
+    names no tenant. The tenant is resolved by api.auth before the view
+    runs: the client_id of an API key (Authorization: Api-Key / X-API-Key)
+    or, unless VSAVER_REQUIRE_API_KEY, ?client_id= / the X-Client-ID header.
     """
-    client_id = (
-        request.query_params.get('client_id', '').strip()
-        or request.headers.get('X-Client-ID', '').strip()
-    )
-    # Body fallback — only effective when view declares parser_classes
-    if not client_id and hasattr(request, 'data') and isinstance(request.data, dict):
-        client_id = request.data.get('client_id', '').strip()
-
+    client_id = getattr(request, 'tenant', None)
     if not client_id:
         logger.warning(
             f"[AUTH] client_id missing — "
@@ -44,50 +57,579 @@ def _require_client_id(request):
             f"header={request.headers.get('X-Client-ID', '')!r}, "
             f"method={request.method}"
         )
+        code, message = missing_tenant()
+        return None, Response({'error': message}, status=code)
+    return client_id, None
+
+
+def _tenant_body(request):
+    """
+    (body, None) for a write that carries client_id in its JSON body:
+    the resolved tenant is filled in when the body leaves it out, a
+    different one is refused. Without a tenant (no key, no ?client_id=)
+    the body's own client_id is used, unless an API key is required.
+    """
+    data   = request.data
+    tenant = getattr(request, 'tenant', None)
+    if not tenant:
+        if api_key_required():
+            code, message = missing_tenant()
+            return None, Response({'error': message}, status=code)
+        return data, None
+    if not isinstance(data, dict):
+        return data, None
+    claimed = data.get('client_id')
+    if claimed not in (None, '') and claimed != tenant:
+        return None, Response(
+            {'error': 'client_id does not match the authenticated client.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    return {**data, 'client_id': tenant}, None
+
+
+def _parse_since(params):
+    """Return (since, None), since being None without ?since=, or (None, error_response)."""
+    raw = params.get('since')
+    if raw is None:
+        return None, None
+    try:
+        # An unescaped '+' in the offset arrives as a space
+        since = parse_datetime(raw.strip().replace(' ', '+'))
+    except ValueError:
+        since = None
+    if since is None:
         return None, Response(
-            {'error': 'client_id is required. Pass as ?client_id=... or X-Client-ID header.'},
+            {'error': f'Invalid since={raw!r}; expected an ISO 8601 timestamp.'},
             status=status.HTTP_400_BAD_REQUEST
         )
-    return client_id, None
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since, datetime.timezone.utc)
+    return since, None
 
 
-def _require_client_id(request):
+def _since_changes(qs, since, mark, tombstones):
     """
-    Return (client_id, None) if present, or (None, error_response).
-    Checks query params first, then X-Client-ID header.
+    (filtered qs, changes body) given the watermark taken before reading
+    and the tombstones after `since`: (reset, deleted), or None when
+    since= predates the tombstone retention and everything is resent.
     """
-    client_id = (
-        request.query_params.get('client_id', '').strip()
-        or request.headers.get('X-Client-ID', '').strip()
-    )
-    if not client_id:
+    if tombstones is None:
+        return qs, {'deleted': [], 'reset': True, 'watermark': mark}
+    reset, deleted = tombstones
+    return qs.filter(synced_at__gt=since), {'deleted': deleted, 'reset': reset, 'watermark': mark}
+
+
+def _changes(qs, client_id, key, since):
+    mark = watermark()
+    tombstones = None if expired(since) else deleted_since(qs.model, client_id, key, since)
+    return _since_changes(qs, since, mark, tombstones)
+
+
+def _since(request, qs, client_id, key):
+    """
+    Apply ?since=<ISO timestamp> to a per-client list.
+
+    Returns (qs, changes, None), where `changes` is None without ?since=
+    and otherwise {'deleted', 'reset', 'watermark'} for the response body,
+    or (None, None, error_response). Readers drop their copy of the entity
+    when 'reset' is true, apply 'deleted', then upsert the results and send
+    'watermark' as the next since=. A since= older than the tombstone
+    retention comes back as a reset with every row.
+    """
+    since, err = _parse_since(request.query_params)
+    if err:
+        return None, None, err
+    if since is None:
+        return qs, None, None
+    return (*_changes(qs, client_id, key, since), None)
+
+
+def _list_args(params, model, keyset):
+    """
+    Validate a list request's query params. Returns (args, None) or
+    (None, error_response); args are (since, stream, paged, limit, cursor).
+    """
+    since, err = _parse_since(params)
+    if err:
+        return None, err
+
+    stream = params.get('stream')
+    if stream:
+        if stream != 'ndjson':
+            return None, Response({'error': "stream must be 'ndjson'."}, status=status.HTTP_400_BAD_REQUEST)
+        if since is not None:
+            return None, Response({'error': 'since cannot be combined with stream.'}, status=status.HTTP_400_BAD_REQUEST)
+        return (since, True, False, None, None), None
+
+    if 'cursor' not in params and 'limit' not in params:
+        return (since, False, False, None, None), None
+
+    default_limit, max_limit = page_size_limits()
+    try:
+        limit = int(params.get('limit', default_limit))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= max_limit:
         return None, Response(
-            {'error': 'client_id is required. Pass as ?client_id=... or X-Client-ID header.'},
+            {'error': f'limit must be an integer between 1 and {max_limit}.'},
             status=status.HTTP_400_BAD_REQUEST
         )
-    return client_id, None
+
+    cursor = None
+    if params.get('cursor'):
+        cursor = keyset.decode(model, params['cursor'])
+        if cursor is None:
+            return None, Response({'error': 'Invalid cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+    return (since, False, True, limit, cursor), None
+
+
+def _analytics_args(params):
+    """
+    Validate an analytics request's query params. Returns (args, None) or
+    (None, error_response); args are (group_by, start, end, limit).
+    """
+    group_by = params.get('group_by', 'day')
+    if group_by not in GROUP_BY:
+        return None, Response(
+            {'error': f"group_by must be one of {', '.join(GROUP_BY)}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    bounds = []
+    for name in ('from', 'to'):
+        raw = params.get(name)
+        try:
+            bounds.append(datetime.date.fromisoformat(raw.strip()) if raw else None)
+        except ValueError:
+            return None, Response(
+                {'error': f'Invalid {name}={raw!r}; expected a date (YYYY-MM-DD).'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    start, end = bounds
+    if start and end and start > end:
+        return None, Response({'error': 'from must not be after to.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    limit = None
+    if 'limit' in params:
+        _, max_limit = page_size_limits()
+        try:
+            limit = int(params['limit'])
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= max_limit:
+            return None, Response(
+                {'error': f'limit must be an integer between 1 and {max_limit}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    return (group_by, start, end, limit), None
+
+
+def _search_args(params):
+    """(q, limit), None or None, error_response for /debtors/search/."""
+    q = params.get('q', '').strip()
+    if len(q) < MIN_QUERY:
+        return None, Response(
+            {'error': f'q must be at least {MIN_QUERY} characters.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    default_limit, max_limit = search_limits()
+    try:
+        limit = int(params.get('limit', default_limit))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= max_limit:
+        return None, Response(
+            {'error': f'limit must be an integer between 1 and {max_limit}.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return (q, limit), None
+
+
+def _search_body(client_id, q, rows):
+    return {
+        'client_id': client_id,
+        'q'        : q,
+        'results'  : [
+            {'code': code, 'name': name, 'place': place, 'phone2': phone2, 'score': round(score, 3)}
+            for code, name, place, phone2, score in rows
+        ],
+    }
+
+
+def _analytics_body(client_id, args, results):
+    group_by, start, end, _ = args
+    return {'client_id': client_id, 'group_by': group_by, 'from': start, 'to': end, 'results': results}
+
+
+def _list_body(results, changes, paged=False, cursor=None, next_cursor=None):
+    if paged:
+        body = {'results': results, 'next_cursor': next_cursor}
+        if changes is not None and cursor is None:
+            body.update(changes)
+        return body
+    return results if changes is None else {'results': results, **changes}
+
+
+def _list_query(params, qs, serializer_class, spec):
+    """
+    Apply a list view's ListSpec: its filters, ?ordering= and ?fields=.
+    Returns ((qs, lean, keyset), None) or (None, error_response).
+    """
+    try:
+        qs     = spec.filter(qs, params)
+        keyset = spec.ordering(params)
+        fields = spec.fields(params, serializer_class)
+    except ValueError as exc:
+        return None, Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return (qs, LeanSerializer(serializer_class, fields), keyset), None
+
+
+def _page_fields(lean, keyset):
+    """
+    Columns to select for a keyset page: the projected ones, then any key
+    the cursor needs. Rows are represented by zipping with lean.fields,
+    so the trailing keys are dropped from the output.
+    """
+    return lean.fields + [f for f in keyset.fields if f not in lean.fields]
+
+
+def _list_response(request, qs, serializer_class, spec, client_id, key):
+    """
+    Serialize a per-client list through the LeanSerializer fast path.
+    Without paging params this is the plain list it always was;
+    ?cursor=&limit= switch to keyset pages ({'results', 'next_cursor'})
+    and ?stream=ndjson streams every row. With ?since= the body is an
+    object carrying the changes (see _since); when paging, only the first
+    page has 'deleted', 'reset' and 'watermark'. The view's ListSpec adds
+    filters, ?ordering= and ?fields=; keep them the same across pages.
+    """
+    query, err = _list_query(request.query_params, qs, serializer_class, spec)
+    if err:
+        return err
+    qs, lean, keyset = query
+    args, err = _list_args(request.query_params, qs.model, keyset)
+    if err:
+        return err
+    since, stream, paged, limit, cursor = args
+    changes = None
+    if since is not None:
+        qs, changes = _changes(qs, client_id, key, since)
+
+    if stream:
+        return stream_ndjson(qs.order_by(*keyset.order_by()), lean)
+    if not paged:
+        return Response(_list_body(lean.data(qs.order_by(*keyset.order_by())), changes))
+    rows, next_cursor = paginate(qs, keyset, cursor, limit, _page_fields(lean, keyset))
+    return Response(_list_body(lean.represent(rows), changes, True, cursor, next_cursor))
+
+
+def _manifest_response(request, model, key):
+    """
+    One key-range chunk of (key, row_hash) pairs for the caller's client,
+    ordered by key. Pass the returned 'next' back as ?after= for the next
+    chunk; it is null on the last one. A null hash means "resend this row".
+    """
+    client_id, err = _require_client_id(request)
+    if err:
+        return err
+    default_limit, max_limit = manifest_size_limits()
+    try:
+        limit = int(request.query_params.get('limit', default_limit))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= max_limit:
+        return Response(
+            {'error': f'limit must be an integer between 1 and {max_limit}.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    qs    = model.objects.filter(client_id=client_id).order_by(key)
+    after = request.query_params.get('after')
+    if after:
+        try:
+            qs = qs.filter(**{f'{key}__gt': model._meta.get_field(key).to_python(after)})
+        except DjangoValidationError:
+            return Response({'error': f'Invalid after={after!r}.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    items = [list(pair) for pair in qs.values_list(key, 'row_hash')[:limit + 1]]
+    more  = len(items) > limit
+    items = items[:limit]
+    return Response({
+        'client_id': client_id,
+        'items'    : items,
+        'next'     : items[-1][0] if more else None,
+    })
+
+
+def _run_load(request, dataset):
+    """
+    Shared body of the /load/ views: stream an NDJSON or CSV body,
+    validated a batch at a time, into the dataset's model for the
+    caller's client_id. ?mode=replace (default)
+    drops rows missing from the load, ?mode=merge only upserts.
+    `dataset.after_load(client_id)` runs in the same transaction as the load.
+    """
+    client_id, err = _require_client_id(request)
+    if err:
+        return err
+    mode = request.query_params.get('mode', 'replace')
+    if mode not in ('replace', 'merge'):
+        return Response({'error': "mode must be 'replace' or 'merge'."}, status=status.HTTP_400_BAD_REQUEST)
+    model = dataset.model
+    try:
+        with bulk_slot(client_id), transaction.atomic():
+            result = load_records(
+                model, dataset.key, dataset.columns, client_id,
+                iter_valid_records(request, model, dataset.key, dataset.columns),
+                replace=(mode == 'replace'),
+            )
+            if dataset.after_load:
+                dataset.after_load(client_id)
+    except (DataError, IntegrityError, DjangoValidationError) as exc:
+        logger.warning(f"[LOAD] {model._meta.db_table} client={client_id} rejected: {exc}")
+        return Response({'error': f'Load rejected: {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({**result, 'client_id': client_id, 'table': model._meta.db_table})
+
+
+def _bulk_response(request, serializer_class, entity):
+    """
+    Shared body of the /bulk/ views. ?async=1 validates and queues the
+    push for the bulk_worker command, answering 202 with the job; an
+    optional batch_id (?batch_id=, X-Batch-ID or the body) makes retries
+    of the same push return the original job instead of queueing it twice.
+    """
+    data, err = _tenant_body(request)
+    if err:
+        return err
+    serializer = serializer_class(data=data)
+    serializer.is_valid(raise_exception=True)
+    client_id = serializer.validated_data['client_id']
+    metrics.set_client(client_id)
+    if request.query_params.get('async') not in ('1', 'true'):
+        with bulk_slot(client_id):
+            return Response(serializer.save(), status=status.HTTP_200_OK)
+
+    batch_id = (
+        request.query_params.get('batch_id', '').strip()
+        or request.headers.get('X-Batch-ID', '').strip()
+        or str(request.data.get('batch_id') or '').strip()
+    )
+    if len(batch_id) > 100:
+        return Response({'error': 'batch_id is limited to 100 characters.'}, status=status.HTTP_400_BAD_REQUEST)
+    job, _ = submit(entity, serializer.validated_data, batch_id)
+    return Response(_job_body(job), status=status.HTTP_202_ACCEPTED)
+
+
+def _job_body(job):
+    return {
+        'job'        : job.id,
+        'status'     : job.status,
+        'client_id'  : job.client_id,
+        'table'      : DATASETS[job.entity].model._meta.db_table,
+        'batch_id'   : job.batch_id,
+        'total'      : job.total,
+        'processed'  : job.processed,
+        'created'    : job.created,
+        'updated'    : job.updated,
+        'unchanged'  : job.unchanged,
+        'deleted'    : job.deleted,
+        'error'      : job.error,
+        'rejected'   : job.rejected,
+        'created_at' : job.created_at,
+        'finished_at': job.finished_at,
+        'url'        : reverse('job-detail', args=[job.id]),
+    }
+
+
+def _session_body(session):
+    return {
+        'session'  : session.id,
+        'client_id': session.client_id,
+        'table'    : DATASETS[session.entity].model._meta.db_table,
+        'status'   : session.status,
+        'rows'     : session.rows,
+    }
+
+
+# ── Multi-entity sync ─────────────────────────────────────
+
+class SyncView(APIView):
+    throttle_classes = [BulkRateThrottle]
+
+    def post(self, request):
+        """
+        Debtors, misel and invoices in one round trip and one transaction:
+        {"client_id", "debtors": {"mode": "upsert"|"replace", "records", "deleted"}, "misel": ..., "invoices": ...}.
+        Every section is validated before any is written.
+        """
+        data, err = _tenant_body(request)
+        if err:
+            return err
+        client_id, sections = validate_sync(data)
+        metrics.set_client(client_id)
+        try:
+            with bulk_slot(client_id):
+                return Response(run_sync(client_id, sections))
+        except (DataError, IntegrityError, DjangoValidationError) as exc:
+            logger.warning(f"[SYNC] client={client_id} rejected: {exc}")
+            return Response({'error': f'Sync rejected: {exc}'}, status=status.HTTP_400_BAD_REQUEST)
 
 
 # ── Health ────────────────────────────────────────────────
 
 class HealthView(APIView):
     def get(self, request):
-        return Response({'status': 'ok', 'time': timezone.now()})
+        queue = dict(
+            BulkJob.objects.filter(status__in=[BulkJob.QUEUED, BulkJob.RUNNING])
+            .order_by().values_list('status').annotate(n=Count('id'))
+        )
+        return Response({
+            'status': 'ok',
+            'time'  : timezone.now(),
+            'bulk'  : {
+                'in_flight'     : in_flight(),
+                'scope'         : 'cluster' if shared_cache() else 'process',   # whose writes in_flight counts
+                'max_concurrent': concurrency_limits()[0],
+                'jobs_queued'   : queue.get(BulkJob.QUEUED, 0),
+                'jobs_running'  : queue.get(BulkJob.RUNNING, 0),
+            },
+        })
+
+
+class MetricsView(APIView):
+    """Prometheus scrape target for api.metrics."""
+    permission_classes = [OpsToken]
+
+    def get(self, request):
+        return HttpResponse(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+
+class DatabaseStatusView(APIView):
+    """Connection reuse mode, handshakes paid and pool wait times, per database alias."""
+    permission_classes = [OpsToken]
+
+    def get(self, request):
+        return Response({'databases': database_stats(), 'time': timezone.now()})
+
+
+# ── Load sessions (replace a dataset across many requests) ─
+
+class LoadSessionStartView(APIView):
+    """POST /<dataset>/sessions/ opens a session; `entity` is set per route."""
+    entity = None
+
+    def post(self, request):
+        client_id, err = _require_client_id(request)
+        if err:
+            return err
+        session = start_session(self.entity, client_id)
+        return Response(_session_body(session), status=status.HTTP_201_CREATED)
+
+
+class LoadSessionBatchView(APIView):
+    """
+    Stage one batch: {"records": [...]} (objects or columnar) / a bare
+    JSON list, or an NDJSON or CSV body. Nothing is visible to readers until the commit.
+    """
+    def post(self, request, session_id):
+        client_id, err = _require_client_id(request)
+        if err:
+            return err
+        entity = (
+            LoadSession.objects.filter(id=session_id, client_id=client_id)
+            .values_list('entity', flat=True).first()
+        )
+        if entity is None:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        media_type = (request.content_type or '').split(';')[0].strip().lower()
+        if media_type in NDJSON_TYPES or media_type in CSV_TYPES:
+            records = iter_records(request, DATASETS[entity].columns)
+        else:
+            records = request.data.get('records') if isinstance(request.data, dict) else request.data
+            if isinstance(records, dict) and 'columns' in records:
+                records = RecordsField.from_columns(records)
+            if not isinstance(records, list):
+                return Response({'error': 'records must be a list.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        session, staged = add_batch(session_id, client_id, records)
+        return Response({**_session_body(session), 'staged': staged})
+
+
+class LoadSessionCommitView(APIView):
+    throttle_classes = [BulkRateThrottle]
+
+    def post(self, request, session_id):
+        client_id, err = _require_client_id(request)
+        if err:
+            return err
+        try:
+            with bulk_slot(client_id):
+                result = commit_session(session_id, client_id)
+        except (DataError, IntegrityError, DjangoValidationError) as exc:
+            logger.warning(f"[LOAD] session={session_id} client={client_id} rejected: {exc}")
+            return Response({'error': f'Load rejected: {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+        session = LoadSession.objects.get(id=session_id)
+        return Response({**_session_body(session), **result})
+
+
+class LoadSessionDetailView(APIView):
+    def get(self, request, session_id):
+        client_id, err = _require_client_id(request)
+        if err:
+            return err
+        session = LoadSession.objects.filter(id=session_id, client_id=client_id).first()
+        if session is None:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({**_session_body(session), 'result': session.result})
+
+    def delete(self, request, session_id):
+        client_id, err = _require_client_id(request)
+        if err:
+            return err
+        abort_session(session_id, client_id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# ── Async bulk jobs ───────────────────────────────────────
+
+class BulkJobView(APIView):
+    def get(self, request, job_id):
+        client_id, err = _require_client_id(request)
+        if err:
+            return err
+        job = BulkJob.objects.filter(id=job_id, client_id=client_id).defer('payload').first()
+        if job is None:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(_job_body(job))
 
 
 # ── AccMaster (Debtors) ───────────────────────────────────
 
 class AccMasterListView(APIView):
+    listing = ListSpec(
+        filters   = ['place', 'super_code', 'name__istartswith'],
+        orderings = {                                 # acc_master_client_code_idx / _name_idx, either direction
+            'code' : ['code'],
+            '-code': ['-code'],
+            'name' : ['name', 'code'],
+            '-name': ['-name', '-code'],
+        },
+    )
+
+    @cached_response('debtor-list')
+    @replica_read
     def get(self, request):
         client_id, err = _require_client_id(request)
         if err:
             return err
         qs = AccMaster.objects.filter(client_id=client_id)
-        serializer = AccMasterSerializer(qs, many=True)
-        return Response(serializer.data)
+        return _list_response(request, qs, AccMasterSerializer, self.listing, client_id, 'code')
 
 
 class AccMasterDetailView(APIView):
+    @cached_response('debtor-detail')
+    @replica_read
     def get(self, request, code):
         client_id, err = _require_client_id(request)
         if err:
@@ -100,74 +642,113 @@ class AccMasterDetailView(APIView):
         return Response(AccMasterSerializer(obj).data)
 
 
+class AccMasterSearchView(APIView):
+    @cached_response('debtor-search')
+    @replica_read
+    def get(self, request):
+        """Type-ahead over name and phone2, best matches first (see api.search)."""
+        client_id, err = _require_client_id(request)
+        if err:
+            return err
+        args, err = _search_args(request.query_params)
+        if err:
+            return err
+        q, limit = args
+        return Response(_search_body(client_id, q, search_debtors(client_id, q, limit)))
+
+
 class AccMasterBulkView(APIView):
+    throttle_classes = [BulkRateThrottle]
+
     def post(self, request):
-        serializer = BulkAccMasterSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        result = serializer.save()
-        return Response(result, status=status.HTTP_200_OK)
+        return _bulk_response(request, BulkAccMasterSerializer, 'accmaster')
 
 
 class AccMasterTruncateView(APIView):
-    # Explicitly declare parsers so DRF parses the JSON body on DELETE too
-    parser_classes = [JSONParser, FormParser, MultiPartParser]
-
     def delete(self, request):
         client_id, err = _require_client_id(request)
         if err:
             return err
-        count, _ = AccMaster.objects.filter(client_id=client_id).delete()
+        with transaction.atomic():
+            count, _ = AccMaster.objects.filter(client_id=client_id).delete()
+            record_reset(AccMaster, client_id)
+            invalidate(client_id)
         return Response({'deleted': count, 'client_id': client_id, 'table': 'acc_master_sync'})
 
 
+class AccMasterLoadView(APIView):
+    throttle_classes = [BulkRateThrottle]
+
+    # Body is streamed as NDJSON / CSV; request.data is never touched
+    def post(self, request):
+        return _run_load(request, DATASETS['accmaster'])
+
+
+class AccMasterManifestView(APIView):
+    def get(self, request):
+        return _manifest_response(request, AccMaster, 'code')
+
+
 # ── Misel (Firm Info) ─────────────────────────────────────
 
 class MiselListView(APIView):
+    @cached_response('misel-list')
+    @replica_read
     def get(self, request):
         client_id, err = _require_client_id(request)
         if err:
             return err
-        qs = Misel.objects.filter(client_id=client_id)
-        serializer = MiselSerializer(qs, many=True)
-        return Response(serializer.data)
+        qs, changes, err = _since(request, Misel.objects.filter(client_id=client_id), client_id, 'firm_name')
+        if err:
+            return err
+        return Response(_list_body(LeanSerializer(MiselSerializer).data(qs), changes))
 
 
 class MiselBulkView(APIView):
+    throttle_classes = [BulkRateThrottle]
+
     def post(self, request):
-        serializer = BulkMiselSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        result = serializer.save()
-        return Response(result, status=status.HTTP_200_OK)
+        return _bulk_response(request, BulkMiselSerializer, 'misel')
 
 
 class MiselTruncateView(APIView):
-    # Explicitly declare parsers so DRF parses the JSON body on DELETE too
-    parser_classes = [JSONParser, FormParser, MultiPartParser]
-
     def delete(self, request):
         client_id, err = _require_client_id(request)
         if err:
             return err
-        count, _ = Misel.objects.filter(client_id=client_id).delete()
+        with transaction.atomic():
+            count, _ = Misel.objects.filter(client_id=client_id).delete()
+            record_reset(Misel, client_id)
+            invalidate(client_id)
         return Response({'deleted': count, 'client_id': client_id, 'table': 'misel_sync'})
 
 
 # ── AccInvMast (Invoices) ─────────────────────────────────
 
 class AccInvMastListView(APIView):
+    listing = ListSpec(
+        filters   = ['customerid', 'invdate__gte', 'invdate__lte', 'nettotal__gte', 'nettotal__lte'],
+        orderings = {                                 # acc_invmast_client_date_idx / _slno_idx, either direction
+            '-invdate': ['-invdate', '-slno'],
+            'invdate' : ['invdate', 'slno'],
+            '-slno'   : ['-slno'],
+            'slno'    : ['slno'],
+        },
+    )
+
+    @cached_response('invoice-list')
+    @replica_read
     def get(self, request):
         client_id, err = _require_client_id(request)
         if err:
             return err
-        customerid = request.query_params.get('customerid')
         qs = AccInvMast.objects.filter(client_id=client_id)
-        if customerid:
-            qs = qs.filter(customerid=customerid)
-        serializer = AccInvMastSerializer(qs, many=True)
-        return Response(serializer.data)
+        return _list_response(request, qs, AccInvMastSerializer, self.listing, client_id, 'slno')
 
 
 class AccInvMastDetailView(APIView):
+    @cached_response('invoice-detail')
+    @replica_read
     def get(self, request, slno):
         client_id, err = _require_client_id(request)
         if err:
@@ -181,11 +762,10 @@ class AccInvMastDetailView(APIView):
 
 
 class AccInvMastBulkView(APIView):
+    throttle_classes = [BulkRateThrottle]
+
     def post(self, request):
-        serializer = BulkAccInvMastSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        result = serializer.save()
-        return Response(result, status=status.HTTP_200_OK)
+        return _bulk_response(request, BulkAccInvMastSerializer, 'accinvmast')
 
 
 class AccInvMastTruncateView(APIView):
@@ -193,35 +773,79 @@ class AccInvMastTruncateView(APIView):
         client_id, err = _require_client_id(request)
         if err:
             return err
-        count, _ = AccInvMast.objects.filter(client_id=client_id).delete()
+        with transaction.atomic():
+            count = truncate_invoices(client_id)
+            clear_invoice_summary(client_id)
+            record_reset(AccInvMast, client_id)
+            invalidate(client_id)
         return Response({'deleted': count, 'client_id': client_id, 'table': 'acc_invmast_sync'})
 
 
+class AccInvMastLoadView(APIView):
+    throttle_classes = [BulkRateThrottle]
+
+    # Body is streamed as NDJSON / CSV; request.data is never touched
+    def post(self, request):
+        return _run_load(request, DATASETS['accinvmast'])
+
+
+class AccInvMastManifestView(APIView):
+    def get(self, request):
+        return _manifest_response(request, AccInvMast, 'slno')
+
+
 class AccInvMastSummaryView(APIView):
+    @cached_response('invoice-summary')
+    @replica_read
     def get(self, request):
         client_id, err = _require_client_id(request)
         if err:
             return err
         customerid = request.query_params.get('customerid')
-        qs = AccInvMast.objects.filter(client_id=client_id)
 
+        # Served from the summary tables kept current by the write paths
         if customerid:
-            qs = qs.filter(customerid=customerid)
-            agg = qs.aggregate(
-                total_sales=Sum('nettotal'),
-                invoice_count=Count('slno'),
-            )
+            row = (
+                AccInvMastCustomerSummary.objects
+                .filter(client_id=client_id, customerid=customerid)
+                .values('total_sales', 'invoice_count')
+                .first()
+            ) or {}
             return Response({
                 'customerid':    customerid,
                 'client_id':     client_id,
-                'total_sales':   agg['total_sales'] or 0,
-                'invoice_count': agg['invoice_count'] or 0,
+                'total_sales':   row.get('total_sales') or 0,
+                'invoice_count': row.get('invoice_count') or 0,
             })
 
         # All-customers summary for this client
-        summary = qs.aggregate(
-            total_invoices=Count('slno'),
-            total_amount=Sum('nettotal'),
-        )
-        summary['client_id'] = client_id
-        return Response(summary)
\ No newline at end of file
+        row = (
+            AccInvMastClientSummary.objects
+            .filter(client_id=client_id)
+            .values('total_sales', 'invoice_count')
+            .first()
+        ) or {}
+        return Response({
+            'total_invoices': row.get('invoice_count') or 0,
+            'total_amount':   row.get('total_sales'),
+            'client_id':      client_id,
+        })
+
+
+class AccInvMastAnalyticsView(APIView):
+    @cached_response('invoice-analytics')
+    @replica_read
+    def get(self, request):
+        """
+        Sales grouped by day, month or customer, optionally within
+        from=/to= (inclusive), read from the rollups the write paths keep.
+        """
+        client_id, err = _require_client_id(request)
+        if err:
+            return err
+        args, err = _analytics_args(request.query_params)
+        if err:
+            return err
+        group_by, start, end, limit = args
+        rows = sales_by(client_id, group_by, start, end)
+        return Response(_analytics_body(client_id, args, list(rows[:limit] if limit else rows)))
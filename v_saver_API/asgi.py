@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'v_saver_API.settings')
+# Serve list / detail / summary reads with the native async views
+os.environ.setdefault('VSAVER_ASYNC_READS', '1')
 
 application = get_asgi_application()
@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-v-saver-secret-key-2026'
@@ -27,8 +29,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'api.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -38,14 +42,17 @@ MIDDLEWARE = [
 ]
 
 REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'api.auth.ApiKeyAuthentication',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'api.renderers.FastJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'api.parsers.JSONParser',
     ],
 }
 
@@ -77,17 +84,53 @@ TEMPLATES = [
 WSGI_APPLICATION = 'v_saver_API.wsgi.application'
 
 # ── PostgreSQL on VPS ─────────────────────────────────────
+# The database is remote, so connections are reused rather than opened per
+# request. By default each worker thread keeps its connection for
+# VSAVER_DB_CONN_MAX_AGE seconds, checked before reuse after an idle spell.
+# VSAVER_DB_POOL=1 swaps that for a psycopg_pool pool per process instead
+# (pip install "psycopg[pool]"), which is the better fit under ASGI.
+# /api/vsaver/status/db/ shows the mode, handshakes paid and pool waits.
+VSAVER_DB_POOL = os.environ.get('VSAVER_DB_POOL', '0') == '1'
+
 DATABASES = {
     'default': {
-        'ENGINE'  : 'django.db.backends.postgresql',
-        'NAME'    : 'vsaver_db',
-        'USER'    : 'postgres',
-        'PASSWORD': 'info@imc',
-        'HOST'    : '88.222.212.14',
-        'PORT'    : '5432',
+        'ENGINE'            : 'django.db.backends.postgresql',
+        'NAME'              : os.environ.get('VSAVER_DB_NAME', 'vsaver_db'),
+        'USER'              : os.environ.get('VSAVER_DB_USER', 'postgres'),
+        'PASSWORD'          : os.environ.get('VSAVER_DB_PASSWORD', 'info@imc'),
+        'HOST'              : os.environ.get('VSAVER_DB_HOST', '88.222.212.14'),
+        'PORT'              : os.environ.get('VSAVER_DB_PORT', '5432'),
+        # Pooling and persistent connections are mutually exclusive in Django
+        'CONN_MAX_AGE'      : 0 if VSAVER_DB_POOL else int(os.environ.get('VSAVER_DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': os.environ.get('VSAVER_DB_HEALTH_CHECKS', '1') != '0',
+        'OPTIONS'           : {
+            'connect_timeout': int(os.environ.get('VSAVER_DB_CONNECT_TIMEOUT', 10)),
+            **({'sslmode': os.environ['VSAVER_DB_SSLMODE']} if os.environ.get('VSAVER_DB_SSLMODE') else {}),
+            **({'pool': {
+                'min_size': int(os.environ.get('VSAVER_DB_POOL_MIN', 2)),
+                'max_size': int(os.environ.get('VSAVER_DB_POOL_MAX', 20)),
+                'timeout' : float(os.environ.get('VSAVER_DB_POOL_TIMEOUT', 10)),   # seconds to wait for a connection
+            }} if VSAVER_DB_POOL else {}),
+        },
     }
 }
 
+# Read replicas: each host in VSAVER_DB_REPLICA_HOSTS (comma-separated; same
+# name, user and options as the primary) becomes an alias replica1, replica2,
+# ... The list / detail / summary reads go to the least busy one (see
+# api.routing), except for a client that wrote in the last
+# VSAVER_REPLICA_STICKY_SECONDS, which reads its own writes from the primary.
+for _n, _host in enumerate(filter(None, os.environ.get('VSAVER_DB_REPLICA_HOSTS', '').split(',')), 1):
+    DATABASES[f'replica{_n}'] = {**DATABASES['default'], 'HOST': _host.strip(), 'TEST': {'MIRROR': 'default'}}
+
+VSAVER_DB_REPLICAS            = [alias for alias in DATABASES if alias != 'default']
+# A client's last write (its response cache generation) must be seen by every
+# process for the stickiness to hold, so replicas need a shared cache backend
+if VSAVER_DB_REPLICAS and os.environ.get('VSAVER_CACHE_BACKEND', 'locmem') == 'locmem':
+    raise ImproperlyConfigured('VSAVER_DB_REPLICA_HOSTS needs VSAVER_CACHE_BACKEND=redis, db or file (see Response cache).')
+VSAVER_REPLICA_STICKY_SECONDS = int(os.environ.get('VSAVER_REPLICA_STICKY_SECONDS', 10))
+DATABASE_ROUTERS              = ['api.routing.ReplicaRouter']
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -104,4 +147,137 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-DATA_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024  # 50MB
\ No newline at end of file
+DATA_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024  # 50MB
+
+# ── Tenant API keys ───────────────────────────────────────
+# `Authorization: Api-Key <key>` (or X-API-Key) names the client; issue keys
+# with `manage.py api_keys --create <client_id>`. Until VSAVER_REQUIRE_API_KEY=1,
+# requests without a key may still name it with ?client_id= / X-Client-ID.
+# Resolved keys are cached per process for VSAVER_API_KEY_CACHE_TTL seconds,
+# which is also how long a revoked key may keep working.
+VSAVER_REQUIRE_API_KEY    = os.environ.get('VSAVER_REQUIRE_API_KEY', '0') == '1'
+VSAVER_API_KEY_CACHE_SIZE = int(os.environ.get('VSAVER_API_KEY_CACHE_SIZE', 10000))
+VSAVER_API_KEY_CACHE_TTL  = int(os.environ.get('VSAVER_API_KEY_CACHE_TTL', 60))
+
+# ── Bulk sync ─────────────────────────────────────────────
+# Rows per INSERT ... ON CONFLICT statement in the bulk upsert engine
+VSAVER_UPSERT_BATCH_SIZE = int(os.environ.get('VSAVER_UPSERT_BATCH_SIZE', 1000))
+
+# Load sessions older than this (seconds) are dropped when the client opens a new one
+VSAVER_LOAD_SESSION_TTL = int(os.environ.get('VSAVER_LOAD_SESSION_TTL', 6 * 3600))
+
+# ?async=1 bulk pushes: rows committed per step by `manage.py bulk_worker`, and
+# seconds without progress before another worker takes a running job over
+VSAVER_JOB_CHUNK_SIZE  = int(os.environ.get('VSAVER_JOB_CHUNK_SIZE', 5000))
+VSAVER_JOB_STALE_AFTER = int(os.environ.get('VSAVER_JOB_STALE_AFTER', 300))
+
+# Admission control for the bulk write routes (/bulk/, /load/, /sync/, session commits):
+# a token bucket per client_id (burst, then N per minute) answers 429 + Retry-After,
+# and so do caps on writes in flight, overall and per client. Reads are never held
+# back. 0 turns a limit off. Buckets and slots live in the cache: with a shared
+# backend (redis, db, file) they hold across workers and the async bulk_worker
+# shares the overall cap (only redis counts slots atomically; the others can
+# let a rare extra write in); with locmem every process has its own, and
+# `manage.py check` warns (/vsaver/status/ reports the scope).
+VSAVER_BULK_RATE_PER_MIN              = int(os.environ.get('VSAVER_BULK_RATE_PER_MIN', 60))
+VSAVER_BULK_BURST                     = int(os.environ.get('VSAVER_BULK_BURST', 20))
+VSAVER_BULK_MAX_CONCURRENT            = int(os.environ.get('VSAVER_BULK_MAX_CONCURRENT', 8))
+VSAVER_BULK_MAX_CONCURRENT_PER_CLIENT = int(os.environ.get('VSAVER_BULK_MAX_CONCURRENT_PER_CLIENT', 2))
+VSAVER_BULK_RETRY_AFTER               = int(os.environ.get('VSAVER_BULK_RETRY_AFTER', 5))
+
+# PostgreSQL: migration 0012 list-partitions acc_invmast_sync by client_id when
+# VSAVER_PARTITION_INVOICES=1 (see api.partitions). Clients with at least
+# VSAVER_PARTITION_MIN_ROWS invoices get a partition of their own from then on
+# via `manage.py invoice_partitions --split`; the rest share the DEFAULT one.
+VSAVER_PARTITION_INVOICES = os.environ.get('VSAVER_PARTITION_INVOICES', '0') == '1'
+VSAVER_PARTITION_MIN_ROWS = int(os.environ.get('VSAVER_PARTITION_MIN_ROWS', 10000))
+
+
+# ── List endpoints ────────────────────────────────────────
+# ?limit= default / cap for keyset pages, and rows per fetch for ?stream=ndjson
+VSAVER_PAGE_SIZE         = int(os.environ.get('VSAVER_PAGE_SIZE', 1000))
+VSAVER_MAX_PAGE_SIZE     = int(os.environ.get('VSAVER_MAX_PAGE_SIZE', 10000))
+VSAVER_STREAM_CHUNK_SIZE = int(os.environ.get('VSAVER_STREAM_CHUNK_SIZE', 2000))
+
+# /debtors/search/?q=: default / max results. With pg_trgm installed (migration
+# 0015, or `manage.py search_indexes --create` when it arrives later)
+# PostgreSQL matches through GIN trigram indexes; otherwise each process
+# keeps an in-memory trigram index for up to VSAVER_SEARCH_INDEXES clients,
+# rebuilt when their rows change and at least every INDEX_TTL seconds.
+VSAVER_SEARCH_LIMIT     = int(os.environ.get('VSAVER_SEARCH_LIMIT', 20))
+VSAVER_SEARCH_MAX_LIMIT = int(os.environ.get('VSAVER_SEARCH_MAX_LIMIT', 100))
+VSAVER_SEARCH_INDEXES   = int(os.environ.get('VSAVER_SEARCH_INDEXES', 8))
+VSAVER_SEARCH_INDEX_TTL = int(os.environ.get('VSAVER_SEARCH_INDEX_TTL', 60))
+
+# Route the read endpoints to api.async_views (asgi.py turns this on)
+VSAVER_ASYNC_READS = os.environ.get('VSAVER_ASYNC_READS', '0') == '1'
+
+# gzip / zstd (zstd needs the `zstandard` package) for JSON and NDJSON
+# responses when the client's Accept-Encoding allows it; bodies under
+# MIN_BYTES are sent as they are
+VSAVER_RESPONSE_COMPRESSION = os.environ.get('VSAVER_RESPONSE_COMPRESSION', '1') != '0'
+VSAVER_COMPRESS_MIN_BYTES   = int(os.environ.get('VSAVER_COMPRESS_MIN_BYTES', 1024))
+VSAVER_GZIP_LEVEL           = int(os.environ.get('VSAVER_GZIP_LEVEL', 6))
+VSAVER_ZSTD_LEVEL           = int(os.environ.get('VSAVER_ZSTD_LEVEL', 3))
+
+# (key, row_hash) pairs per /manifest/ chunk, default and cap
+VSAVER_MANIFEST_PAGE_SIZE     = int(os.environ.get('VSAVER_MANIFEST_PAGE_SIZE', 5000))
+VSAVER_MAX_MANIFEST_PAGE_SIZE = int(os.environ.get('VSAVER_MAX_MANIFEST_PAGE_SIZE', 50000))
+
+# ?since= reads: the returned watermark trails the clock by this many seconds
+# (longer than the slowest push), and tombstones older than the retention are
+# pruned, so a since= older than that forces a full resync
+VSAVER_SINCE_SAFETY_WINDOW      = int(os.environ.get('VSAVER_SINCE_SAFETY_WINDOW', 120))
+VSAVER_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('VSAVER_TOMBSTONE_RETENTION_DAYS', 30))
+
+
+# ── Metrics ───────────────────────────────────────────────
+# Per view request metrics at /api/vsaver/metrics/ (Prometheus text) and a
+# Server-Timing header on every response. CLIENT_LABEL=1 adds the resolved
+# tenant as a label, for the first MAX_CLIENTS tenants a process sees (the
+# rest are counted as "other"); requests slower than SLOW_REQUEST_MS are
+# logged with their timings.
+#
+# /api/vsaver/metrics/ and /api/vsaver/status/db/ answer only to
+# `Authorization: Bearer <VSAVER_OPS_TOKEN>`; they are closed while it is unset.
+VSAVER_METRICS              = os.environ.get('VSAVER_METRICS', '1') != '0'
+VSAVER_METRICS_CLIENT_LABEL = os.environ.get('VSAVER_METRICS_CLIENT_LABEL', '0') == '1'
+VSAVER_METRICS_MAX_CLIENTS  = int(os.environ.get('VSAVER_METRICS_MAX_CLIENTS', 100))
+VSAVER_OPS_TOKEN            = os.environ.get('VSAVER_OPS_TOKEN', '')
+VSAVER_SLOW_REQUEST_MS      = int(os.environ.get('VSAVER_SLOW_REQUEST_MS', 1000))
+
+
+# ── Response cache ────────────────────────────────────────
+# Per-client cache for list / detail / summary GETs (api.caching). Writes move
+# the client's generation, so entries only need a TTL and the backend's own
+# eviction: locmem is LRU, file and db cull once MAX_ENTRIES is reached.
+#
+# Generations must be seen by every process that writes: each gunicorn worker
+# and `manage.py bulk_worker`. Use redis (pip install redis; LOCATION is the
+# URL), db (run `manage.py createcachetable` once) or, with every process on
+# one host, file. locmem only works for a single process (runserver, one
+# worker and no async jobs), so the response cache is off with it unless
+# VSAVER_RESPONSE_CACHE=1 asks for it; `manage.py check` warns about that.
+VSAVER_CACHE_BACKEND = os.environ.get('VSAVER_CACHE_BACKEND', 'locmem')
+
+CACHES = {
+    'default': {
+        'BACKEND': {
+            'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+            'file'  : 'django.core.cache.backends.filebased.FileBasedCache',
+            'db'    : 'django.core.cache.backends.db.DatabaseCache',
+            'redis' : 'django.core.cache.backends.redis.RedisCache',
+        }.get(VSAVER_CACHE_BACKEND, VSAVER_CACHE_BACKEND),
+        'LOCATION': os.environ.get('VSAVER_CACHE_LOCATION', {
+            'file' : str(BASE_DIR / '.cache'),
+            'db'   : 'vsaver_cache',
+            'redis': 'redis://127.0.0.1:6379/0',
+        }.get(VSAVER_CACHE_BACKEND, 'vsaver')),
+        'TIMEOUT' : int(os.environ.get('VSAVER_CACHE_TIMEOUT', 300)),
+        'OPTIONS' : {'MAX_ENTRIES': int(os.environ.get('VSAVER_CACHE_MAX_ENTRIES', 5000))},
+    },
+}
+
+VSAVER_RESPONSE_CACHE  = os.environ.get('VSAVER_RESPONSE_CACHE', '0' if VSAVER_CACHE_BACKEND == 'locmem' else '1') != '0'
+VSAVER_CACHE_TIMEOUT   = CACHES['default']['TIMEOUT']
+VSAVER_CACHE_MAX_BYTES = int(os.environ.get('VSAVER_CACHE_MAX_BYTES', 1024 * 1024))